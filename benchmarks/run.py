@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# File: run.py
+# Description: Offline benchmarks for THSData end-to-end and per-phase overhead, recorded as JSON.
+# Author: bensema
+# License: MIT
+#
+# 用法:
+#   python benchmarks/run.py                                  # 运行全部并输出到 benchmarks/results/
+#   python benchmarks/run.py --latency 0.005 --repeat 20      # 模拟 5ms 网络延迟
+#   python benchmarks/run.py --only download_day,normalize_codes
+#   python benchmarks/run.py --compare benchmarks/results/baseline.json --threshold 0.2
+
+import os
+import sys
+import json
+import platform
+import argparse
+import statistics
+from time import perf_counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import thsdata
+from thsdata import THSData, normalize_codes
+from thsdata.metrics import Metrics
+from thsdata.thsdata import Interval
+from synthetic import SyntheticTHS
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 规模: 日K线根数、分钟K线天数、tick 天数、快照代码数、normalize_codes 代码数
+SCALES = {
+    "small": {"days": 500, "minute_days": 5, "snapshot_codes": 500, "codes": 10_000},
+    "default": {"days": 2500, "minute_days": 20, "snapshot_codes": 5000, "codes": 100_000},
+    "large": {"days": 7500, "minute_days": 60, "snapshot_codes": 20000, "codes": 1_000_000},
+}
+
+
+def _mixed_codes(n: int) -> List[str]:
+    """各种格式混合的证券代码."""
+    rng = np.random.default_rng(0)
+    numbers = rng.integers(0, 1000, n)
+    forms = [lambda i: f"600{i:03d}", lambda i: f"sz000{i:03d}", lambda i: f"300{i:03d}.SZ",
+             lambda i: f"USHA601{i:03d}", lambda i: f"sh688{i:03d}"]
+    return [forms[k % len(forms)](int(i)) for k, i in enumerate(numbers)]
+
+
+def build_cases(td: THSData, scale: Dict[str, int]) -> Dict[str, Callable[[], Any]]:
+    end = datetime(2025, 5, 15)
+    minute_start = pd.Timestamp(end) - pd.tseries.offsets.BDay(scale["minute_days"] - 1)
+    minute_start = minute_start.to_pydatetime().replace(hour=9, minute=30)
+    minute_end = end.replace(hour=15)
+    snapshot_codes = [f"USHA{600000 + i:06d}" for i in range(scale["snapshot_codes"] // 2)] + \
+                     [f"USZA{i:06d}" for i in range(scale["snapshot_codes"] - scale["snapshot_codes"] // 2)]
+    codes = _mixed_codes(scale["codes"])
+
+    return {
+        "download_day": lambda: td.download("USHA600519", count=scale["days"]),
+        "download_min1": lambda: td.download("USHA600519", minute_start, minute_end, interval=Interval.MIN_1),
+        "download_day_numpy": lambda: td.download("USHA600519", count=scale["days"], result_format="numpy"),
+        "security_bars_day": lambda: td.security_bars("USHA600519", datetime(2015, 1, 1), end, "", Interval.DAY),
+        "security_bars_min5": lambda: td.security_bars("USHA600519", minute_start, minute_end, "", Interval.MIN_5),
+        "transaction_history": lambda: td.transaction_history("USHA600519", end),
+        "stock_cur_market_data": lambda: td.stock_cur_market_data(snapshot_codes),
+        "stock_codes": lambda: td.stock_codes(),
+        "normalize_codes": lambda: normalize_codes(codes),
+    }
+
+
+def _rows(result: Any) -> Optional[int]:
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def run_case(fn: Callable[[], Any], metrics: Metrics, repeat: int, warmup: int) -> Dict[str, Any]:
+    """执行 warmup 次预热后测量 repeat 次，返回总耗时和各阶段耗时的统计."""
+    for _ in range(warmup):
+        fn()
+
+    totals, phases, rows = [], {}, None
+    for _ in range(repeat):
+        metrics.reset()
+        start = perf_counter()
+        result = fn()
+        totals.append(perf_counter() - start)
+        rows = _rows(result)
+        per_phase = {}
+        for (_, phase), histogram in metrics.latency.items():
+            per_phase[phase] = per_phase.get(phase, 0.0) + histogram.sum
+        for phase, seconds in per_phase.items():
+            phases.setdefault(phase, []).append(seconds)
+
+    summary = {
+        "rows": rows,
+        "repeat": repeat,
+        "min": min(totals),
+        "median": statistics.median(totals),
+        "mean": statistics.fmean(totals),
+        "max": max(totals),
+        "phases": {phase: statistics.median(values) for phase, values in phases.items()},
+        "requests": sum(metrics.calls.values()),
+    }
+    # 请求之外的时间为 THSData 的其余开销 (参数处理、合并、类型转换等)
+    summary["phases"]["other"] = max(0.0, summary["median"] - sum(summary["phases"].values()))
+    return summary
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """与基线比较中位耗时，返回变慢超过 threshold 的用例说明."""
+    regressions = []
+    for name, result in results["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base or not base.get("median"):
+            continue
+        ratio = result["median"] / base["median"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {base['median'] * 1e3:.2f}ms -> {result['median'] * 1e3:.2f}ms "
+                               f"({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="THSData 离线基准测试")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="default", help="负载规模")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟的请求延迟(秒)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟的随机波动(秒)")
+    parser.add_argument("--pool-size", type=int, default=1, help="会话数量")
+    parser.add_argument("--typed", action="store_true", help="使用 typed 模式")
+    parser.add_argument("--repeat", type=int, default=10, help="每个用例的测量次数")
+    parser.add_argument("--warmup", type=int, default=1, help="每个用例的预热次数")
+    parser.add_argument("--only", help="只运行指定用例，逗号分隔")
+    parser.add_argument("--output", help="结果 JSON 路径，默认 benchmarks/results/<时间>.json")
+    parser.add_argument("--compare", help="基线结果 JSON，中位耗时变慢超过 threshold 时返回非0")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定变慢的比例")
+    args = parser.parse_args(argv)
+
+    scale = SCALES[args.scale]
+    metrics = Metrics()
+    ops = {"latency": args.latency, "jitter": args.jitter, "days": scale["days"]}
+    td = THSData(ops=ops, ths_class=SyntheticTHS, pool_size=args.pool_size, typed=args.typed, metrics=metrics)
+    td.connect()
+
+    cases = build_cases(td, scale)
+    if args.only:
+        names = args.only.split(",")
+        unknown = set(names) - set(cases)
+        if unknown:
+            parser.error(f"未知用例: {', '.join(sorted(unknown))}")
+        cases = {name: cases[name] for name in names}
+
+    results = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "pandas": pd.__version__, "numpy": np.__version__,
+                        "thsdata": getattr(thsdata, "__version__", None)},
+        "config": {**vars(args), "scale_params": scale},
+        "cases": {},
+    }
+    try:
+        for name, fn in cases.items():
+            summary = run_case(fn, metrics, args.repeat, args.warmup)
+            results["cases"][name] = summary
+            phases = "  ".join(f"{phase}={seconds * 1e3:.2f}ms" for phase, seconds in summary["phases"].items())
+            print(f"{name:<24} rows={summary['rows']!s:<8} median={summary['median'] * 1e3:9.2f}ms  {phases}")
+    finally:
+        td.disconnect()
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"变慢: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
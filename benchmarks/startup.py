@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# File: startup.py
+# Description: Cold-start import time benchmark for the thsdata package, recorded as JSON.
+# Author: bensema
+# License: MIT
+#
+# 用法:
+#   python benchmarks/startup.py                              # 输出到 benchmarks/results/startup-<时间>.json
+#   python benchmarks/startup.py --compare benchmarks/results/startup-baseline.json --threshold 0.3
+
+import os
+import sys
+import json
+import platform
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# 每个场景在新进程中执行，测量导入及首次使用的耗时
+SCENARIOS = {
+    "import": "import thsdata",
+    "normalize_codes": "import thsdata; thsdata.normalize_codes(['600519', 'sz000001'])",
+    "THSData": "import thsdata; thsdata.THSData",
+    "star": "from thsdata import *",
+}
+
+# import thsdata 之后不应加载的模块
+HEAVY_MODULES = ("pandas", "requests", "pytz", "thsdk", "numpy")
+
+_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(code: str, repeat: int) -> Dict[str, object]:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    runs, loaded = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(code=code, heavy=HEAVY_MODULES)],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        runs.append(result["seconds"])
+        loaded = result["loaded"]
+    return {"min": min(runs), "median": statistics.median(runs), "max": max(runs), "loaded": loaded}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="thsdata 启动耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=10, help="每个场景启动进程的次数")
+    parser.add_argument("--output", help="结果 JSON 路径，默认 benchmarks/results/startup-<时间>.json")
+    parser.add_argument("--compare", help="基线结果 JSON，中位耗时变慢超过 threshold 时返回非0")
+    parser.add_argument("--threshold", type=float, default=0.3, help="判定变慢的比例")
+    args = parser.parse_args(argv)
+
+    results = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "config": vars(args),
+        "cases": {},
+    }
+    failed = []
+    for name, code in SCENARIOS.items():
+        summary = measure(code, args.repeat)
+        results["cases"][name] = summary
+        print(f"{name:<16} median={summary['median'] * 1e3:8.2f}ms  loaded={','.join(summary['loaded']) or '-'}")
+    if results["cases"]["import"]["loaded"]:
+        failed.append(f"import thsdata 加载了 {', '.join(results['cases']['import']['loaded'])}")
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("startup-%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, result in results["cases"].items():
+            base = baseline.get("cases", {}).get(name)
+            if base and base.get("median") and result["median"] > base["median"] * (1 + args.threshold):
+                failed.append(f"{name}: {base['median'] * 1e3:.2f}ms -> {result['median'] * 1e3:.2f}ms")
+
+    for line in failed:
+        print(f"变慢: {line}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
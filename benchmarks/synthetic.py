@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# File: synthetic.py
+# Description: Offline THS stand-in that generates realistic payloads for benchmarking THSData.
+# Author: bensema
+# License: MIT
+
+import time
+import zlib
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from thsdata.times import _int_2_time
+
+# id=200 datatype 对应的字段名，未列出的以 datatype 数字命名
+FIELDS = {
+    "5": "code", "55": "name", "10": "price", "6": "pre_close", "7": "open", "8": "high", "9": "low",
+    "13": "volume", "19": "turnover", "12": "deal_type", "69": "limit_up", "70": "limit_down",
+    "24": "bid1", "25": "bid1_vol", "26": "bid2", "27": "bid2_vol", "28": "bid3", "29": "bid3_vol",
+    "150": "bid4", "151": "bid4_vol", "154": "bid5", "155": "bid5_vol",
+    "30": "ask1", "31": "ask1_vol", "32": "ask2", "33": "ask2_vol", "34": "ask3", "35": "ask3_vol",
+    "152": "ask4", "153": "ask4_vol", "156": "ask5", "157": "ask5_vol",
+}
+
+DEFAULTS = {
+    "latency": 0.0,  # 每个请求的基础延迟(秒)
+    "jitter": 0.0,  # 延迟的随机波动(秒)
+    "days": 2500,  # 未指定起止时间时日K线的数量
+    "block_size": 5000,  # 板块/市场代码数量
+    "tick_seconds": 3,  # tick 快照间隔(秒)
+    "seed": 0,
+}
+
+
+class _Payload:
+    __slots__ = ("data",)
+
+    def __init__(self, data: Any):
+        self.data = data
+
+
+class _Response:
+    __slots__ = ("code", "message", "payload")
+
+    def __init__(self, data: Any, code: int = 0, message: str = ""):
+        self.code = code
+        self.message = message
+        self.payload = _Payload(data)
+
+
+def _trading_days(start: datetime, end: datetime) -> List[datetime]:
+    days = np.arange(np.datetime64(start.date()), np.datetime64(end.date()) + 1)
+    days = days[np.is_busday(days)]
+    return [datetime(d.year, d.month, d.day) for d in days.astype(object)]
+
+
+def _session_minutes(day: datetime) -> List[datetime]:
+    morning = [day + timedelta(hours=9, minutes=31 + i) for i in range(120)]
+    afternoon = [day + timedelta(hours=13, minutes=1 + i) for i in range(120)]
+    return morning + afternoon
+
+
+class SyntheticTHS:
+    """离线的 THS 替身，用于基准测试.
+
+    通过 ops 配置负载大小和延迟，例如 ``THSData(ops={"latency": 0.005}, ths_class=SyntheticTHS)``。
+    相同请求的负载只生成一次并缓存在类上，因此多次测量时请求阶段只包含延迟，
+    测得的是 THSData 自身的开销。
+    """
+
+    _cache: Dict[Any, Any] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, ops: Optional[Dict[str, Any]] = None):
+        self.ops = {**DEFAULTS, **(ops or {})}
+        self.connected = False
+        self._rng = np.random.default_rng(self.ops["seed"])
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+    def about(self) -> str:
+        return "synthetic THS for benchmarks"
+
+    # ---- 负载生成 ----
+
+    def _wait(self) -> None:
+        delay = self.ops["latency"]
+        if self.ops["jitter"]:
+            delay += self._rng.uniform(0, self.ops["jitter"])
+        if delay > 0:
+            time.sleep(delay)
+
+    def _cached(self, key: Any, build) -> Any:
+        key = (key, tuple(sorted((k, v) for k, v in self.ops.items() if k not in ("latency", "jitter"))))
+        data = self._cache.get(key)
+        if data is None:
+            data = build()
+            with self._cache_lock:
+                self._cache[key] = data
+        return data
+
+    @staticmethod
+    def _walk(code: str, n: int) -> np.ndarray:
+        """以代码为种子的价格随机游走."""
+        rng = np.random.default_rng(zlib.crc32(code.encode()))
+        base = 5 + rng.random() * 200
+        return np.round(base * np.exp(np.cumsum(rng.normal(0, 0.01, n))), 2)
+
+    def _bars(self, code: str, times: List[datetime]) -> List[dict]:
+        n = len(times)
+        close = self._walk(code, n)
+        rng = np.random.default_rng(zlib.crc32(code.encode()) + 1)
+        open_ = np.round(close * (1 + rng.normal(0, 0.003, n)), 2)
+        high = np.round(np.maximum(open_, close) * (1 + rng.random(n) * 0.01), 2)
+        low = np.round(np.minimum(open_, close) * (1 - rng.random(n) * 0.01), 2)
+        volume = rng.integers(1000, 5_000_000, n)
+        turnover = np.round(volume * close, 0)
+        return [{"time": t, "close": c, "volume": v, "turnover": a, "open": o, "high": h, "low": l}
+                for t, c, v, a, o, h, l in zip(times, close.tolist(), volume.tolist(), turnover.tolist(),
+                                                open_.tolist(), high.tolist(), low.tolist())]
+
+    def _bar_times(self, start: Any, end: Any, interval: int, count: int) -> List[datetime]:
+        if interval < 0x4000:
+            s, e = _int_2_time(start), _int_2_time(end)
+            return [t for day in _trading_days(s, e) for t in _session_minutes(day) if s <= t <= e]
+        if start and end:
+            days = _trading_days(datetime.strptime(str(start), "%Y%m%d"), datetime.strptime(str(end), "%Y%m%d"))
+        else:
+            n = count if count and count > 0 else self.ops["days"]
+            end_day = datetime(2025, 5, 15)
+            days = _trading_days(end_day - timedelta(days=n * 7 // 5 + 10), end_day)[-n:]
+        return days
+
+    def _ticks(self, code: str, start: int, end: int) -> List[dict]:
+        step = self.ops["tick_seconds"]
+        # 请求从 09:15 开始，保留 09:15-11:30、13:00-15:00 内的快照
+        times = np.arange(start, end + 1, step)
+        offset = times - start
+        times = times[(offset <= 8100) | ((offset >= 13500) & (offset <= 20703))]
+        n = len(times)
+        price = self._walk(code, n)
+        rng = np.random.default_rng(zlib.crc32(code.encode()) + 2)
+        cur_volume = rng.integers(0, 50, n) * 100
+        volume = np.cumsum(cur_volume)
+        turnover = np.round(np.cumsum(cur_volume * price), 2)
+        count = np.cumsum(rng.integers(0, 20, n))
+        return [{"time": t, "price": p, "volume": v, "turnover": a, "transaction_count": c, "cur_volume": cv}
+                for t, p, v, a, c, cv in zip(times.tolist(), price.tolist(), volume.tolist(), turnover.tolist(),
+                                             count.tolist(), cur_volume.tolist())]
+
+    def _snapshots(self, market: str, codes: List[str], datatypes: List[str]) -> List[dict]:
+        fields = [FIELDS.get(d, d) for d in datatypes if FIELDS.get(d) != "code"]
+        rows = []
+        for short_code in codes:
+            code = market + short_code
+            rng = np.random.default_rng(zlib.crc32(code.encode()))
+            price = round(5 + rng.random() * 200, 2)
+            row = {"code": code}
+            for field in fields:
+                if field == "name":
+                    row[field] = f"证券{short_code}"
+                elif field.endswith("_vol") or field == "volume":
+                    row[field] = int(rng.integers(1, 50000)) * 100
+                else:
+                    row[field] = round(price * (1 + rng.normal(0, 0.01)), 2)
+            rows.append(row)
+        return rows
+
+    def _codes(self, prefix: str) -> List[dict]:
+        return [{"code": f"{prefix}{600000 + i:06d}", "name": f"证券{i}"} for i in range(self.ops["block_size"])]
+
+    # ---- THS 接口 ----
+
+    def download(self, code, start, end, adjust, period, interval, count):
+        self._wait()
+        return _Response(self._cached(("download", code, start, end, adjust, interval, count),
+                                      lambda: self._bars(code, self._bar_times(start, end, interval, count))))
+
+    def security_bars(self, code, start, end, adjust, period):
+        self._wait()
+        return _Response(self._cached(("security_bars", code, start, end, adjust, period),
+                                      lambda: self._bars(code, self._bar_times(start, end, period, -1))))
+
+    def query_data(self, req, query_type="zhu"):
+        self._wait()
+        q = dict(p.split("=", 1) for p in req.split("&"))
+        q.pop("instance", None)
+        if q.get("id") in ("204", "205"):
+            code = q["market"] + q["code"]
+            data = self._cached(("ticks", code, q["start"], q["end"]),
+                                lambda: self._ticks(code, int(q["start"]), int(q["end"])))
+        elif "codelist" in q:
+            data = self._cached(("snapshot", q["market"], q["codelist"], q["datatype"]),
+                                lambda: self._snapshots(q["market"], q["codelist"].split(","),
+                                                        q["datatype"].split(",")))
+        else:
+            data = []
+        return _Response(data)
+
+    def get_block_data(self, block_id):
+        self._wait()
+        return _Response(self._cached(("block", block_id), lambda: self._codes("USHA")))
+
+    def get_block_components(self, block_code):
+        self._wait()
+        return _Response(self._cached(("components", block_code), lambda: self._codes("USHA")[:300]))
+
+    def wencai_base(self, condition):
+        self._wait()
+        return _Response([])
+
+    def wencai_nlp(self, condition):
+        self._wait()
+        return _Response([])
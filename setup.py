@@ -29,6 +29,10 @@ setup(
         'thsdk>=0.0.2',
         'pytz>=2025.1',
     ],
+    extras_require={
+        'arrow': ['pyarrow'],
+        'polars': ['polars'],
+    },
     keywords=['python', 'thsdata'],
     classifiers=[
         "Development Status :: 1 - Planning",
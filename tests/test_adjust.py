@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# File: test_adjust.py
+# Description: Local price adjustment factors, dtypes and corporate action failures.
+# Author: bensema
+# License: MIT
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from thsdata.adjust import EVENT_COLUMNS, adjust_bars
+
+
+def _bars(dtype="float64"):
+    return pd.DataFrame({
+        "time": pd.to_datetime(["2024-06-17", "2024-06-18", "2024-06-19", "2024-06-20"]),
+        "open": np.array([10.0, 10.0, 9.0, 9.0], dtype=dtype),
+        "high": np.array([10.0, 10.0, 9.0, 9.0], dtype=dtype),
+        "low": np.array([10.0, 10.0, 9.0, 9.0], dtype=dtype),
+        "close": np.array([10.0, 10.0, 9.0, 9.0], dtype=dtype),
+        "volume": [100, 100, 100, 100],
+    })
+
+
+# 2024-06-19 每股派现 1 元，前收盘 10 元，比例 0.9
+EVENTS = pd.DataFrame([[pd.Timestamp("2024-06-19"), 1.0, 0.0, 0.0, 0.0]], columns=EVENT_COLUMNS)
+
+
+def test_forward_and_backward_adjustment():
+    forward = adjust_bars(_bars(), EVENTS, "Q")
+    assert forward["close"].tolist() == pytest.approx([9.0, 9.0, 9.0, 9.0])
+    backward = adjust_bars(_bars(), EVENTS, "B")
+    assert backward["close"].tolist() == pytest.approx([10.0, 10.0, 10.0, 10.0])
+    assert forward["volume"].tolist() == [100] * 4
+
+
+def test_float32_prices_stay_float32():
+    result = adjust_bars(_bars("float32"), EVENTS, "Q")
+    for col in ("open", "high", "low", "close"):
+        assert result[col].dtype == np.float32
+    assert result["close"].tolist() == pytest.approx([9.0] * 4)
+
+
+def test_download_adjusted_raises_when_corporate_action_fails():
+    thsdk = pytest.importorskip("thsdk")
+    if not hasattr(thsdk, "THS"):
+        pytest.skip("thsdk.THS 不可用")
+    from thsdata import THSData
+
+    class _Payload:
+        def __init__(self, data):
+            self.data = data
+
+    class _Response:
+        def __init__(self, data, code=0, message=""):
+            self.code, self.message, self.payload = code, message, _Payload(data)
+
+    class Session:
+        def __init__(self, ops=None):
+            pass
+
+        def connect(self):
+            pass
+
+        def disconnect(self):
+            pass
+
+        def download(self, code, start, end, adjust, period, interval, count):
+            return _Response([{"time": 20240618, "open": 10.0, "high": 10.0, "low": 10.0, "close": 10.0,
+                               "volume": 1, "turnover": 1.0}])
+
+        def query_data(self, req, query_type="zhu"):
+            return _Response(None, code=-1, message="server busy")
+
+    td = THSData(ths_class=Session, reconnect=False)
+    td.connect()
+    with pytest.raises(ValueError):
+        td.download_adjusted("600519", adjust="Q")
+    assert len(td.download_adjusted("600519", adjust="")) == 1
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# File: test_aio.py
+# Description: AsyncTHSData lifecycle, option forwarding and limits against a stand-in THS session.
+# Author: bensema
+# License: MIT
+
+import asyncio
+import time
+
+import pytest
+
+thsdk = pytest.importorskip("thsdk")
+if not hasattr(thsdk, "THS"):
+    pytest.skip("thsdk.THS 不可用", allow_module_level=True)
+
+from thsdata import AsyncTHSData
+from thsdata.metrics import Metrics
+
+
+class _Payload:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Response:
+    def __init__(self, data, code=0, message=""):
+        self.code = code
+        self.message = message
+        self.payload = _Payload(data)
+
+
+class Session:
+    delay = 0.0
+
+    def __init__(self, ops=None):
+        self.connected = False
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+    def download(self, code, start, end, adjust, period, interval, count):
+        time.sleep(self.delay)
+        return _Response([{"time": 20250411, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+                           "volume": 1, "turnover": 1.0}])
+
+
+class SlowSession(Session):
+    delay = 0.3
+
+
+def test_reconnect_after_disconnect():
+    async def main():
+        td = AsyncTHSData(ths_class=Session, pool_size=2)
+        async with td:
+            assert len(await td.download("600519", count=1)) == 1
+        async with td:
+            assert len(await td.download("600519", count=1)) == 1
+
+    asyncio.run(main())
+
+
+def test_thsdata_options_are_forwarded():
+    metrics = Metrics()
+    td = AsyncTHSData(ths_class=Session, typed=True, coalesce=False, reconnect=False, metrics=metrics)
+    assert td.td.typed and td.td._flight is None and td.td.reconnect is None and td.td.metrics is metrics
+
+    async def main():
+        async with td:
+            return await td.download("600519", count=1)
+
+    assert str(asyncio.run(main())["volume"].dtype) == "Int64"
+    assert metrics.calls["download"] == 1
+
+
+def test_async_iterator_honours_timeout():
+    async def main():
+        td = AsyncTHSData(ths_class=SlowSession, pool_size=2, timeout=0.05)
+        async with td:
+            with pytest.raises(asyncio.TimeoutError):
+                async for _ in td.iter_download(["600519", "000001"], count=1):
+                    pass
+
+    asyncio.run(main())
+
+
+def test_async_iterator_honours_max_concurrency():
+    async def main():
+        td = AsyncTHSData(ths_class=Session, pool_size=2, max_concurrency=1)
+        async with td:
+            await td._semaphore.acquire()
+            try:
+                iterator = td.iter_download(["600519"], count=1).__aiter__()
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(iterator.__anext__(), 0.2)
+            finally:
+                td._semaphore.release()
+            codes = [code async for code, _ in td.iter_download(["600519"], count=1)]
+            assert codes == ["USHA600519"]
+
+    asyncio.run(main())
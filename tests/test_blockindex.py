@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# File: test_blockindex.py
+# Description: BlockIndex build and incremental update with a stand-in THSData.
+# Author: bensema
+# License: MIT
+
+import pandas as pd
+
+from thsdata.blockindex import BlockIndex
+
+
+class StubTHSData:
+    """板块列表和成分股替身，成分股为 None 时模拟查询出错，为异常时抛出."""
+
+    def __init__(self, blocks, members):
+        self.blocks = blocks
+        self.members = members
+
+    def _list_frame(self, name, *args):
+        if name == "ths_block_components":
+            codes = self.members[args[0]]
+            if isinstance(codes, Exception):
+                raise codes
+            if codes is None:
+                return None
+        else:
+            codes = self.blocks.get(name, [])
+        return pd.DataFrame({"code": codes, "name": [f"名称{c}" for c in codes]}, columns=["code", "name"])
+
+    def _pooled_map(self, fn, items, max_workers=None):
+        for item in items:
+            try:
+                yield item, fn(item), None
+            except Exception as e:
+                yield item, None, e
+
+
+def test_build_and_lookup():
+    td = StubTHSData({"ths_industry_block": ["URFI881273"], "ths_concept_block": ["URFI885001"]},
+                     {"URFI881273": ["USHA600519"], "URFI885001": ["USHA600519", "USZA000001"]})
+    index = BlockIndex.build(td, kinds=["industry", "concept"])
+
+    assert index.lookup("USHA600519") == {"industry": ["URFI881273"], "sub_industry": [],
+                                          "concept": ["URFI885001"]}
+    assert index.members("URFI885001") == ["USHA600519", "USZA000001"]
+
+
+def test_failed_new_block_is_retried_on_next_update():
+    td = StubTHSData({"ths_concept_block": ["URFI885001", "URFI885002", "URFI885003"]},
+                     {"URFI885001": ["USHA600519"], "URFI885002": None,
+                      "URFI885003": ConnectionError("reset")})
+    index = BlockIndex()
+
+    result = index.update(td, kinds=["concept"])
+    assert result["added"] == ["URFI885001"]
+    assert result["failed"] == ["URFI885002", "URFI885003"]
+    assert "URFI885002" not in index.blocks and "URFI885003" not in index.blocks
+
+    td.members.update({"URFI885002": ["USZA000001"], "URFI885003": []})
+    result = index.update(td, kinds=["concept"])
+    assert result["added"] == ["URFI885002", "URFI885003"]
+    assert result["refreshed"] == ["URFI885002", "URFI885003"]
+    assert index.blocks_of("USZA000001") == ["URFI885002"]
+    assert index.members("URFI885003") == []
+
+
+def test_failed_refresh_keeps_existing_members():
+    td = StubTHSData({"ths_industry_block": ["URFI881273"]}, {"URFI881273": ["USHA600519"]})
+    index = BlockIndex.build(td, kinds=["industry"])
+
+    td.members["URFI881273"] = None
+    result = index.update(td, kinds=["industry"], refresh_existing=True)
+    assert result["failed"] == ["URFI881273"]
+    assert index.members("URFI881273") == ["USHA600519"]
+
+
+def test_removed_block_is_dropped():
+    td = StubTHSData({"ths_industry_block": ["URFI881273", "URFI881274"]},
+                     {"URFI881273": ["USHA600519"], "URFI881274": ["USZA000001"]})
+    index = BlockIndex.build(td, kinds=["industry"])
+
+    td.blocks["ths_industry_block"] = ["URFI881273"]
+    result = index.update(td, kinds=["industry"])
+    assert result["removed"] == ["URFI881274"]
+    assert "USZA000001" not in index
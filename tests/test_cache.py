@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# File: test_cache.py
+# Description: KlineCache gap fill, overlap check and interval coverage with a stand-in fetcher.
+# Author: bensema
+# License: MIT
+
+import os
+
+import pandas as pd
+
+from thsdata.cache import KlineCache
+
+DAY, WEEK = 0x4000, 0x5001
+
+
+class Server:
+    """按交易日生成日K线的替身，scale 改变后模拟复权价格变化."""
+
+    def __init__(self):
+        self.scale = 1.0
+        self.calls = []
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        days = pd.bdate_range(start.normalize(), end.normalize())
+        return pd.DataFrame({"time": days, "close": days.dayofyear * self.scale, "volume": days.day * 100})
+
+
+def test_week_and_above_are_not_cached(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    server = Server()
+
+    # 未走完的周K线以最新交易日为时间，之后时间会变，不能写入缓存
+    for _ in range(2):
+        assert cache.fetch("download", "USHA600519", 20241007, 20241014, WEEK, "", server) is None
+
+    assert server.calls == []
+    assert not any(files for _, _, files in os.walk(tmp_path))
+
+
+def test_tail_overlap_extends_without_duplicates(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    server = Server()
+    first = cache.fetch("download", "USHA600519", 20240101, 20240131, DAY, "", server)
+    assert len(first) == len(pd.bdate_range("2024-01-01", "2024-01-31"))
+
+    data = cache.fetch("download", "USHA600519", 20240101, 20240229, DAY, "", server)
+
+    # 向后补数从本地最后一根K线开始请求
+    assert server.calls[-1][0] == pd.Timestamp("2024-01-31")
+    assert data["time"].is_unique
+    assert len(data) == len(pd.bdate_range("2024-01-01", "2024-02-29"))
+
+
+def test_changed_overlap_bar_triggers_full_refetch(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    server = Server()
+    cache.fetch("download", "USHA600519", 20240101, 20240131, DAY, "Q", server)
+
+    server.scale = 0.5  # 分红后前复权价格整体变化
+    data = cache.fetch("download", "USHA600519", 20240101, 20240229, DAY, "Q", server)
+
+    assert server.calls[-1] == (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-29"))
+    assert data["time"].is_unique
+    expected = server(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-29"))
+    assert data["close"].tolist() == expected["close"].tolist()
+
+
+def test_cached_range_is_served_locally(tmp_path):
+    cache = KlineCache(str(tmp_path))
+    server = Server()
+    cache.fetch("download", "USHA600519", 20240101, 20240229, DAY, "", server)
+    calls = len(server.calls)
+
+    data = cache.fetch("download", "USHA600519", 20240201, 20240215, DAY, "", server)
+
+    assert len(server.calls) == calls
+    assert data["time"].min() == pd.Timestamp("2024-02-01")
+    assert data["time"].max() == pd.Timestamp("2024-02-15")
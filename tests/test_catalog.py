@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# File: test_catalog.py
+# Description: Catalog refresh, failure handling and change detection with a stand-in THSData.
+# Author: bensema
+# License: MIT
+
+import pandas as pd
+
+from thsdata.catalog import Catalog
+
+
+class StubTHSData:
+    """按 lists 返回列表的 THSData 替身，值为 None 时模拟查询出错."""
+
+    def __init__(self, lists):
+        self.lists = lists
+        self.calls = 0
+
+    def _list_frame(self, name, *args):
+        self.calls += 1
+        codes = self.lists[(name, *args)]
+        if codes is None:
+            return None
+        return pd.DataFrame({"code": codes, "name": [f"证券{c}" for c in codes]}, columns=["code", "name"])
+
+
+def test_failed_refresh_keeps_old_list():
+    td = StubTHSData({("stock_codes",): ["USHA600519", "USZA000001"]})
+    catalog = Catalog(td, ttl=0)
+    assert catalog.stock_codes()["code"].tolist() == ["USHA600519", "USZA000001"]
+
+    td.lists[("stock_codes",)] = None
+    diff = catalog.refresh("stock_codes")[("stock_codes",)]
+    assert not diff.changed
+    assert catalog.stock_codes()["code"].tolist() == ["USHA600519", "USZA000001"]
+
+
+def test_list_that_became_empty_is_updated(tmp_path):
+    changes = []
+    td = StubTHSData({("ths_block_components", "URFI881157"): ["USHA600519"]})
+    catalog = Catalog(td, ttl=3600, cache_dir=str(tmp_path), on_change=changes.append)
+    assert len(catalog.ths_block_components("URFI881157")) == 1
+
+    td.lists[("ths_block_components", "URFI881157")] = []
+    diff = catalog.refresh("ths_block_components", "URFI881157")[("ths_block_components", "URFI881157")]
+
+    assert diff.removed == ["USHA600519"]
+    assert changes == [diff]
+    assert catalog.ths_block_components("URFI881157").empty
+    # 空列表同样写入磁盘，新实例直接读取而不再请求
+    calls = td.calls
+    assert Catalog(td, ttl=3600, cache_dir=str(tmp_path)).ths_block_components("URFI881157").empty
+    assert td.calls == calls
+
+
+def test_never_fetched_list_is_empty_frame():
+    catalog = Catalog(StubTHSData({("etf_codes",): None}))
+    assert catalog.etf_codes().empty
+    assert catalog._get("etf_codes") is None
+
+
+def test_get_returns_a_copy():
+    td = StubTHSData({("stock_codes",): ["USHA600519"]})
+    catalog = Catalog(td, ttl=3600)
+    data = catalog.stock_codes()
+    data.loc[0, "code"] = "changed"
+    data.drop(columns="name", inplace=True)
+
+    assert catalog.stock_codes()["code"].tolist() == ["USHA600519"]
+    assert "name" in catalog.stock_codes().columns
+    assert td.calls == 1
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# File: test_codes.py
+# Description: Single and vectorized code normalization must agree on every input.
+# Author: bensema
+# License: MIT
+
+import pandas as pd
+import pytest
+
+from thsdata.codes import MARKET_TABLE, InvalidCodeError, _normalize_code, normalize_codes
+
+VALID = {
+    "600519": "USHA600519", "688981": "USHA688981", "000001": "USZA000001", "300750": "USZA300750",
+    "830799": "USTM830799", "430047": "USTM430047", "113050": "USZD113050", "127045": "USHD127045",
+    "510300": "USHJ510300", "159915": "USZJ159915",
+    "sh600519": "USHA600519", "SZ000001": "USZA000001", "bj830799": "USTM830799",
+    "600519sh": "USHA600519", "000001SZ": "USZA000001", "830799BJ": "USTM830799",
+    "SH.600519": "USHA600519", "sz.000001": "USZA000001", "BJ.830799": "USTM830799",
+    "600519.SH": "USHA600519", "000001.sz": "USZA000001",
+    "USHA600519": "USHA600519", "usza000001": "USZA000001", "URFI881273": "URFI881273",
+}
+
+INVALID = [
+    "abc", "", "60051", "6005190", "ABCDEF", "700000", "SX600519", "600519XX", "SH600A19",
+    "SH-600519", "600519.BJ", "600519_SH", "USH600519", "USHA60051X", "1SHA600519", "USHA6005190",
+    "中文代码",
+]
+
+
+def _scalar(code):
+    try:
+        return _normalize_code(code)
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize("code, expected", VALID.items())
+def test_valid_codes(code, expected):
+    assert _normalize_code(code) == expected
+    assert normalize_codes([code]) == [expected]
+
+
+@pytest.mark.parametrize("code", INVALID)
+def test_invalid_codes_rejected_by_both_paths(code):
+    with pytest.raises(InvalidCodeError):
+        _normalize_code(code)
+    with pytest.raises(InvalidCodeError):
+        normalize_codes([code])
+    assert normalize_codes([code], errors="coerce") == [None]
+
+
+def test_every_prefix_agrees():
+    codes = [f"{i:03d}{j:03d}" for i in range(1000) for j in (0, 519)]
+    codes += [p + c for c in codes[::50] for p in ("SH", "sz.", "")] + [c + ".SH" for c in codes[::50]]
+
+    assert normalize_codes(codes, errors="coerce") == [_scalar(c) for c in codes]
+    assert sum(bool(m) for m in MARKET_TABLE) == len({c[:3] for c in codes if _scalar(c) and len(c) == 6})
+
+
+def test_round_trip_is_stable():
+    normalized = normalize_codes(list(VALID))
+    assert normalize_codes(normalized) == normalized
+    assert [_normalize_code(c) for c in normalized] == normalized
+
+
+def test_series_keeps_index_and_reports_invalid_labels():
+    codes = pd.Series(["600519", "abc", "000001.SZ", "SX600519"], index=["a", "b", "c", "d"])
+    with pytest.raises(InvalidCodeError) as info:
+        normalize_codes(codes)
+    assert info.value.invalid == {"b": "abc", "d": "SX600519"}
+
+    result = normalize_codes(codes, errors="coerce")
+    assert result.index.tolist() == ["a", "b", "c", "d"]
+    assert result.tolist() == [_scalar(c) for c in codes]
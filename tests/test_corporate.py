@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# File: test_corporate.py
+# Description: Parsing of corporate_action text into per-share cash, share and rights columns.
+# Author: bensema
+# License: MIT
+
+import pandas as pd
+import pytest
+
+from thsdata.corporate import ACTION_COLUMNS, parse_corporate_actions
+
+
+def _actions(*texts, codes=None):
+    data = pd.DataFrame({"时间": [20240101] * len(texts), "权息资料": list(texts)})
+    if codes is not None:
+        data["code"] = codes
+    return data
+
+
+def _row(result, i=0):
+    return result.iloc[i][["cash", "bonus", "conversion", "rights", "rights_price",
+                           "consideration_cash", "consideration_shares"]].tolist()
+
+
+def test_per_ten_shares_is_scaled_to_per_share():
+    result = parse_corporate_actions(_actions("2002-07-25(每十股 转增1.00股 红利6.00元)$"), code="USHA600519")
+
+    assert result.columns.tolist() == ACTION_COLUMNS
+    assert result["code"].tolist() == ["USHA600519"]
+    assert result["ex_date"].tolist() == [pd.Timestamp("2002-07-25")]
+    assert _row(result) == pytest.approx([0.6, 0.0, 0.1, 0.0, 0.0, 0.0, 0.0])
+    assert result["text"].tolist() == ["每十股 转增1.00股 红利6.00元"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2024-06-19(每十股 红利308.76元)$", 30.876),
+    ("2024-06-19(每10股 红利308.76元)$", 30.876),
+    ("2024-06-19(每股 红利3.0876元)$", 3.0876),
+    ("2024-06-19(每 股 派3.0876元)$", 3.0876),
+])
+def test_per_share_base(text, expected):
+    result = parse_corporate_actions(_actions(text), code="USHA600519")
+    assert result["cash"].tolist() == pytest.approx([expected])
+
+
+def test_several_events_in_one_row():
+    text = "2003-07-14(每十股 送1.00股 红利2.00元)$2004-07-01(每股 转增0.30股 红利0.30元)$"
+    result = parse_corporate_actions(_actions(text, "2005-08-05(每十股 红利5.00元)$"), code="USHA600519")
+
+    assert result["ex_date"].dt.strftime("%Y-%m-%d").tolist() == ["2003-07-14", "2004-07-01", "2005-08-05"]
+    assert _row(result, 0) == pytest.approx([0.2, 0.1, 0.0, 0.0, 0.0, 0.0, 0.0])
+    assert _row(result, 1) == pytest.approx([0.3, 0.0, 0.3, 0.0, 0.0, 0.0, 0.0])
+    assert _row(result, 2) == pytest.approx([0.5, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+
+
+@pytest.mark.parametrize("text", [
+    "1999-03-10(每十股 配3.00股 配股价10.50元)$",
+    "1999-03-10(每十股 配股3.00股 配股价10.50元)$",
+    "1999-03-10(每十股 配股价10.50元 配3.00股)$",
+])
+def test_rights_price_is_not_counted_as_rights_shares(text):
+    result = parse_corporate_actions(_actions(text), code="USZA000001")
+    # 配股数量按每股折算，配股价保持每股价格
+    assert result["rights"].tolist() == pytest.approx([0.3])
+    assert result["rights_price"].tolist() == pytest.approx([10.5])
+    assert result["cash"].tolist() == [0.0]
+
+
+def test_consideration_row():
+    text = "2006-05-25(  每10股对价现金41.3200元 ,每10股对价股票12.4000股)$"
+    result = parse_corporate_actions(_actions(text), code="USHA600519")
+
+    assert _row(result) == pytest.approx([0.0, 0.0, 0.0, 0.0, 0.0, 4.132, 1.24])
+    assert result["text"].tolist() == ["每10股对价现金41.3200元 ,每10股对价股票12.4000股"]
+
+
+def test_code_column_and_rows_without_events():
+    actions = _actions("2024-06-19(每十股 红利308.76元)$", "", "2024-06-20(每十股 红利10.00元)$",
+                       codes=["USHA600519", "USZA000001", "USZA000002"])
+    result = parse_corporate_actions(actions)
+
+    assert result["code"].tolist() == ["USHA600519", "USZA000002"]
+    assert result["cash"].tolist() == pytest.approx([30.876, 1.0])
+
+
+def test_empty_input():
+    assert parse_corporate_actions(None).columns.tolist() == ACTION_COLUMNS
+    assert parse_corporate_actions(_actions()).empty
+    assert parse_corporate_actions(_actions("无权息资料")).empty
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# File: test_governor.py
+# Description: Token bucket, AIMD concurrency limit and per-endpoint budgets with a fake clock.
+# Author: bensema
+# License: MIT
+
+import threading
+import time
+
+import pytest
+
+from thsdata import governor
+from thsdata.governor import AIMDLimiter, Governor, TokenBucket
+
+
+class FakeClock:
+    """替换 governor 模块的 time，sleep 直接推进时间."""
+
+    def __init__(self):
+        # 只使用二进制可精确表示的时间，避免浮点误差影响令牌计数
+        self.now = 1024.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(governor, "time", fake)
+    return fake
+
+
+class _Response:
+    def __init__(self, code=0):
+        self.code = code
+
+
+def test_token_bucket_burst_then_rate(clock):
+    bucket = TokenBucket(rate=8, burst=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == 0.125
+    clock.now += 0.25
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.125
+    # 积累不超过 burst
+    clock.now += 100
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() > 0
+
+
+def test_token_bucket_rejects_bad_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def _run(limiter, latency, ok=True):
+    limiter.acquire()
+    limiter.release(latency, ok)
+
+
+def test_aimd_additive_increase_and_cap(clock):
+    limiter = AIMDLimiter(max_concurrency=4, initial=2)
+    _run(limiter, 0.1)
+    assert limiter.limit == pytest.approx(2.5)
+    for _ in range(50):
+        _run(limiter, 0.1)
+    assert limiter.limit == 4.0
+    assert limiter.baseline == pytest.approx(0.1)
+
+
+def test_aimd_decrease_on_error_and_slow_calls_with_cooldown(clock):
+    limiter = AIMDLimiter(max_concurrency=8, min_concurrency=2, cooldown=1.0)
+    _run(limiter, 0.1)
+    assert limiter.limit == 8.0
+
+    _run(limiter, 0.1, ok=False)
+    assert limiter.limit == 4.0
+    # 冷却期内不再下调
+    _run(limiter, 0.5)
+    assert limiter.limit == 4.0
+
+    clock.now += 1.0
+    _run(limiter, 0.5)
+    assert limiter.limit == 2.0
+    baseline = limiter.baseline
+    clock.now += 1.0
+    _run(limiter, 0.01, ok=False)
+    assert limiter.limit == 2.0
+    # 失败的请求不更新基准耗时
+    assert limiter.baseline == baseline
+
+
+def test_aimd_target_latency_and_baseline_drift(clock):
+    limiter = AIMDLimiter(max_concurrency=8, target_latency=1.0, cooldown=0)
+    _run(limiter, 0.9)
+    assert limiter.limit == 8.0
+    _run(limiter, 1.1)
+    assert limiter.limit == 4.0
+
+    limiter = AIMDLimiter(max_concurrency=8)
+    _run(limiter, 0.1)
+    _run(limiter, 0.19)
+    # 基准只缓慢向上跟随
+    assert 0.1 < limiter.baseline < 0.101
+
+
+def test_aimd_rejects_bad_bounds():
+    with pytest.raises(ValueError):
+        AIMDLimiter(max_concurrency=1, min_concurrency=2)
+    with pytest.raises(ValueError):
+        AIMDLimiter(min_concurrency=0)
+
+
+def test_aimd_limits_concurrency():
+    limiter = AIMDLimiter(max_concurrency=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def work():
+        limiter.acquire()
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        limiter.release(0.02, True)
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+    assert limiter.inflight == 0
+
+
+def test_governor_budgets_and_stats(clock):
+    gov = Governor(rate=100, max_concurrency=4, cooldown=0, budgets={"download": {"max_concurrency": 2}})
+
+    assert gov.call("query_data", lambda: _Response()).code == 0
+    assert gov.call("query_data", lambda: _Response(code=-1)).code == -1
+    with pytest.raises(ConnectionError):
+        gov.call("query_data", lambda: (_ for _ in ()).throw(ConnectionError("reset")))
+    assert gov.call("download", lambda: "raw") == "raw"
+
+    stats = gov.stats()
+    assert stats["query_data"]["calls"] == 3
+    assert stats["query_data"]["errors"] == 2
+    assert stats["query_data"]["limit"] == 1.0
+    assert stats["query_data"]["inflight"] == 0
+    assert stats["download"]["limit"] == 2.0
+    assert stats["download"]["errors"] == 0
+
+
+def test_governor_rate_limit_is_per_endpoint(clock):
+    gov = Governor(rate=2, budgets={"download": {"rate": None}})
+    for _ in range(4):
+        gov.call("query_data", lambda: None)
+        gov.call("download", lambda: None)
+
+    stats = gov.stats()
+    assert stats["query_data"]["throttled"] == pytest.approx(1.0)
+    assert stats["download"]["throttled"] == 0.0
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# File: test_pool.py
+# Description: Pooled downloads combined with request coalescing against a stand-in THS session.
+# Author: bensema
+# License: MIT
+
+import threading
+import time
+
+import pytest
+
+thsdk = pytest.importorskip("thsdk")
+if not hasattr(thsdk, "THS"):
+    pytest.skip("thsdk.THS 不可用", allow_module_level=True)
+
+from thsdata import THSData
+
+
+class _Payload:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Response:
+    def __init__(self, data, code=0, message=""):
+        self.code = code
+        self.message = message
+        self.payload = _Payload(data)
+
+
+class SlowSession:
+    """每次请求耗时 delay 秒的会话替身."""
+
+    delay = 0.005
+
+    def __init__(self, ops=None):
+        self.connected = False
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+    def download(self, code, start, end, adjust, period, interval, count):
+        time.sleep(self.delay)
+        return _Response([{"time": 20250411, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+                           "volume": 1, "turnover": 1.0}])
+
+
+def _run(target, timeout):
+    errors = []
+
+    def wrapper():
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=wrapper, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "请求死锁"
+    assert not errors, errors
+
+
+def test_download_many_with_concurrent_outside_calls_does_not_deadlock():
+    td = THSData(ths_class=SlowSession, pool_size=2, coalesce=True)
+    td.connect()
+    codes = [f"USHA60{i:04d}" for i in range(8)]
+
+    def workload():
+        stop = threading.Event()
+
+        def outside():
+            while not stop.is_set():
+                for code in codes:
+                    td.download(code, count=1)
+
+        threads = [threading.Thread(target=outside, daemon=True) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        try:
+            for _ in range(20):
+                result = td.download_many(codes, count=1)
+                assert list(result) == codes
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    _run(workload, timeout=20)
+
+
+def test_outside_calls_for_the_same_key_are_coalesced():
+    SlowSession.delay = 0.05
+    try:
+        td = THSData(ths_class=SlowSession, pool_size=4, coalesce=True)
+        td.connect()
+        barrier = threading.Barrier(4)
+
+        def call():
+            barrier.wait()
+            td.download("USHA600519", count=1)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert td._flight.shared > 0
+    finally:
+        SlowSession.delay = 0.005
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# File: test_reconnect.py
+# Description: Drop/reconnect and keepalive behaviour against a stand-in THS session.
+# Author: bensema
+# License: MIT
+
+import threading
+import time
+
+import pytest
+
+thsdk = pytest.importorskip("thsdk")
+if not hasattr(thsdk, "THS"):
+    pytest.skip("thsdk.THS 不可用", allow_module_level=True)
+
+from thsdata import THSData
+from thsdata.reconnect import ReconnectPolicy
+
+
+class _Payload:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Response:
+    def __init__(self, data, code=0, message=""):
+        self.code = code
+        self.message = message
+        self.payload = _Payload(data)
+
+
+class FlakySession:
+    """断线后请求抛出 ConnectionError，直到重新 connect；记录同时进行的调用数."""
+
+    instances = []
+
+    def __init__(self, ops=None):
+        self.connected = False
+        self.connects = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        FlakySession.instances.append(self)
+
+    def connect(self):
+        self.connected = True
+        self.connects += 1
+
+    def disconnect(self):
+        self.connected = False
+
+    def drop(self):
+        self.connected = False
+
+    def _call(self, data, delay=0.0):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(delay)
+            if not self.connected:
+                raise ConnectionError("connection reset")
+            return _Response(data)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def query_data(self, req, query_type="zhu"):
+        return self._call([{"code": "USHI1A0001", "price": 1.0}])
+
+    def download(self, code, start, end, adjust, period, interval, count):
+        return self._call([{"time": 20250411, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+                            "volume": 1, "turnover": 1.0}], delay=0.02)
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    FlakySession.instances.clear()
+
+
+def test_dropped_session_is_reconnected_and_request_replayed():
+    td = THSData(ths_class=FlakySession, reconnect=ReconnectPolicy(retries=3, backoff=0))
+    td.connect()
+    session = FlakySession.instances[0]
+    session.drop()
+
+    data = td.download("USHA600519", count=1)
+
+    assert len(data) == 1
+    assert session.connects == 2
+    assert td._health.reconnects == 1
+
+
+def test_disconnect_raises_when_reconnect_disabled():
+    td = THSData(ths_class=FlakySession, reconnect=False)
+    td.connect()
+    FlakySession.instances[0].drop()
+    with pytest.raises(ConnectionError):
+        td.download("USHA600519", count=1)
+
+
+def test_health_check_never_probes_a_session_in_use():
+    td = THSData(ths_class=FlakySession, reconnect=ReconnectPolicy(backoff=0))
+    td.connect()
+    session = FlakySession.instances[0]
+    stop = threading.Event()
+
+    def worker():
+        while not stop.is_set():
+            td.download("USHA600519", count=1)
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    try:
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            td.health_check()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    assert session.max_active == 1
+
+
+def test_keepalive_reconnects_idle_session():
+    td = THSData(ths_class=FlakySession, reconnect=ReconnectPolicy(backoff=0, keepalive=0.05))
+    td.connect()
+    session = FlakySession.instances[0]
+    try:
+        session.drop()
+        deadline = time.monotonic() + 2
+        while not session.connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert session.connected
+    finally:
+        td.disconnect()
+
+
+def test_other_os_errors_fail_fast():
+    class BrokenSession(FlakySession):
+        def download(self, *args):
+            raise FileNotFoundError("missing")
+
+    td = THSData(ths_class=BrokenSession, reconnect=ReconnectPolicy(backoff=1))
+    td.connect()
+    start = time.monotonic()
+    with pytest.raises(FileNotFoundError):
+        td.download("USHA600519", count=1)
+    assert time.monotonic() - start < 0.5
+    assert FlakySession.instances[0].connects == 1
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# File: test_resample.py
+# Description: Session-aware resampling labels and OHLCV at the A-share session boundaries.
+# Author: bensema
+# License: MIT
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from thsdata.resample import resample_all, resample_bars
+
+MIN_1, MIN_5, MIN_30, MIN_60, MIN_120, DAY = 0x3001, 0x3005, 0x301e, 0x303c, 0x3078, 0x4000
+DATE = pd.Timestamp("2025-04-11")
+
+
+def _minutes(extra=()):
+    """一个交易日的1分钟K线 09:31-11:30、13:01-15:00，第 i 根价格为 i、成交量为 1."""
+    times = list(pd.date_range(DATE + pd.Timedelta("09:31:00"), DATE + pd.Timedelta("11:30:00"), freq="min"))
+    times += list(pd.date_range(DATE + pd.Timedelta("13:01:00"), DATE + pd.Timedelta("15:00:00"), freq="min"))
+    times = sorted(times + [DATE + pd.Timedelta(t) for t in extra])
+    price = np.arange(len(times), dtype=float)
+    return pd.DataFrame({"time": times, "open": price, "high": price + 0.5, "low": price - 0.5, "close": price,
+                         "volume": np.ones(len(times), dtype=np.int64), "turnover": price * 10})
+
+
+def _expected(bars, label_of):
+    """按 label_of(时间) 分组的期望结果."""
+    labels = bars["time"].map(label_of)
+    return bars.groupby(labels).agg(open=("open", "first"), high=("high", "max"), low=("low", "min"),
+                                    close=("close", "last"), volume=("volume", "sum"),
+                                    turnover=("turnover", "sum"))
+
+
+def _at(clock):
+    return DATE + pd.Timedelta(clock)
+
+
+@pytest.mark.parametrize("interval, labels", [
+    (MIN_5, ["09:35", "09:40", "11:30", "13:05", "15:00"]),
+    (MIN_30, ["10:00", "10:30", "11:00", "11:30", "13:30", "14:00", "14:30", "15:00"]),
+    (MIN_60, ["10:30", "11:30", "14:00", "15:00"]),
+    (MIN_120, ["11:30", "15:00"]),
+])
+def test_bucket_labels(interval, labels):
+    result = resample_bars(_minutes(), interval)
+    assert len(result) == 240 // {MIN_5: 5, MIN_30: 30, MIN_60: 60, MIN_120: 120}[interval]
+    assert result["time"].is_monotonic_increasing
+    for clock in labels:
+        assert _at(clock + ":00") in set(result["time"])
+
+
+@pytest.mark.parametrize("interval, minutes", [(MIN_5, 5), (MIN_30, 30), (MIN_60, 60), (MIN_120, 120)])
+def test_ohlcv_matches_reference_buckets(interval, minutes):
+    bars = _minutes()
+
+    def label_of(t):
+        clock = t.hour * 60 + t.minute
+        index = clock - (9 * 60 + 30) if clock <= 11 * 60 + 30 else clock - 13 * 60 + 120
+        end = -(-index // minutes) * minutes
+        clock = 9 * 60 + 30 + end if end <= 120 else 13 * 60 + end - 120
+        return DATE + pd.Timedelta(minutes=clock)
+
+    result = resample_bars(bars, interval).set_index("time")
+    expected = _expected(bars, label_of)
+    pd.testing.assert_frame_equal(result, expected, check_names=False, check_dtype=False)
+
+
+def test_session_boundaries():
+    # 09:31 为第一根，11:30 为上午最后一根，13:01 为下午第一根，15:00 为最后一根
+    result = resample_bars(_minutes(), MIN_5).set_index("time")
+    first, noon, afternoon, last = (result.loc[_at(t)] for t in ("09:35:00", "11:30:00", "13:05:00", "15:00:00"))
+    assert (first["open"], first["close"], first["volume"]) == (0, 4, 5)
+    assert (noon["open"], noon["close"], noon["volume"]) == (115, 119, 5)
+    assert (afternoon["open"], afternoon["close"], afternoon["volume"]) == (120, 124, 5)
+    assert (last["open"], last["close"], last["volume"]) == (235, 239, 5)
+
+
+def test_out_of_session_bars_fold_into_neighbours():
+    bars = _minutes(extra=["09:30:00", "13:00:00", "15:05:00"])
+    result = resample_bars(bars, MIN_5).set_index("time")
+
+    assert len(result) == 48
+    # 09:30 开盘K线并入 09:35，13:00 并入 11:30，15:05 盘后并入 15:00
+    assert result.loc[_at("09:35:00"), "volume"] == 6
+    assert result.loc[_at("11:30:00"), "volume"] == 6
+    assert result.loc[_at("13:05:00"), "volume"] == 5
+    assert result.loc[_at("15:00:00"), "volume"] == 6
+    assert result.loc[_at("15:00:00"), "close"] == bars["close"].iloc[-1]
+
+
+def test_day_bar():
+    bars = _minutes()
+    result = resample_bars(bars, DAY)
+
+    assert result["time"].tolist() == [DATE]
+    row = result.iloc[0]
+    assert (row["open"], row["high"], row["low"], row["close"]) == (0, 239.5, -0.5, 239)
+    assert row["volume"] == 240
+    assert row["turnover"] == bars["turnover"].sum()
+
+
+def test_tz_aware_input_and_multiple_codes():
+    a = _minutes().assign(code="USHA600519")
+    b = _minutes().assign(code="USZA000001", close=lambda d: d["close"] * 2)
+    data = pd.concat([a, b], ignore_index=True)
+    data["time"] = data["time"].dt.tz_localize("Asia/Shanghai")
+
+    result = resample_all(data, [MIN_60, DAY])
+    hourly = result[MIN_60]
+    assert hourly.groupby("code").size().to_dict() == {"USHA600519": 4, "USZA000001": 4}
+    first = hourly[hourly["code"] == "USZA000001"].iloc[0]
+    assert first["time"] == pd.Timestamp("2025-04-11 10:30", tz="Asia/Shanghai")
+    assert first["close"] == 59 * 2
+    assert result[DAY]["time"].tolist() == [DATE, DATE]
+
+
+def test_one_minute_is_returned_unchanged():
+    bars = _minutes()
+    assert resample_bars(bars, MIN_1) is bars
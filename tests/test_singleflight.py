@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# File: test_singleflight.py
+# Description: Request key normalization and coalescing of concurrent identical calls.
+# Author: bensema
+# License: MIT
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from thsdata.singleflight import SingleFlight, normalize_req
+
+
+@pytest.mark.parametrize("req, expected", [
+    ("id=200&instance=17&zipversion=2&codelist=600519&market=USHA&datatype=5",
+     "id=200&zipversion=2&codelist=600519&market=USHA&datatype=5"),
+    ("instance=3&id=200&market=USHA", "id=200&market=USHA"),
+    ("id=200&market=USHA&instance=3", "id=200&market=USHA"),
+    ("id=200&instance=&market=USHA", "id=200&market=USHA"),
+    ("instance=1&instance=2&id=200", "id=200"),
+    ("id=200&market=USHA", "id=200&market=USHA"),
+    # 只去掉完整的 instance 参数
+    ("id=200&subinstance=3&instances=4", "id=200&subinstance=3&instances=4"),
+])
+def test_normalize_req(req, expected):
+    assert normalize_req(req) == expected
+
+
+def test_requests_differing_only_by_instance_share_a_key():
+    a = "id=204&instance=1&zipversion=2&code=600519&market=USHA&start=1&end=2"
+    b = "id=204&instance=2&zipversion=2&code=600519&market=USHA&start=1&end=2"
+    c = "id=204&instance=3&zipversion=2&code=000001&market=USZA&start=1&end=2"
+    assert normalize_req(a) == normalize_req(b) != normalize_req(c)
+
+
+def _concurrent(flight, keys, fn, callers_per_key=4):
+    """每个键并发调用 callers_per_key 次，在全部调用者进入 do 之后才让请求完成."""
+    release = threading.Event()
+    total = len(keys) * callers_per_key
+
+    def call(key):
+        return flight.do(key, lambda: (release.wait(5), fn(key))[1])
+
+    with ThreadPoolExecutor(total) as executor:
+        futures = [executor.submit(call, key) for key in keys for _ in range(callers_per_key)]
+        while flight.shared < total - len(keys):
+            threading.Event().wait(0.001)
+        release.set()
+        return [f.exception() or f.result() for f in futures]
+
+
+def test_concurrent_identical_calls_run_once():
+    flight = SingleFlight()
+    calls = []
+
+    results = _concurrent(flight, ["a", "b"], lambda key: calls.append(key) or {"key": key})
+
+    assert sorted(calls) == ["a", "b"]
+    assert results == [{"key": "a"}] * 4 + [{"key": "b"}] * 4
+    assert results[0] is results[1]
+    assert flight.shared == 6
+    assert flight.in_flight() == 0
+
+
+def test_error_is_shared_and_key_released():
+    flight = SingleFlight()
+    error = ConnectionError("reset")
+
+    def fail(key):
+        raise error
+
+    assert _concurrent(flight, ["a"], fail) == [error] * 4
+    # 请求结束后键被释放，之后的调用重新请求
+    assert flight.do("a", lambda: "fresh") == "fresh"
+    assert flight.in_flight() == 0
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    calls = []
+    for i in range(3):
+        assert flight.do("a", lambda: calls.append(i) or i) == i
+    assert calls == [0, 1, 2]
+    assert flight.shared == 0
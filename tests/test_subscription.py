@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# File: test_subscription.py
+# Description: Subscription snapshot diffing and delta emission with a stand-in THSData.
+# Author: bensema
+# License: MIT
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from thsdata.subscription import Subscription
+
+
+class StubTHSData:
+    """按顺序返回预设快照的 THSData 替身，预设用完后重复最后一个."""
+
+    def __init__(self, *frames):
+        self.frames = [pd.DataFrame(f) for f in frames]
+        self.requests = []
+
+    def stock_cur_market_data(self, codes, batch_size=100):
+        self.requests.append(list(codes))
+        frame = self.frames.pop(0) if len(self.frames) > 1 else self.frames[0]
+        return frame[frame["code"].isin(codes)].reset_index(drop=True)
+
+
+def _frame(prices, volumes=None, names=None):
+    codes = list(prices)
+    return {"code": codes, "price": [prices[c] for c in codes],
+            "volume": [(volumes or {}).get(c, 100) for c in codes],
+            "name": [(names or {}).get(c, f"名称{c[-1]}") for c in codes]}
+
+
+def test_first_poll_emits_everything_then_only_changes():
+    td = StubTHSData(_frame({"USHA600519": 1500.0, "USZA000001": 10.0}),
+                     _frame({"USHA600519": 1500.0, "USZA000001": 10.0}),
+                     _frame({"USHA600519": 1501.5, "USZA000001": 10.0}, volumes={"USZA000001": 200}))
+    sub = Subscription(td, ["USHA600519", "USZA000001"])
+
+    first = sub.poll().changes
+    assert first == {"USHA600519": {"price": 1500.0, "volume": 100, "name": "名称9"},
+                     "USZA000001": {"price": 10.0, "volume": 100, "name": "名称1"}}
+    assert sub.poll().changes == {}
+    assert sub.poll().changes == {"USHA600519": {"price": 1501.5}, "USZA000001": {"volume": 200}}
+    # 发出的值为 Python 标量而不是 NumPy 标量
+    assert type(first["USHA600519"]["volume"]) is int
+
+
+def test_missing_rows_keep_old_values():
+    td = StubTHSData(_frame({"USHA600519": 1500.0, "USZA000001": 10.0}),
+                     _frame({"USHA600519": 1500.0}),
+                     _frame({"USHA600519": 1500.0, "USZA000001": 10.0}))
+    sub = Subscription(td, ["USHA600519", "USZA000001"])
+    sub.poll()
+
+    assert sub.poll().changes == {}
+    assert sub.snapshot()["price"].tolist() == [1500.0, 10.0]
+    assert sub.poll().changes == {}
+
+
+def test_missing_values_and_type_promotion():
+    td = StubTHSData({"code": ["USHA600519", "USZA000001"], "volume": [100, None], "price": [1.0, np.nan]},
+                     {"code": ["USHA600519", "USZA000001"], "volume": [100.5, 300], "price": [1.0, 2.0]})
+    sub = Subscription(td, ["USHA600519", "USZA000001"])
+
+    assert sub.poll().changes == {"USHA600519": {"volume": 100.0, "price": 1.0}}
+    assert sub.poll().changes == {"USHA600519": {"volume": 100.5},
+                                  "USZA000001": {"volume": 300.0, "price": 2.0}}
+    assert sub.snapshot()["volume"].dtype == np.float64
+
+
+def test_int_fields_stay_integer_with_missing_values():
+    td = StubTHSData({"code": ["USHA600519"], "volume": [100]})
+    sub = Subscription(td, ["USHA600519", "USZA000001"])
+    sub.poll()
+
+    snapshot = sub.snapshot()
+    assert str(snapshot["volume"].dtype) == "Int64"
+    assert snapshot["volume"].isna().tolist() == [False, True]
+
+
+def test_added_codes_emit_all_fields_and_removed_codes_are_dropped():
+    frame = _frame({"USHA600519": 1500.0, "USZA000001": 10.0, "USZA300750": 200.0})
+    td = StubTHSData(frame)
+    sub = Subscription(td, ["USHA600519", "USZA000001"])
+    sub.poll()
+
+    sub.add_codes(["USZA300750", "USHA600519"])
+    sub.remove_codes(["USZA000001"])
+    assert sub.codes == ["USHA600519", "USZA300750"]
+    assert sub.poll().changes == {"USZA300750": {"price": 200.0, "volume": 100, "name": "名称0"}}
+    assert td.requests[-1] == ["USHA600519", "USZA300750"]
+    assert sub.snapshot()["code"].tolist() == ["USHA600519", "USZA300750"]
+
+
+def test_fields_filter_and_callbacks():
+    td = StubTHSData(_frame({"USHA600519": 1500.0}), _frame({"USHA600519": 1500.0}, names={"USHA600519": "新"}))
+    sub = Subscription(td, ["USHA600519"], fields=["price", "name", "unknown"])
+    received = []
+    sub.add_callback(lambda delta: 1 / 0)
+    sub.add_callback(received.append)
+
+    sub.poll()
+    delta = sub.poll()
+    assert received[-1] is delta
+    assert delta.changes == {"USHA600519": {"name": "新"}}
+    assert list(sub.snapshot().columns) == ["code", "price", "name"]
+    assert delta.to_frame().to_dict("records") == [{"code": "USHA600519", "name": "新"}]
+    assert sub.latency_stats()["count"] == 2
+
+
+def test_empty_or_failed_poll():
+    sub = Subscription(StubTHSData(pd.DataFrame(columns=["code", "price"])), ["USHA600519"])
+    assert sub.poll().changes == {}
+    assert Subscription(StubTHSData(_frame({})), []).poll().changes == {}
+
+
+def test_stream_starts_and_stops_polling():
+    td = StubTHSData(_frame({"USHA600519": 1.0}), _frame({"USHA600519": 1.0}), _frame({"USHA600519": 2.0}))
+    sub = Subscription(td, ["USHA600519"], interval=0.01)
+
+    async def collect():
+        deltas = []
+        async for delta in sub.stream():
+            deltas.append(delta.changes)
+            if len(deltas) == 2:
+                break
+        return deltas
+
+    deltas = asyncio.run(collect())
+    assert deltas[0]["USHA600519"]["price"] == 1.0
+    assert deltas[1] == {"USHA600519": {"price": 2.0}}
+    assert not sub.running
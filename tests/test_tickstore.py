@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# File: test_tickstore.py
+# Description: TickStore fetch, empty partitions and retries with a stand-in THSData.
+# Author: bensema
+# License: MIT
+
+from datetime import datetime, time, timedelta, timezone
+
+import pytest
+
+from thsdata.tickstore import TickStore
+
+
+class StubTHSData:
+    """tick 记录替身，results[(code, 日期)] 为 None 时模拟查询出错，为 [] 时表示没有成交."""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def _transaction_history_records(self, code, date):
+        key = (code, date.strftime("%Y%m%d"))
+        self.calls.append(key)
+        return self.results[key]
+
+    def _iter_pooled(self, fn, items, window=None, errors="raise"):
+        for item in items:
+            yield item, fn(item)
+
+
+def _ticks(day, n=3):
+    start = int(datetime(day.year, day.month, day.day, 9, 30, tzinfo=timezone(timedelta(hours=8))).timestamp())
+    return [{"time": start + 3 * i, "price": 10.0 + i, "volume": 100 * (i + 1)} for i in range(n)]
+
+
+def test_fetch_writes_and_reads_back(tmp_path):
+    store = TickStore(str(tmp_path))
+    td = StubTHSData({("USHA600519", "20250411"): _ticks(datetime(2025, 4, 11))})
+
+    assert store.fetch(td, ["USHA600519"], [20250411]) == [("20250411", "USHA600519")]
+    data = store.read("USHA600519", 20250411, columns=["time", "price"], start=time(9, 30, 3))
+    assert data["price"].tolist() == [11.0, 12.0]
+
+
+def test_empty_result_is_recorded_and_not_requested_again(tmp_path):
+    store = TickStore(str(tmp_path))
+    td = StubTHSData({("USHA600519", "20250405"): []})
+
+    assert store.fetch(td, ["USHA600519"], ["2025-04-05"]) == [("20250405", "USHA600519")]
+    assert store.has("USHA600519", 20250405)
+    assert store.read("USHA600519", 20250405) == {}
+    assert list(store.scan(["USHA600519"], 20250401, 20250430)) == []
+
+    assert store.fetch(td, ["USHA600519"], ["2025-04-05"]) == []
+    assert td.calls == [("USHA600519", "20250405")]
+
+
+def test_failed_query_is_retried(tmp_path):
+    store = TickStore(str(tmp_path))
+    td = StubTHSData({("USHA600519", "20250411"): None})
+
+    assert store.fetch(td, ["USHA600519"], [20250411]) == []
+    assert not store.has("USHA600519", 20250411)
+    with pytest.raises(ValueError):
+        store.fetch(td, ["USHA600519"], [20250411], errors="raise")
+
+    td.results[("USHA600519", "20250411")] = _ticks(datetime(2025, 4, 11))
+    assert store.fetch(td, ["USHA600519"], [20250411]) == [("20250411", "USHA600519")]
+    assert len(td.calls) == 3
+
+
+def test_read_range_skips_empty_partitions(tmp_path):
+    store = TickStore(str(tmp_path))
+    td = StubTHSData({("USHA600519", "20250410"): _ticks(datetime(2025, 4, 10), 2),
+                      ("USHA600519", "20250411"): [],
+                      ("USHA600519", "20250414"): _ticks(datetime(2025, 4, 14), 4)})
+    store.fetch(td, ["USHA600519"], [20250410, 20250411, 20250414])
+
+    data = store.read_range("USHA600519", 20250401, 20250430)
+    assert len(data) == 6
+    assert data["time"].is_monotonic_increasing
+
+
+def test_write_rejects_empty_data(tmp_path):
+    store = TickStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.write("USHA600519", 20250411, {"time": []})
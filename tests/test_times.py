@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# File: test_times.py
+# Description: Packed minute time encode/decode round trips against _time_2_int.
+# Author: bensema
+# License: MIT
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from thsdata.times import _int_2_time, _time_2_int, china_tz, decode_minute_time, encode_minute_time
+
+BOUNDARIES = [
+    datetime(1990, 12, 19, 9, 30),
+    datetime(2024, 1, 1, 0, 0),
+    datetime(2024, 1, 31, 23, 59),
+    datetime(2024, 2, 1, 0, 0),
+    datetime(2024, 2, 29, 15, 0),
+    datetime(2024, 3, 1, 9, 31),
+    datetime(2024, 12, 31, 23, 59),
+    datetime(2025, 1, 1, 0, 0),
+    datetime(2025, 5, 19, 10, 15),
+    datetime(2099, 12, 31, 15, 0),
+]
+
+
+def test_encode_matches_time_2_int():
+    encoded = encode_minute_time(BOUNDARIES)
+    assert encoded.dtype == np.int64
+    assert encoded.tolist() == [_time_2_int(t) for t in BOUNDARIES]
+    assert encode_minute_time(pd.DatetimeIndex(["2025-05-19 10:15"])).tolist() == [131439247]
+
+
+def test_decode_round_trip():
+    values = [_time_2_int(t) for t in BOUNDARIES]
+    assert decode_minute_time(values, tz=False).to_pydatetime().tolist() == BOUNDARIES
+    assert [_int_2_time(v) for v in values] == BOUNDARIES
+
+    decoded = decode_minute_time(values)
+    assert str(decoded.tz) == "Asia/Shanghai"
+    assert encode_minute_time(decoded).tolist() == values
+
+
+def test_every_minute_across_month_and_year_ends():
+    times = pd.date_range("2023-12-31 22:00", "2024-01-01 02:00", freq="min").append(
+        pd.date_range("2024-02-28 23:00", "2024-03-01 01:00", freq="min"))
+    encoded = encode_minute_time(times)
+
+    assert encoded.tolist() == [_time_2_int(t) for t in times.to_pydatetime()]
+    assert (np.diff(encoded) > 0).all()
+    assert decode_minute_time(encoded, tz=False).equals(times)
+
+
+@pytest.mark.parametrize("tz", [timezone.utc, timezone(timedelta(hours=-5)), timezone(timedelta(hours=8))])
+def test_tz_aware_input_is_converted_to_beijing(tz):
+    # 北京时间 2025-01-01 07:30，在 UTC 及西五区仍是 2024-12-31
+    wall = datetime(2025, 1, 1, 7, 30)
+    t = china_tz.localize(wall).astimezone(tz)
+
+    assert _time_2_int(t) == _time_2_int(wall)
+    assert encode_minute_time([t]).tolist() == [_time_2_int(wall)]
+    assert encode_minute_time(pd.DatetimeIndex([t])).tolist() == [_time_2_int(wall)]
+    assert decode_minute_time([_time_2_int(t)])[0] == pd.Timestamp(t)
+
+
+def test_seconds_are_truncated():
+    t = datetime(2025, 5, 19, 10, 15, 59, 999999)
+    assert encode_minute_time(pd.Series([t])).tolist() == [_time_2_int(t)]
+    assert decode_minute_time([_time_2_int(t)], tz=False)[0] == pd.Timestamp("2025-05-19 10:15")
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# File: test_web.py
+# Description: HttpClient retry and timeout behaviour against a local HTTP stand-in.
+# Author: bensema
+# License: MIT
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from thsdata.web import HttpClient
+
+
+class StandIn:
+    """本地 HTTP 替身，按 plan 依次返回 (状态码, JSON, 延迟秒数)，用完后重复最后一项."""
+
+    def __init__(self, plan):
+        self.plan = list(plan)
+        self.hits = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    status, body, delay = stand_in.plan[min(stand_in.hits, len(stand_in.plan) - 1)]
+                    stand_in.hits += 1
+                time.sleep(delay)
+                payload = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    pass  # 客户端已超时断开
+
+            def log_message(self, *args):
+                pass
+
+        lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/query"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_retries_server_errors_until_success():
+    with StandIn([(503, {}, 0), (503, {}, 0), (200, {"ok": 1}, 0)]) as server:
+        client = HttpClient(retries=3, backoff=0)
+        assert client.get_json(server.url) == {"ok": 1}
+        assert server.hits == 3
+        client.close()
+
+
+def test_gives_up_after_retries():
+    with StandIn([(503, {}, 0)]) as server:
+        client = HttpClient(retries=1, backoff=0)
+        with pytest.raises(client.errors):
+            client.get_json(server.url)
+        assert server.hits == 2
+        client.close()
+
+
+def test_client_errors_are_not_retried():
+    with StandIn([(404, {}, 0)]) as server:
+        client = HttpClient(retries=3, backoff=0)
+        with pytest.raises(client.errors):
+            client.get(server.url)
+        assert server.hits == 1
+        client.close()
+
+
+def test_read_timeout_is_retried_then_raised():
+    with StandIn([(200, {}, 1.0)]) as server:
+        client = HttpClient(timeout=(1, 0.2), retries=1, backoff=0)
+        start = time.perf_counter()
+        with pytest.raises(client.errors):
+            client.get_json(server.url)
+        assert time.perf_counter() - start < 1.0
+        assert server.hits == 2
+        client.close()
+
+
+def test_per_call_timeout_overrides_default():
+    with StandIn([(200, {"ok": 1}, 0.3)]) as server:
+        client = HttpClient(timeout=(1, 0.1), retries=0, backoff=0)
+        assert client.get_json(server.url, timeout=2) == {"ok": 1}
+        client.close()
+
+
+def test_wencai_select_codes_reports_http_errors(monkeypatch):
+    thsdk = pytest.importorskip("thsdk")
+    if not hasattr(thsdk, "THS"):
+        pytest.skip("thsdk.THS 不可用")
+    from thsdata import THSData
+    import thsdata.thsdata as module
+
+    with StandIn([(500, {}, 0)]) as server:
+        monkeypatch.setattr(module, "WENCAI_URL", server.url)
+        td = THSData(http=HttpClient(retries=0, backoff=0))
+        codes, error = td.wencai_select_codes("macd金叉")
+        assert codes == []
+        assert isinstance(error, td.http.errors)
+
+    with StandIn([(200, {"status_msg": "success", "stockList": [{"stock_code": "600519", "marketid": "17"}]},
+                   0)]) as server:
+        monkeypatch.setattr(module, "WENCAI_URL", server.url)
+        codes, error = td.wencai_select_codes("macd金叉")
+        assert codes == ["USHA600519"] and error is None
@@ -1,8 +1,52 @@
-from .thsdata import THSData
-from thsdk import *
-from thsdk import __all__ as thsdk_all
-
-__all__ = (
-    *thsdk_all,
-    "THSData",
-)
+import importlib
+import importlib.util
+
+# 公开名称所在的子模块，首次访问时才导入 (PEP 562)，import thsdata 时不加载 pandas、requests、thsdk
+_EXPORTS = {
+    "THSData": ".thsdata",
+    "AsyncTHSData": ".aio",
+    "normalize_codes": ".codes",
+    "InvalidCodeError": ".codes",
+    "encode_minute_time": ".times",
+    "decode_minute_time": ".times",
+    "Catalog": ".catalog",
+    "CatalogDiff": ".catalog",
+    "BlockIndex": ".blockindex",
+    "Subscription": ".subscription",
+    "SnapshotDelta": ".subscription",
+    "resample_bars": ".resample",
+    "parse_corporate_actions": ".corporate",
+    "CorporateActionStore": ".corporate",
+    "TickStore": ".tickstore",
+    "time_bars": ".bars",
+    "volume_bars": ".bars",
+    "turnover_bars": ".bars",
+}
+
+
+def _thsdk_all():
+    return tuple(importlib.import_module("thsdk").__all__)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(module, __name__), name)
+    elif name == "__all__":
+        value = (*_thsdk_all(), *_EXPORTS)
+    elif name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    elif importlib.util.find_spec(f"{__name__}.{name}") is not None:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        # from thsdk import * 导出的名称
+        thsdk = importlib.import_module("thsdk")
+        if name not in thsdk.__all__:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        value = getattr(thsdk, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__("__all__")))
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# File: adjust.py
+# Description: Local forward/backward price adjustment from corporate_action events.
+# Author: bensema
+# License: MIT
+
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+from .cache import _local_naive
+from .corporate import parse_corporate_actions
+
+EVENT_COLUMNS = ["ex_date", "cash", "bonus", "rights", "rights_price"]
+
+
+def parse_events(actions: pd.DataFrame) -> pd.DataFrame:
+    """把 :meth:`THSData.corporate_action` 的文本解析为每股权息.
+
+    股改对价现金计入 cash，送股、转增和对价股票计入 bonus。
+
+    :param actions: corporate_action 返回的 DataFrame，或 :func:`parse_corporate_actions` 的结果
+    :return: ex_date (除权除息日), cash (每股现金), bonus (每股送转股), rights (每股配股), rights_price (配股价)
+    """
+    if actions is None or "ex_date" not in actions.columns:
+        actions = parse_corporate_actions(actions)
+    return pd.DataFrame({
+        "ex_date": actions["ex_date"],
+        "cash": actions["cash"] + actions["consideration_cash"],
+        "bonus": actions["bonus"] + actions["conversion"] + actions["consideration_shares"],
+        "rights": actions["rights"],
+        "rights_price": actions["rights_price"],
+    }, columns=EVENT_COLUMNS)
+
+
+def adjust_factors(times: pd.Series, close: np.ndarray, events: pd.DataFrame, adjust: str) -> np.ndarray:
+    """计算每根K线的复权因子.
+
+    每次除权除息的比例 f = (前收盘 - 每股现金 + 配股比例 * 配股价) / (1 + 送转比例 + 配股比例) / 前收盘，
+    前收盘取除权日之前最后一根K线的收盘价。前复权时除权日之前的K线乘以之后全部 f 的乘积，
+    后复权时除权日及之后的K线除以此前全部 f 的乘积。没有前一根K线的事件被忽略，
+    因此前复权需要K线覆盖到最新，后复权需要K线从上市开始。
+
+    :param times: 按时间升序的K线 time 列
+    :param close: 不复权收盘价
+    :param events: :func:`parse_events` 的结果
+    :param adjust: 'Q' 前复权, 'B' 后复权, '' 不复权
+    :return: 与K线等长的因子数组
+    """
+    n = len(close)
+    if adjust == "" or events is None or events.empty or n == 0:
+        return np.ones(n)
+    if adjust not in ("Q", "B"):
+        raise ValueError("adjust 必须是 'Q'、'B' 或 ''")
+
+    days = _local_naive(pd.Series(times)).dt.normalize().to_numpy()
+    ex_dates = pd.to_datetime(events["ex_date"]).to_numpy(dtype="datetime64[ns]")
+    idx = np.searchsorted(days, ex_dates, side="left")
+    valid = (idx > 0) & (idx < n)
+    idx = idx[valid]
+
+    pre_close = np.asarray(close, dtype=np.float64)[idx - 1]
+    cash, bonus, rights, rights_price = (events[col].to_numpy(dtype=np.float64)[valid]
+                                         for col in ("cash", "bonus", "rights", "rights_price"))
+    ratio = (pre_close - cash + rights * rights_price) / (1.0 + bonus + rights) / pre_close
+
+    # step[i] 为第 i 根K线开始生效的除权比例，同一天多个事件相乘
+    step = np.ones(n)
+    np.multiply.at(step, idx, ratio)
+    if adjust == "Q":
+        return np.append(np.cumprod(step[::-1])[::-1][1:], 1.0)
+    return 1.0 / np.cumprod(step)
+
+
+def adjust_bars(bars: pd.DataFrame, events: pd.DataFrame, adjust: str,
+                columns: Optional[list] = None) -> pd.DataFrame:
+    """对不复权K线做前复权或后复权.
+
+    :param bars: 不复权K线，单个证券，包含 time 和价格列
+    :param events: :func:`parse_events` 的结果
+    :param adjust: 'Q' 前复权, 'B' 后复权, '' 不复权
+    :param columns: 需要复权的价格列，默认 open, high, low, close
+    :return: pandas.DataFrame，成交量和成交额不变，浮点价格列保持原有类型 (例如 typed 模式的 float32)
+    """
+    if bars is None or bars.empty or adjust == "":
+        return bars
+    bars = bars.sort_values("time", kind="stable").reset_index(drop=True)
+    factor = adjust_factors(bars["time"], bars["close"].to_numpy(dtype=np.float64), events, adjust)
+    columns = [col for col in (columns or ["open", "high", "low", "close"]) if col in bars.columns]
+    result = bars.copy()
+    for col in columns:
+        values = bars[col].to_numpy(dtype=np.float64, na_value=np.nan) * factor
+        dtype = bars[col].dtype
+        result[col] = pd.Series(values, index=result.index).astype(dtype) \
+            if pd.api.types.is_float_dtype(dtype) else values
+    return result
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# File: aio.py
+# Description: asyncio client wrapping THSData for event-loop based services.
+# Author: bensema
+# License: MIT
+
+import asyncio
+import inspect
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+from .codes import normalize_codes
+from .thsdata import THSData, Adjust, Interval, _concat_bars
+
+# 不提供 awaitable 版本的 THSData 公共方法：连接管理和 download_many 由 AsyncTHSData 自己实现，
+# dc、moneyflow_major 尚未实现
+_EXCLUDED = frozenset({"connect", "disconnect", "download_many", "dc", "moneyflow_major"})
+
+# 提供 awaitable 版本的 THSData 公共方法，由 THSData 的公共方法生成，新增方法自动包含
+_METHODS = tuple(name for name, member in vars(THSData).items()
+                 if not name.startswith("_") and name not in _EXCLUDED and inspect.isfunction(member))
+
+
+class AsyncTHSData:
+    """THSData 的 asyncio 版本.
+
+    thsdk 和 requests 都是阻塞接口，每个调用会借用连接池中的一个会话，在专用线程池中执行，
+    不会阻塞事件循环。同时执行的请求数不超过 max_concurrency，其余请求在事件循环中等待，
+    因此可以同时挂起大量请求而不需要为每个请求创建线程。
+
+    取消或超时的调用会立即返回给调用方，已经发出的网络请求在后台线程中执行完后结果被丢弃。
+
+    Example::
+
+        async with AsyncTHSData(pool_size=4) as td:
+            df = await td.download("600519", count=10)
+            books = await asyncio.gather(*(td.order_book(code) for code in codes))
+    """
+
+    def __init__(self, ops: dict = None, ths_class: Optional[Any] = None, cache_dir: Optional[str] = None,
+                 pool_size: int = 4, max_concurrency: Optional[int] = None, timeout: Optional[float] = None,
+                 **kwargs):
+        """
+        :param ops: thsdk 连接参数
+        :param ths_class: 自定义 THS 实现，默认使用 thsdk.THS
+        :param cache_dir: K线本地缓存目录，参见 :class:`THSData`
+        :param pool_size: 会话数量，也是执行阻塞调用的线程数
+        :param max_concurrency: 最大同时执行的请求数，默认等于 pool_size
+        :param timeout: 单次调用超时时间(秒)，默认不超时
+        :param kwargs: 其余 :class:`THSData` 参数，例如 typed、price_dtype、http、coalesce、governor、
+                       reconnect、metrics
+        """
+        self.td = THSData(ops, ths_class=ths_class, cache_dir=cache_dir, pool_size=pool_size, **kwargs)
+        self.timeout = timeout
+        self._workers = pool_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(min(max_concurrency or pool_size, pool_size))
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
+
+    async def connect(self):
+        await self._to_thread(self.td.connect)
+
+    async def disconnect(self):
+        """断开连接并释放线程池，之后可以再次 connect."""
+        try:
+            await self._to_thread(self.td.disconnect)
+        finally:
+            executor, self._executor = self._executor, None
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _to_thread(self, fn, *args, **kwargs):
+        if self._executor is None:
+            # 首次调用或 disconnect 之后按需创建线程池
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="thsdata")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def _call(self, name: str, args: tuple, kwargs: dict):
+        # 每次会话请求都会从连接池借用会话，批量方法可以在多个会话上并发
+        return getattr(self.td, name)(*args, **kwargs)
+
+    async def _run(self, name: str, *args, **kwargs):
+        async with self._semaphore:
+            return await asyncio.wait_for(self._to_thread(self._call, name, args, kwargs), self.timeout)
+
+    async def download_many(self, codes: List[str], start: Optional[Any] = None, end: Optional[Any] = None,
+                            adjust: str = Adjust.NONE, period: str = "max", interval: int = Interval.DAY,
+                            count: int = -1, concat: bool = False,
+                            errors: str = "raise") -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        """批量获取多个证券的历史k线数据，参数同 :meth:`THSData.download_many`."""
+        if errors not in ("raise", "ignore"):
+            raise ValueError("errors 必须是 'raise' 或 'ignore'")
+
+        normalized = normalize_codes(codes, errors="raise" if errors == "raise" else "coerce")
+        for code, norm in zip(codes, normalized):
+            if norm is None:
+                print(f"download {code} exception occurred: 无法识别的证券代码")
+        codes = list(dict.fromkeys(code for code in normalized if code is not None))
+        results = await asyncio.gather(
+            *(self.download(code, start, end, adjust, period, interval, count) for code in codes),
+            return_exceptions=(errors == "ignore"))
+
+        frames = {}
+        for code, data in zip(codes, results):
+            if isinstance(data, BaseException):
+                print(f"download {code} exception occurred: {data}")
+                continue
+            frames[code] = data
+
+        if not concat:
+            return frames
+
+        return _concat_bars(frames)
+
+
+def _async_method(name: str):
+    @functools.wraps(getattr(THSData, name))
+    async def method(self, *args, **kwargs):
+        return await self._run(name, *args, **kwargs)
+
+    return method
+
+
+def _async_iter_method(name: str):
+    """iter_download 等迭代器方法的异步迭代器版本.
+
+    每次取下一个结果都在线程池中执行，与其他调用一样受 max_concurrency 和 timeout 限制。
+    """
+    @functools.wraps(getattr(THSData, name))
+    async def method(self, *args, **kwargs):
+        iterator = getattr(self.td, name)(*args, **kwargs)
+        done = object()
+        step = None
+        try:
+            while True:
+                async with self._semaphore:
+                    step = asyncio.ensure_future(self._to_thread(next, iterator, done))
+                    item = await asyncio.wait_for(asyncio.shield(step), self.timeout)
+                if item is done:
+                    return
+                yield item
+        finally:
+            if step is not None and not step.done():
+                # 超时或取消时上一步仍在线程中执行，执行完后再关闭迭代器，结果被丢弃
+                def close_later(future):
+                    if not future.cancelled():
+                        future.exception()
+                    asyncio.ensure_future(self._to_thread(iterator.close))
+
+                step.add_done_callback(close_later)
+            else:
+                await self._to_thread(iterator.close)
+
+    return method
+
+
+for _name in _METHODS:
+    if inspect.isgeneratorfunction(getattr(THSData, _name)):
+        setattr(AsyncTHSData, _name, _async_iter_method(_name))
+    else:
+        setattr(AsyncTHSData, _name, _async_method(_name))
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# File: bars.py
+# Description: Vectorized aggregation of transaction_history snapshots into time, volume and turnover bars.
+# Author: bensema
+# License: MIT
+
+import numpy as np
+import pandas as pd
+from typing import Any, Mapping, Optional, Tuple, Union
+
+from .times import china_tz
+
+BAR_COLUMNS = ["time", "open", "high", "low", "close", "volume", "turnover", "count"]
+
+_DAY_NS = 86400 * 10 ** 9
+
+
+def _times(values: Any) -> Tuple[np.ndarray, bool]:
+    """time 列转换为北京时间 naive 的 int64 纳秒，同时返回原数据是否带时区."""
+    if isinstance(values, (pd.Series, pd.DatetimeIndex)):
+        index = pd.DatetimeIndex(values).as_unit("ns")
+        if index.tz is not None:
+            return index.tz_convert(china_tz).tz_localize(None).asi8, True
+        return index.asi8, False
+    return np.asarray(values, dtype="datetime64[ns]").view(np.int64), False
+
+
+def _float(values: Any) -> np.ndarray:
+    """转换为 float64，可空整数的缺失值为 NaN."""
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _diff_cumulative(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """累计值转换为每个快照的增量，每个分段的第一个快照取自身的值."""
+    delta = np.diff(values, prepend=0.0)
+    delta[starts] = values[starts]
+    return np.maximum(delta, 0)
+
+
+def _prepare(data: Union[pd.DataFrame, Mapping[str, Any]], by: Optional[str]):
+    """按 (代码, 时间) 排序并计算每个快照的成交量、成交额、成交笔数."""
+    ns, tz = _times(data["time"])
+    n = len(ns)
+    if by is not None and by in data:
+        code_values = np.asarray(data[by])
+        code_ids = pd.factorize(code_values)[0]
+    else:
+        code_values, code_ids = None, np.zeros(n, dtype=np.int64)
+
+    order = np.lexsort((ns, code_ids))
+    ns, code_ids = ns[order], code_ids[order]
+    price = _float(data["price"])[order]
+
+    # 证券或交易日变化处为新分段
+    day = ns // _DAY_NS
+    session = np.ones(n, dtype=bool)
+    session[1:] = (code_ids[1:] != code_ids[:-1]) | (day[1:] != day[:-1])
+    starts = np.flatnonzero(session)
+
+    if "cur_volume" in data:
+        volume = _float(data["cur_volume"])[order]
+    else:
+        volume = _diff_cumulative(_float(data["volume"])[order], starts)
+    if "turnover" in data:
+        turnover = _diff_cumulative(_float(data["turnover"])[order], starts)
+    else:
+        turnover = price * volume
+    if "transaction_count" in data:
+        count = _diff_cumulative(_float(data["transaction_count"])[order], starts)
+    else:
+        count = np.zeros(n)
+
+    codes = code_values[order] if code_values is not None else None
+    return ns, tz, codes, session, price, volume, turnover, count
+
+
+def _aggregate(boundary: np.ndarray, ns: np.ndarray, labels: Optional[np.ndarray], tz: bool, codes,
+               by: Optional[str], price, volume, turnover, count) -> pd.DataFrame:
+    """按 boundary 标记的分段起点合成K线."""
+    if len(ns) == 0:
+        return pd.DataFrame(columns=([by] if by else []) + BAR_COLUMNS)
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], len(ns)) - 1
+    time = labels[starts] if labels is not None else ns[ends]
+    time = pd.DatetimeIndex(time.astype("datetime64[ns]"))
+    if tz:
+        time = time.tz_localize(china_tz)
+
+    result = {}
+    if codes is not None:
+        result[by] = codes[starts]
+    result.update({
+        "time": time,
+        "open": price[starts],
+        "high": np.maximum.reduceat(price, starts),
+        "low": np.minimum.reduceat(price, starts),
+        "close": price[ends],
+        "volume": np.add.reduceat(volume, starts).astype(np.int64),
+        "turnover": np.add.reduceat(turnover, starts),
+        "count": np.add.reduceat(count, starts).astype(np.int64),
+    })
+    return pd.DataFrame(result)
+
+
+def time_bars(data: Union[pd.DataFrame, Mapping[str, Any]], freq: Union[str, pd.Timedelta] = "15s",
+              by: Optional[str] = "code") -> pd.DataFrame:
+    """把 tick3秒快照合成为固定时间间隔的K线.
+
+    K线以结束时间标记，包含 (结束时间 - freq, 结束时间] 内的快照，与服务器分钟K线一致。
+    成交量为 cur_volume 之和 (没有 cur_volume 时由累计 volume 求差)，成交额由累计 turnover 求差
+    (没有时为 price * 成交量)，count 为累计 transaction_count 的增量。
+
+    :param data: :meth:`THSData.transaction_history` 的结果，可以是多个证券、多个交易日合并的 DataFrame，
+                 或 :meth:`TickStore.read` 返回的 {列名: 数组}
+    :param freq: 周期，例如 '15s'、'30s'、'1min'
+    :param by: 区分证券的列名，列不存在时视为单个证券
+    :return: pandas.DataFrame，列为 [by,] time, open, high, low, close, volume, turnover, count
+
+    Example::
+
+        ticks = td.transaction_history("USHA600519", datetime(2025, 4, 11))
+        bars = time_bars(ticks, "30s")
+    """
+    step = pd.Timedelta(freq).value
+    if step <= 0:
+        raise ValueError("freq 必须大于0")
+    ns, tz, codes, session, *values = _prepare(data, by)
+    labels = -(-ns // step) * step
+    boundary = session.copy()
+    boundary[1:] |= labels[1:] != labels[:-1]
+    return _aggregate(boundary, ns, labels, tz, codes, by, *values)
+
+
+def _threshold_bars(data, threshold: float, by: Optional[str], field: int) -> pd.DataFrame:
+    if threshold <= 0:
+        raise ValueError("threshold 必须大于0")
+    ns, tz, codes, session, *values = _prepare(data, by)
+    amount = values[field]
+    # 每个交易日内的累计量，第 k 根K线包含累计量落在 (k * threshold, (k + 1) * threshold] 的快照
+    total = np.cumsum(amount)
+    starts = np.flatnonzero(session)
+    offset = np.repeat(total[starts] - amount[starts], np.diff(np.append(starts, len(ns))))
+    bucket = np.maximum(np.ceil((total - offset) / threshold) - 1, 0)
+    boundary = session.copy()
+    boundary[1:] |= bucket[1:] != bucket[:-1]
+    return _aggregate(boundary, ns, None, tz, codes, by, *values)
+
+
+def volume_bars(data: Union[pd.DataFrame, Mapping[str, Any]], threshold: float,
+                by: Optional[str] = "code") -> pd.DataFrame:
+    """按成交量合成K线，每个交易日内成交量每累计 threshold 生成一根.
+
+    K线时间为最后一个快照的时间，跨交易日时重新累计，其余同 :func:`time_bars`。
+    """
+    return _threshold_bars(data, threshold, by, field=1)
+
+
+def turnover_bars(data: Union[pd.DataFrame, Mapping[str, Any]], threshold: float,
+                  by: Optional[str] = "code") -> pd.DataFrame:
+    """按成交额合成K线，每个交易日内成交额每累计 threshold 生成一根，其余同 :func:`volume_bars`."""
+    return _threshold_bars(data, threshold, by, field=2)
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+# File: blockindex.py
+# Description: Reverse index from securities to industry, sub-industry and concept blocks.
+# Author: bensema
+# License: MIT
+
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Set
+
+from .storage import read_json, write_json
+
+# 板块类型 -> 获取板块列表的接口
+BLOCK_KINDS = {
+    "industry": "ths_industry_block",
+    "sub_industry": "ths_industry_sub_block",
+    "concept": "ths_concept_block",
+}
+
+
+class BlockIndex:
+    """证券与行业、三级行业、概念板块的双向索引.
+
+    code -> 板块 和 板块 -> code 都是字典查找。通过 :meth:`build` 并发获取全部板块成分股生成，
+    可用 :meth:`save` / :meth:`load` 持久化，:meth:`update` 增量更新。
+
+    Example::
+
+        with THSData(pool_size=8) as td:
+            index = BlockIndex.build(td)
+        index.lookup("USHA600519")
+        # {'industry': ['URFI881273'], 'sub_industry': [...], 'concept': [...]}
+    """
+
+    def __init__(self):
+        # 板块代码 -> {'name': 名称, 'kind': 类型}
+        self.blocks: Dict[str, dict] = {}
+        # 板块代码 -> 成分股代码列表
+        self.block_codes: Dict[str, List[str]] = {}
+        # 证券代码 -> 板块代码集合
+        self.code_blocks: Dict[str, Set[str]] = {}
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.code_blocks
+
+    # ---- 查询 ----
+
+    def blocks_of(self, code: str, kind: Optional[str] = None) -> List[str]:
+        """包含该证券的板块代码，kind 为 'industry'、'sub_industry' 或 'concept' 时只返回该类型."""
+        blocks = self.code_blocks.get(code, ())
+        if kind is None:
+            return sorted(blocks)
+        return sorted(b for b in blocks if self.blocks[b]["kind"] == kind)
+
+    def lookup(self, code: str) -> Dict[str, List[str]]:
+        """按板块类型返回包含该证券的板块代码."""
+        result = {kind: [] for kind in BLOCK_KINDS}
+        for block in sorted(self.code_blocks.get(code, ())):
+            result[self.blocks[block]["kind"]].append(block)
+        return result
+
+    def members(self, block_code: str) -> List[str]:
+        """板块成分股代码."""
+        return self.block_codes.get(block_code, [])
+
+    def to_frame(self) -> pd.DataFrame:
+        """展开为 code, block, kind, block_name 四列的 DataFrame."""
+        rows = [(code, block, self.blocks[block]["kind"], self.blocks[block]["name"])
+                for block, codes in self.block_codes.items() for code in codes]
+        return pd.DataFrame(rows, columns=["code", "block", "kind", "block_name"])
+
+    # ---- 构建 ----
+
+    def _set_members(self, block_code: str, codes: Iterable[str]) -> None:
+        self._drop(block_code, keep_info=True)
+        codes = list(dict.fromkeys(codes))
+        self.block_codes[block_code] = codes
+        for code in codes:
+            self.code_blocks.setdefault(code, set()).add(block_code)
+
+    def _drop(self, block_code: str, keep_info: bool = False) -> None:
+        for code in self.block_codes.pop(block_code, []):
+            blocks = self.code_blocks.get(code)
+            if blocks is not None:
+                blocks.discard(block_code)
+                if not blocks:
+                    del self.code_blocks[code]
+        if not keep_info:
+            self.blocks.pop(block_code, None)
+
+    @staticmethod
+    def _fetch(td, catalog, name: str, *args: str) -> Optional[pd.DataFrame]:
+        """列表接口的结果，优先从 catalog 读取，查询出错时返回 None."""
+        if catalog is not None:
+            return catalog._get(name, *args)
+        return td._list_frame(name, *args)
+
+    @classmethod
+    def build(cls, td, kinds: Iterable[str] = tuple(BLOCK_KINDS), catalog=None,
+              max_workers: Optional[int] = None) -> "BlockIndex":
+        """获取全部板块及成分股生成索引.
+
+        :param td: THSData 实例，成分股在其连接池上并发获取
+        :param kinds: 需要的板块类型
+        :param catalog: 可选的 :class:`Catalog`，板块列表和成分股优先从中读取
+        :param max_workers: 最大并发数，默认等于 pool_size
+        """
+        index = cls()
+        index.update(td, kinds=kinds, catalog=catalog, refresh_existing=True, max_workers=max_workers)
+        return index
+
+    def update(self, td, kinds: Iterable[str] = tuple(BLOCK_KINDS), catalog=None, refresh_existing: bool = False,
+               blocks: Optional[Iterable[str]] = None, max_workers: Optional[int] = None) -> Dict[str, List[str]]:
+        """增量更新索引.
+
+        重新获取板块列表：删除已不存在的板块，获取新增板块的成分股。
+        已有板块只有在 refresh_existing 为 True 或出现在 blocks 中时才重新获取成分股。
+        新增板块的成分股获取成功后才加入索引，失败的板块在下次 update 时重新获取。
+
+        :return: {'added': 新增板块, 'removed': 删除板块, 'refreshed': 重新获取成分股的板块,
+                  'failed': 成分股获取失败的板块}
+        """
+        kinds = list(kinds)
+        for kind in kinds:
+            if kind not in BLOCK_KINDS:
+                raise ValueError(f"未知的板块类型: {kind}")
+
+        current = {}
+        for kind in kinds:
+            data = self._fetch(td, catalog, BLOCK_KINDS[kind])
+            if data is None or data.empty:
+                # 获取失败时保留该类型原有的板块
+                current.update({b: info for b, info in self.blocks.items() if info["kind"] == kind})
+                continue
+            for code, name in zip(data["code"].astype(str), data["name"].astype(str)):
+                current[code] = {"name": name, "kind": kind}
+
+        removed = [b for b, info in self.blocks.items() if info["kind"] in kinds and b not in current]
+        for block in removed:
+            self._drop(block)
+
+        # 还没有成分股的板块 (新增或此前获取失败) 都需要获取
+        pending = [b for b in current if b not in self.block_codes]
+        for block in current:
+            if block in self.block_codes:
+                self.blocks[block] = current[block]
+
+        wanted = set(blocks or ())
+        targets = [b for b in current if b in pending or refresh_existing or b in wanted]
+
+        added, refreshed, failed = [], [], []
+        for block, data, exc in td._pooled_map(lambda b: self._fetch(td, catalog, "ths_block_components", b),
+                                               targets, max_workers):
+            if exc is not None or data is None:
+                if exc is not None:
+                    print(f"ths_block_components {block} exception occurred: {exc}")
+                failed.append(block)
+                continue
+            if block not in self.blocks:
+                added.append(block)
+            self.blocks[block] = current[block]
+            self._set_members(block, data["code"].astype(str) if not data.empty else [])
+            refreshed.append(block)
+
+        # 获取失败且没有成分股的板块不保留，下次 update 时作为新增板块重新获取
+        for block in failed:
+            if block not in self.block_codes:
+                self.blocks.pop(block, None)
+
+        position = {b: i for i, b in enumerate(current)}
+        added, refreshed, failed = (sorted(names, key=position.get) for names in (added, refreshed, failed))
+        return {"added": added, "removed": removed, "refreshed": refreshed, "failed": failed}
+
+    # ---- 持久化 ----
+
+    def save(self, path: str) -> None:
+        """保存为 JSON 文件."""
+        write_json(path, {"blocks": self.blocks, "block_codes": self.block_codes})
+
+    @classmethod
+    def load(cls, path: str) -> "BlockIndex":
+        """读取 :meth:`save` 保存的索引，文件不存在时返回空索引."""
+        index = cls()
+        data = read_json(path)
+        if data is None:
+            return index
+        index.blocks = data["blocks"]
+        for block, codes in data["block_codes"].items():
+            index._set_members(block, codes)
+        return index
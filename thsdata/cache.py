@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# File: cache.py
+# Description: Persistent on-disk K-line cache with incremental gap fill.
+# Author: bensema
+# License: MIT
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .storage import read_frame, write_frame, read_json, write_json
+from .times import china_tz, _int_2_time
+
+# 不指定开始时间时视为全部历史
+HISTORY_FLOOR = pd.Timestamp(1990, 1, 1)
+
+# 日K线周期，周/月/季/年K线的周期值更大
+DAY = 0x4000
+
+
+def _to_timestamp(value: Any, default: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """把 download/security_bars 接受的时间参数转换为北京时间的 naive Timestamp.
+
+    支持 None、datetime、pd.Timestamp、'2024-01-01' 字符串、20240101 形式的整数日期
+    以及分钟K线使用的整数时间，无法识别时返回 None (调用方应绕过缓存).
+    """
+    if value is None:
+        return default
+    if isinstance(value, (int, np.integer)):
+        try:
+            if 19000101 <= value <= 29991231:
+                return pd.Timestamp(datetime.strptime(str(int(value)), '%Y%m%d'))
+            # 1929 年以后的分钟整数时间都大于 29991231，两种格式不会混淆
+            return pd.Timestamp(_int_2_time(int(value)))
+        except ValueError:
+            return None
+    if isinstance(value, (str, datetime, pd.Timestamp)):
+        try:
+            ts = pd.Timestamp(value)
+        except ValueError:
+            return None
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert(china_tz).tz_localize(None)
+        return ts
+    return None
+
+
+def _local_naive(times: pd.Series) -> pd.Series:
+    """K线 time 列统一转换为北京时间 naive datetime 便于比较."""
+    times = pd.to_datetime(times)
+    if getattr(times.dt, 'tz', None) is not None:
+        times = times.dt.tz_convert(china_tz).dt.tz_localize(None)
+    return times
+
+
+def _same_bar(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    """比较同一时间点的两根K线数值是否一致."""
+    for col in a.columns:
+        if col == 'time' or col not in b.columns:
+            continue
+        if not (pd.api.types.is_numeric_dtype(a[col]) and pd.api.types.is_numeric_dtype(b[col])):
+            continue
+        if not np.allclose(a[col].to_numpy(dtype=float), b[col].to_numpy(dtype=float), equal_nan=True):
+            return False
+    return True
+
+
+class KlineCache:
+    """K线本地缓存.
+
+    按 (来源, 证券代码, 周期, 复权类型) 在磁盘上保存一份K线数据，并记录已覆盖的时间区间。
+    查询时只向服务器请求缺失的区间，再与本地数据合并。
+
+    - 当天(北京时间)及以后的K线仍可能变化，不会写入缓存，每次都会重新获取。
+    - 只缓存分钟和日K线。周/月/季/年K线未走完时以最新交易日为时间，走完后时间会变，无法与缓存对齐，因此不缓存。
+    - 向后补数时会与本地最后一根K线重叠比较，不一致(例如前复权数据因分红而变化)时整体重新下载。
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self._locks: Dict[Tuple, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, key: Tuple) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _path(self, key: Tuple) -> str:
+        source, code, interval, adjust = key
+        return os.path.join(self.root, source, f"{interval:x}", adjust or "N", code)
+
+    def load(self, source: str, code: str, interval: int, adjust: str) -> Tuple[Optional[pd.DataFrame], Optional[dict]]:
+        """读取缓存数据和覆盖区间元数据."""
+        path = self._path((source, code, interval, adjust))
+        return read_frame(path), read_json(path + ".json")
+
+    def clear(self, source: str, code: str, interval: int, adjust: str) -> None:
+        """删除指定缓存."""
+        key = (source, code, interval, adjust)
+        with self._lock(key):
+            path = self._path(key)
+            for p in (path + ".json", path + ".parquet", path + ".pkl"):
+                if os.path.exists(p):
+                    os.remove(p)
+
+    def fetch(self, source: str, code: str, start: Any, end: Any, interval: int, adjust: str,
+              fetcher: Callable[[pd.Timestamp, pd.Timestamp], pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """从缓存中取K线，缺失区间通过 fetcher(start, end) 获取后合并保存.
+
+        :param fetcher: 接收北京时间 naive Timestamp 起止时间，返回该区间K线的函数
+        :return: pandas.DataFrame，周期大于日K线或 start/end 无法识别时返回 None
+        """
+        if interval > DAY:
+            return None
+        now = pd.Timestamp.now(tz=china_tz).tz_localize(None)
+        start_ts = _to_timestamp(start, HISTORY_FLOOR)
+        end_ts = _to_timestamp(end, now)
+        if start_ts is None or end_ts is None:
+            return None
+        today = now.normalize()
+
+        key = (source, code, interval, adjust)
+        with self._lock(key):
+            path = self._path(key)
+            data, meta = read_frame(path), read_json(path + ".json")
+            if data is None or meta is None or data.empty:
+                data, lo, hi = None, None, None
+            else:
+                lo, hi = pd.Timestamp(meta['start']), pd.Timestamp(meta['end'])
+
+            frames = self._fill(data, lo, hi, start_ts, end_ts, fetcher)
+            if frames is None:
+                # 重叠K线不一致，本地数据失效，整体重新获取
+                data = None
+                lo, hi = start_ts, end_ts
+                frames = [fetcher(start_ts, end_ts)]
+            else:
+                lo = start_ts if lo is None else min(lo, start_ts)
+                hi = end_ts if hi is None else max(hi, end_ts)
+
+            parts = [f for f in [data, *frames] if f is not None and not f.empty]
+            if not parts:
+                return frames[-1] if frames and frames[-1] is not None else pd.DataFrame()
+
+            merged = pd.concat(parts, ignore_index=True)
+            times = _local_naive(merged['time'])
+            merged = merged.assign(_t=times).drop_duplicates('_t', keep='last').sort_values('_t')
+
+            stable = merged[merged['_t'] < today]
+            if frames:
+                write_frame(path, stable.drop(columns='_t').reset_index(drop=True))
+                write_json(path + ".json", {'start': str(lo), 'end': str(min(hi, today - pd.Timedelta(1)))})
+
+            window = merged[(merged['_t'] >= start_ts) & (merged['_t'] <= end_ts)]
+            return window.drop(columns='_t').reset_index(drop=True)
+
+    @staticmethod
+    def _fill(data: Optional[pd.DataFrame], lo, hi, start_ts, end_ts, fetcher) -> Optional[List[pd.DataFrame]]:
+        """获取缺失区间，返回新数据列表；尾部重叠校验失败时返回 None."""
+        if data is None:
+            return [fetcher(start_ts, end_ts)]
+
+        frames = []
+        if start_ts < lo:
+            frames.append(fetcher(start_ts, lo))
+        if end_ts > hi:
+            times = _local_naive(data['time'])
+            last_time = times.max()
+            tail = fetcher(last_time, end_ts)
+            if tail is not None and not tail.empty:
+                overlap = tail[_local_naive(tail['time']) == last_time]
+                if not overlap.empty and not _same_bar(data[times == last_time].tail(1), overlap.tail(1)):
+                    return None
+            frames.append(tail)
+        return frames
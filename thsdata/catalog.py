@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+# File: catalog.py
+# Description: Cached code and block catalog with TTL, disk persistence and change detection.
+# Author: bensema
+# License: MIT
+
+import os
+import time
+import threading
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .storage import read_frame, write_frame, read_json, write_json
+
+# 可缓存的列表接口，值为是否需要参数
+CATALOG_METHODS = {
+    "stock_codes": False,
+    "conbond_codes": False,
+    "etf_codes": False,
+    "ths_industry_block": False,
+    "ths_industry_sub_block": False,
+    "ths_concept_block": False,
+    "ths_block_components": True,
+}
+
+CatalogKey = Tuple[str, ...]
+
+
+class CatalogDiff:
+    """一次刷新前后的代码变化.
+
+    :ivar key: (接口名, 参数...)，例如 ('ths_block_components', 'URFI881157')
+    :ivar added: 新增的代码
+    :ivar removed: 移除的代码
+    """
+
+    def __init__(self, key: CatalogKey, added: List[str], removed: List[str]):
+        self.key = key
+        self.added = added
+        self.removed = removed
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+    def __repr__(self):
+        return f"CatalogDiff(key={self.key!r}, added={self.added!r}, removed={self.removed!r})"
+
+
+def _codes(data: Optional[pd.DataFrame]) -> List[str]:
+    if data is None or data.empty or 'code' not in data.columns:
+        return []
+    return data['code'].astype(str).tolist()
+
+
+def diff_frames(key: CatalogKey, old: Optional[pd.DataFrame], new: Optional[pd.DataFrame]) -> CatalogDiff:
+    """按 code 列比较两个列表."""
+    old_codes, new_codes = _codes(old), _codes(new)
+    old_set, new_set = set(old_codes), set(new_codes)
+    return CatalogDiff(key,
+                       [code for code in new_codes if code not in old_set],
+                       [code for code in old_codes if code not in new_set])
+
+
+class Catalog:
+    """证券代码和板块列表缓存.
+
+    stock_codes、conbond_codes、etf_codes、ths_industry_block、ths_industry_sub_block、ths_concept_block
+    和 ths_block_components 的结果在内存(以及可选的磁盘目录)中缓存 ttl 秒。
+    调用 :meth:`start` 后由后台线程定期刷新过期数据，过期期间先返回旧数据；
+    每次刷新得到的新增/移除代码通过 :meth:`refresh` 的返回值和 on_change 回调给出。
+
+    Example::
+
+        catalog = Catalog(td, ttl=3600, cache_dir="~/.thsdata/catalog")
+        codes = catalog.stock_codes()
+        members = catalog.ths_block_components("URFI881157")
+    """
+
+    def __init__(self, td, ttl: float = 86400, cache_dir: Optional[str] = None,
+                 on_change: Optional[Callable[[CatalogDiff], None]] = None):
+        """
+        :param td: THSData 实例
+        :param ttl: 缓存有效期(秒)
+        :param cache_dir: 磁盘缓存目录，默认只在内存中缓存
+        :param on_change: 刷新后列表有变化时的回调，参数为 CatalogDiff
+        """
+        self.td = td
+        self.ttl = ttl
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir)) if cache_dir else None
+        self.on_change = on_change
+        self._entries: Dict[CatalogKey, Tuple[pd.DataFrame, float]] = {}
+        self._lock = threading.RLock()
+        self._key_locks: Dict[CatalogKey, threading.Lock] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- 列表接口 ----
+
+    def stock_codes(self) -> pd.DataFrame:
+        """缓存的 :meth:`THSData.stock_codes`."""
+        return self.get("stock_codes")
+
+    def conbond_codes(self) -> pd.DataFrame:
+        """缓存的 :meth:`THSData.conbond_codes`."""
+        return self.get("conbond_codes")
+
+    def etf_codes(self) -> pd.DataFrame:
+        """缓存的 :meth:`THSData.etf_codes`."""
+        return self.get("etf_codes")
+
+    def ths_industry_block(self) -> pd.DataFrame:
+        """缓存的 :meth:`THSData.ths_industry_block`."""
+        return self.get("ths_industry_block")
+
+    def ths_industry_sub_block(self) -> pd.DataFrame:
+        """缓存的 :meth:`THSData.ths_industry_sub_block`."""
+        return self.get("ths_industry_sub_block")
+
+    def ths_concept_block(self) -> pd.DataFrame:
+        """缓存的 :meth:`THSData.ths_concept_block`."""
+        return self.get("ths_concept_block")
+
+    def ths_block_components(self, block_code: str) -> pd.DataFrame:
+        """缓存的 :meth:`THSData.ths_block_components`."""
+        return self.get("ths_block_components", block_code)
+
+    # ---- 缓存 ----
+
+    def _key(self, name: str, args: Tuple[str, ...]) -> CatalogKey:
+        if name not in CATALOG_METHODS:
+            raise ValueError(f"不支持缓存的接口: {name}")
+        if CATALOG_METHODS[name] != bool(args):
+            raise ValueError(f"{name} 参数错误: {args}")
+        return (name, *args)
+
+    def _key_lock(self, key: CatalogKey) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _path(self, key: CatalogKey) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, "_".join(key))
+
+    def _load(self, key: CatalogKey) -> Optional[Tuple[pd.DataFrame, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        path = self._path(key)
+        if path is None:
+            return None
+        data, meta = read_frame(path), read_json(path + ".json")
+        if data is None or meta is None:
+            return None
+        entry = (data, meta["fetched_at"])
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _fresh(self, entry: Optional[Tuple[pd.DataFrame, float]]) -> bool:
+        return entry is not None and time.time() - entry[1] < self.ttl
+
+    def get(self, name: str, *args: str) -> pd.DataFrame:
+        """取缓存列表，未缓存或已过期时刷新.
+
+        后台刷新已启动且存在旧数据时，直接返回旧数据，由后台线程完成刷新。
+        返回缓存的副本，修改结果不影响缓存；从未获取成功时返回空 DataFrame。
+        """
+        data = self._get(name, *args)
+        return pd.DataFrame() if data is None else data.copy()
+
+    def _get(self, name: str, *args: str) -> Optional[pd.DataFrame]:
+        """同 :meth:`get`，返回缓存对象本身 (调用方不得修改)，从未获取成功时返回 None."""
+        key = self._key(name, args)
+        entry = self._load(key)
+        if self._fresh(entry):
+            return entry[0]
+        if entry is not None and self.running:
+            return entry[0]
+        self._refresh_key(key)
+        entry = self._load(key)
+        return entry[0] if entry is not None else None
+
+    def _refresh_key(self, key: CatalogKey) -> CatalogDiff:
+        with self._key_lock(key):
+            old = self._load(key)
+            new = self.td._list_frame(*key)
+            if new is None:
+                # 请求失败时保留旧数据，下次再试；空列表是正常结果，照常更新
+                return CatalogDiff(key, [], [])
+
+            fetched_at = time.time()
+            with self._lock:
+                self._entries[key] = (new, fetched_at)
+            path = self._path(key)
+            if path is not None:
+                write_frame(path, new)
+                write_json(path + ".json", {"fetched_at": fetched_at})
+
+        diff = diff_frames(key, old[0] if old is not None else None, new)
+        if diff.changed and old is not None and self.on_change is not None:
+            self.on_change(diff)
+        return diff
+
+    def refresh(self, name: Optional[str] = None, *args: str, stale_only: bool = False) -> Dict[CatalogKey, CatalogDiff]:
+        """刷新列表并返回变化.
+
+        :param name: 接口名，默认刷新所有已缓存的列表
+        :param stale_only: 只刷新已过期的列表
+        :return: {key: CatalogDiff}
+        """
+        if name is not None:
+            keys = [self._key(name, args)]
+        else:
+            with self._lock:
+                keys = list(self._entries)
+        diffs = {}
+        for key in keys:
+            if stale_only and self._fresh(self._load(key)):
+                continue
+            diffs[key] = self._refresh_key(key)
+        return diffs
+
+    def invalidate(self, name: Optional[str] = None, *args: str) -> None:
+        """使缓存过期，下次访问时重新获取."""
+        with self._lock:
+            keys = [self._key(name, args)] if name is not None else list(self._entries)
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries[key] = (entry[0], 0.0)
+
+    # ---- 后台刷新 ----
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """启动后台线程，每 interval 秒(默认 ttl/10)刷新一次已过期的列表."""
+        if self.running:
+            return
+        interval = interval if interval is not None else max(self.ttl / 10, 1.0)
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh(stale_only=True)
+                except Exception as e:
+                    print(f"catalog refresh exception occurred: {e}")
+
+        self._thread = threading.Thread(target=loop, name="thsdata-catalog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台刷新."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# File: codes.py
+# Description: Security code normalization, single and vectorized.
+# Author: bensema
+# License: MIT
+
+import sys
+import numpy as np
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _prefix_market(prefix: str) -> str:
+    """按数字代码前缀判断市场，无法识别时返回空字符串."""
+    if prefix.startswith(("688", "60")):  # 沪
+        return "USHA"
+    elif prefix.startswith(("300", "00")):  # 深
+        return "USZA"
+    elif prefix.startswith(("8", "4", "9")):  # 京
+        return "USTM"
+    elif prefix.startswith("11"):  # 深可转债
+        return "USZD"
+    elif prefix.startswith("12"):  # 沪可转债
+        return "USHD"
+    elif prefix.startswith("5"):  # 沪基金
+        return "USHJ"
+    elif prefix.startswith("15"):  # 深基金
+        return "USZJ"
+    return ""
+
+
+# 所有规则最长只看前3位，预先计算 000-999 对应的市场
+MARKET_TABLE = np.array([_prefix_market(f"{i:03d}") for i in range(1000)], dtype=object)
+# 同一张表的 UCS4 字符形式，用于向量化拼接代码
+_MARKET_CHARS = np.array([m or "\0\0\0\0" for m in MARKET_TABLE], dtype="U4").view(np.uint32).reshape(1000, 4)
+
+
+class InvalidCodeError(ValueError):
+    """批量规范化时存在无法识别的证券代码.
+
+    :ivar invalid: {位置或索引: 原始代码}
+    """
+
+    def __init__(self, invalid: Dict):
+        self.invalid = invalid
+        sample = ", ".join(f"{k}: {v!r}" for k, v in list(invalid.items())[:10])
+        more = " ..." if len(invalid) > 10 else ""
+        super().__init__(f"无法识别的证券代码 {len(invalid)} 个: {sample}{more}")
+
+
+def _isdigit2code(code: str) -> str:
+    """
+    Convert a 6-digit stock code to a 10-character code with a market prefix.
+
+    :param code: A 6-digit stock code (e.g., '600519').
+    :return: A 10-character code with the market prefix (e.g., 'USHA600519').
+    :raises ValueError: If the code is not 6 digits or does not match any known prefix.
+    """
+    if not code.isdigit() or len(code) != 6:
+        raise ValueError("证券数字代码必须是6位数字")
+
+    market = MARKET_TABLE[int(code[:3])]
+    if not market:
+        raise ValueError("未知的证券代码前缀")
+
+    return market + code
+
+
+def _normalize_code(code: str) -> str:
+    """
+    Normalize a security code to the 10-character THS format.
+
+    Uses the same rules as :func:`normalize_codes`, so a single code and a batch never disagree.
+
+    :param code: 600519, SH600519, 600519SH, SH.600519, 600519.SH or USHA600519.
+    :return: A 10-character code with the market prefix (e.g., 'USHA600519').
+    :raises InvalidCodeError: If the code format or market prefix is not supported.
+    """
+    normalized, valid = _normalize_array(np.array([code], dtype=object))
+    if not valid[0]:
+        raise InvalidCodeError({0: code})
+    return str(normalized[0])
+
+
+def _normalize_array(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """向量化规范化，返回 (U10 代码数组, 有效标记数组).
+
+    把代码转为定长 UCS4 字符矩阵，按长度和字符位置判断格式，再通过 MARKET_TABLE 查表拼接市场前缀。
+    """
+    n = len(values)
+    # 按列存放(第 i 行为所有代码的第 i 个字符)，使逐位判断都是连续内存运算；
+    # 超过10位的字符串截断为11位，仍会因长度不符被判为无效
+    chars = np.ascontiguousarray(values.astype("U11").view(np.uint32).reshape(n, 11).T)
+    chars -= ((chars >= ord("a")) & (chars <= ord("z"))).astype(np.uint32) * 32
+
+    length = np.count_nonzero(chars, axis=0)
+    is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+
+    def char(i, c):
+        return chars[i] == ord(c)
+
+    def digits6(offset):
+        return is_digit[offset:offset + 6].all(axis=0)
+
+    def market(i, allow_bj=True):
+        ok = char(i, "S") & (char(i + 1, "H") | char(i + 1, "Z"))
+        return ok | (char(i, "B") & char(i + 1, "J")) if allow_bj else ok
+
+    len8, len9 = length == 8, length == 9
+    f6 = (length == 6) & digits6(0)
+    f8p = len8 & market(0) & digits6(2)
+    f8s = len8 & digits6(0) & market(6)
+    f9p = len9 & market(0) & char(2, ".") & digits6(3)
+    f9s = len9 & digits6(0) & char(6, ".") & market(7, allow_bj=False)
+    f10 = (length == 10) & ((chars[:4] >= ord("A")) & (chars[:4] <= ord("Z"))).all(axis=0) & digits6(4)
+
+    six = np.where(f8p, chars[2:8], np.where(f9p, chars[3:9], chars[0:6]))
+    digit = six[:3].astype(np.int32) - ord("0")
+    prefix = np.clip(digit[0] * 100 + digit[1] * 10 + digit[2], 0, 999)
+
+    out = np.empty((n, 10), dtype=np.uint32)
+    out[:, :4] = _MARKET_CHARS[prefix]
+    out[:, 4:] = six.T
+    out[f10] = chars[:10, f10].T
+
+    valid = ((f6 | f8p | f8s | f9p | f9s) & (_MARKET_CHARS[prefix, 0] != 0)) | f10
+    return out.view("U10").reshape(n), valid
+
+
+def _is_series(obj) -> bool:
+    # 未导入 pandas 时输入不可能是 Series，避免为此加载 pandas
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(obj, pd.Series)
+
+
+def normalize_codes(codes: Union[Iterable[str], "pd.Series"],
+                    errors: str = "raise") -> Union[List[Optional[str]], "pd.Series"]:
+    """批量把证券代码转换为10位ths格式代码.
+
+    支持 :meth:`THSData.download` 接受的所有格式：600519, sh600519, 600519.SH, USHA600519 等，
+    市场前缀通过预先计算的查找表确定，整体以 NumPy 数组运算向量化执行。
+
+    :param codes: 证券代码列表或 pandas.Series
+    :param errors: 'raise' 存在无法识别的代码时抛出 :class:`InvalidCodeError` (包含全部无效代码)；
+                   'coerce' 无效代码返回 None
+    :return: 输入为 Series 时返回索引相同的 Series，否则返回 list
+
+    Example::
+
+        >>> normalize_codes(["600519", "sz000001", "300750.SZ", "USHA600036"])
+        ['USHA600519', 'USZA000001', 'USZA300750', 'USHA600036']
+    """
+    if errors not in ("raise", "coerce"):
+        raise ValueError("errors 必须是 'raise' 或 'coerce'")
+
+    is_series = _is_series(codes)
+    if is_series:
+        import pandas as pd
+    values = codes.to_numpy(dtype=object) if is_series else np.array(list(codes), dtype=object)
+    if len(values) == 0:
+        return pd.Series([], index=codes.index, dtype=object) if is_series else []
+
+    normalized, valid = _normalize_array(values)
+    result = normalized.astype(object)
+    if not valid.all():
+        invalid = ~valid
+        if errors == "raise":
+            keys = codes.index[invalid] if is_series else np.flatnonzero(invalid)
+            raise InvalidCodeError(dict(zip(keys.tolist(), values[invalid].tolist())))
+        result[invalid] = None
+
+    return pd.Series(result, index=codes.index, dtype=object) if is_series else result.tolist()
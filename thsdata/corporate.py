@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# File: corporate.py
+# Description: Vectorized parsing and persistent cache of corporate_action records.
+# Author: bensema
+# License: MIT
+
+import os
+import time
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+from .storage import read_frame, write_frame, read_json, write_json
+
+# 解析结果的列，数量均为每股
+ACTION_COLUMNS = ["code", "ex_date", "cash", "bonus", "conversion", "rights", "rights_price",
+                  "consideration_cash", "consideration_shares", "text"]
+
+_EVENT = r"(?P<date>\d{4}-\d{2}-\d{2})\((?P<body>[^)]*)\)"
+# 列名 -> 正则，同一事件中多次出现时求和
+_TERMS = {
+    "cash": r"(?:红利|派)([\d.]+)元",
+    "bonus": r"送([\d.]+)股",
+    "conversion": r"转增([\d.]+)股",
+    "rights": r"配股?([\d.]+)股",
+    "rights_price": r"配股价([\d.]+)元",
+    "consideration_cash": r"对价现金([\d.]+)元",
+    "consideration_shares": r"对价股票([\d.]+)股",
+}
+
+
+def _term(body: pd.Series, pattern: str) -> np.ndarray:
+    """按正则提取所有匹配的数值并按事件求和."""
+    values = body.str.extractall(pattern)[0].astype(float)
+    return values.groupby(level=0).sum().reindex(range(len(body)), fill_value=0.0).to_numpy()
+
+
+def parse_corporate_actions(actions: pd.DataFrame, code: Optional[str] = None) -> pd.DataFrame:
+    """把 :meth:`THSData.corporate_action` 的权息文本解析为结构化的列.
+
+    文本例如 "2024-06-19(每十股 红利308.76元)$"，一行中可以包含多个事件。解析对全部行一次完成，
+    可以传入多个证券合并后的 DataFrame (包含 code 列)。
+
+    :param actions: corporate_action 返回的 DataFrame，最后一列为权息文本
+    :param code: actions 不包含 code 列时使用的证券代码
+    :return: pandas.DataFrame，列为
+             code, ex_date (除权除息日), cash (每股现金红利), bonus (每股送股), conversion (每股转增),
+             rights (每股配股), rights_price (配股价), consideration_cash (股改每股对价现金),
+             consideration_shares (股改每股对价股票), text (原始文本)
+
+    Example::
+
+                 code    ex_date    cash  bonus  conversion  ...
+            USHA600519 2024-06-19  30.876    0.0         0.0  ...
+    """
+    if actions is None or actions.empty:
+        return pd.DataFrame(columns=ACTION_COLUMNS)
+
+    text_col = "权息资料" if "权息资料" in actions.columns else actions.columns[-1]
+    text = actions[text_col].astype(str).reset_index(drop=True)
+    events = text.str.extractall(_EVENT)
+    if events.empty:
+        return pd.DataFrame(columns=ACTION_COLUMNS)
+
+    rows = events.index.get_level_values(0).to_numpy()
+    body = events["body"].reset_index(drop=True)
+    if "code" in actions.columns:
+        codes = actions["code"].astype(str).to_numpy()[rows]
+    else:
+        codes = np.full(len(rows), code, dtype=object)
+
+    # "每十股"/"每10股" 按 10 股计，"每股" 按 1 股计
+    base = np.where(body.str.contains(r"每\s*股", regex=True).to_numpy(), 1.0, 10.0)
+    result = pd.DataFrame({
+        "code": codes,
+        "ex_date": pd.to_datetime(events["date"].to_numpy(), format="%Y-%m-%d"),
+    })
+    for col, pattern in _TERMS.items():
+        values = _term(body, pattern)
+        result[col] = values if col == "rights_price" else values / base
+    result["text"] = body.str.strip().to_numpy()
+    return result
+
+
+def _events(data: pd.DataFrame) -> Dict[str, set]:
+    """每个证券的 (除权除息日, 文本) 集合，用于判断权息事件是否变化."""
+    result: Dict[str, set] = {}
+    for code, ex_date, text in zip(data["code"], data["ex_date"], data["text"]):
+        result.setdefault(code, set()).add((pd.Timestamp(ex_date), text))
+    return result
+
+
+class CorporateActionStore:
+    """权息资料持久缓存.
+
+    每个证券的解析结果保存在同一个文件中，并记录获取时间。服务器没有权息变更通知，
+    因此是否请求按 ttl 决定：:meth:`refresh` 只重新请求从未获取、超过 ttl 或通过 :meth:`mark_changed`
+    标记的证券，请求在 THSData 连接池上并发执行。请求后与已缓存的事件比较，只替换事件有变化的证券，
+    请求失败的证券保留原有数据和获取时间，下次 refresh 时重试。
+
+    Example::
+
+        store = CorporateActionStore(td, "~/.thsdata/corporate")
+        store.refresh(codes)
+        dividends = store.get(codes)
+    """
+
+    def __init__(self, td, cache_dir: Optional[str] = None, ttl: float = 7 * 86400):
+        """
+        :param td: THSData 实例
+        :param cache_dir: 缓存目录，默认只在内存中缓存
+        :param ttl: 证券的权息资料超过多少秒后重新请求
+        """
+        self.td = td
+        self.ttl = ttl
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir)) if cache_dir else None
+        self._lock = threading.RLock()
+        self._fetched: Dict[str, float] = {}
+        self._changed: set = set()
+        self._data = pd.DataFrame(columns=ACTION_COLUMNS)
+        self._load()
+
+    def _path(self) -> Optional[str]:
+        return os.path.join(self.cache_dir, "corporate_actions") if self.cache_dir else None
+
+    def _load(self) -> None:
+        path = self._path()
+        if path is None:
+            return
+        data, meta = read_frame(path), read_json(path + ".json")
+        if data is None or meta is None:
+            return
+        self._data = data
+        self._fetched = meta["fetched"]
+
+    def _save(self) -> None:
+        path = self._path()
+        if path is None:
+            return
+        write_frame(path, self._data)
+        write_json(path + ".json", {"fetched": self._fetched})
+
+    @property
+    def codes(self) -> List[str]:
+        """已缓存的证券代码."""
+        with self._lock:
+            return list(self._fetched)
+
+    def mark_changed(self, codes: Iterable[str]) -> None:
+        """标记有新权息事件的证券，下次 refresh 时重新请求."""
+        with self._lock:
+            self._changed.update(codes)
+
+    def stale(self, codes: Iterable[str]) -> List[str]:
+        """需要重新请求的证券."""
+        now = time.time()
+        with self._lock:
+            return [code for code in codes
+                    if code in self._changed or now - self._fetched.get(code, 0.0) >= self.ttl]
+
+    def refresh(self, codes: Optional[Iterable[str]] = None, force: bool = False,
+                max_workers: Optional[int] = None) -> List[str]:
+        """请求并解析需要更新的证券.
+
+        :param codes: 证券代码，默认为全部已缓存的证券
+        :param force: 为 True 时全部重新请求
+        :return: 权息事件有变化(包括首次获取)的证券代码
+        """
+        codes = list(dict.fromkeys(codes if codes is not None else self.codes))
+        targets = codes if force else self.stale(codes)
+        if not targets:
+            return []
+
+        frames, fetched = [], []
+        for code, data, exc in self.td._pooled_map(self.td._corporate_action, targets, max_workers):
+            if exc is not None:
+                print(f"corporate_action {code} exception occurred: {exc}")
+                continue
+            if data is None:
+                # 请求失败，保留原有数据
+                continue
+            if not data.empty:
+                frames.append(data.assign(code=code))
+            fetched.append(code)
+
+        parsed = parse_corporate_actions(pd.concat(frames, ignore_index=True) if frames else None)
+        now = time.time()
+        with self._lock:
+            new_events = _events(parsed)
+            old_events = _events(self._data[self._data["code"].isin(fetched)])
+            updated = [code for code in fetched
+                       if code not in self._fetched or new_events.get(code, set()) != old_events.get(code, set())]
+            if updated:
+                keep = self._data[~self._data["code"].isin(updated)]
+                frames = [df for df in (keep, parsed[parsed["code"].isin(updated)]) if not df.empty]
+                self._data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=ACTION_COLUMNS)
+            for code in fetched:
+                self._fetched[code] = now
+                self._changed.discard(code)
+            self._save()
+        return updated
+
+    def get(self, codes: Optional[Iterable[str]] = None, refresh: bool = True) -> pd.DataFrame:
+        """取解析后的权息资料.
+
+        :param codes: 证券代码，默认全部已缓存的证券
+        :param refresh: 为 True 时先更新需要更新的证券
+        :return: pandas.DataFrame，列见 :func:`parse_corporate_actions`
+        """
+        if codes is not None:
+            codes = list(codes)
+            if refresh:
+                self.refresh(codes)
+        with self._lock:
+            data = self._data
+        if codes is not None:
+            data = data[data["code"].isin(codes)]
+        return data.sort_values(["code", "ex_date"], kind="stable").reset_index(drop=True)
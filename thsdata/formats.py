@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# File: formats.py
+# Description: Build columnar results (pandas, NumPy, Arrow, Polars) directly from response payloads.
+# Author: bensema
+# License: MIT
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence
+
+from .times import china_tz
+
+RESULT_FORMATS = ("pandas", "numpy", "arrow", "polars")
+
+
+def check_format(result_format: str) -> None:
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"result_format 必须是 {', '.join(RESULT_FORMATS)} 之一")
+
+
+def _time_column(values: Sequence[Any], unit: Optional[str]) -> pd.DatetimeIndex:
+    """time 列转换为北京时间 DatetimeIndex，unit 指定时按 Unix 时间戳解析."""
+    if unit is not None:
+        return pd.to_datetime(np.asarray(values, dtype=np.int64), unit=unit).tz_localize('UTC').tz_convert(china_tz)
+    return pd.DatetimeIndex(values)
+
+
+def records_to_columns(records: List[dict], columns: Optional[Sequence[str]] = None,
+                       time_unit: Optional[str] = None) -> Dict[str, Any]:
+    """按列从 payload 记录中取值，不经过逐行 DataFrame 构造.
+
+    :param records: response.payload.data
+    :param columns: 期望的列顺序，记录中缺少其中任一列时按记录自身的列返回
+    :param time_unit: time 列为 Unix 时间戳时的单位，例如 's'
+    :return: {列名: numpy 数组或 DatetimeIndex}
+    """
+    if not records:
+        return {col: np.array([], dtype=np.float64) for col in (columns or [])}
+
+    keys = list(records[0].keys())
+    if columns is None or not all(col in keys for col in columns):
+        columns = keys
+
+    data = {}
+    for col in columns:
+        values = [record.get(col) for record in records]
+        if col == 'time':
+            data[col] = _time_column(values, time_unit)
+        else:
+            data[col] = np.asarray(values)
+    return data
+
+
+def frame_to_columns(df: pd.DataFrame) -> Dict[str, Any]:
+    """DataFrame 转换为 {列名: 数组}，time 列保留时区."""
+    return {col: (pd.DatetimeIndex(df[col]) if col == 'time' else df[col].to_numpy()) for col in df.columns}
+
+
+def columns_to_format(data: Dict[str, Any], result_format: str) -> Any:
+    """把列数据构造为指定格式.
+
+    - pandas: pandas.DataFrame
+    - numpy: numpy.recarray，time 列为北京时间 naive datetime64[ns]
+    - arrow: pyarrow.Table，需要安装 pyarrow
+    - polars: polars.DataFrame，需要安装 polars
+    """
+    check_format(result_format)
+
+    if result_format == "pandas":
+        return pd.DataFrame({col: (values if col != 'time' else pd.Series(values)) for col, values in data.items()})
+
+    if result_format == "numpy":
+        arrays = []
+        for col, values in data.items():
+            if isinstance(values, pd.DatetimeIndex):
+                if values.tz is not None:
+                    values = values.tz_convert(china_tz).tz_localize(None)
+                values = values.to_numpy(dtype='datetime64[ns]')
+            arrays.append(np.asarray(values))
+        if not arrays:
+            return np.rec.array(np.empty(0, dtype=[]))
+        return np.rec.fromarrays(arrays, names=list(data.keys()))
+
+    if result_format == "arrow":
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("result_format='arrow' 需要安装 pyarrow: pip install pyarrow") from e
+        return pa.table({col: pa.array(values) for col, values in data.items()})
+
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError("result_format='polars' 需要安装 polars: pip install polars") from e
+    return pl.DataFrame({col: pl.Series(col, values) for col, values in data.items()})
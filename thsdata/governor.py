@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# File: governor.py
+# Description: Token-bucket rate limit and AIMD adaptive concurrency for THS session calls.
+# Author: bensema
+# License: MIT
+
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class TokenBucket:
+    """令牌桶限速，每秒补充 rate 个令牌，最多积累 burst 个."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取一个令牌，不足时等待，返回等待的秒数."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AIMDLimiter:
+    """加性增、乘性减的自适应并发上限.
+
+    请求成功且耗时不超过基准的 tolerance 倍时上限增加 1/limit (约每轮增加 1)，
+    出错或变慢时上限乘以 decrease，每个 cooldown 秒内最多下调一次。
+    基准耗时取观测到的最低耗时，并缓慢向上跟随。
+    """
+
+    def __init__(self, max_concurrency: int = 8, min_concurrency: int = 1, initial: Optional[float] = None,
+                 decrease: float = 0.5, tolerance: float = 2.0, target_latency: Optional[float] = None,
+                 cooldown: float = 1.0):
+        if min_concurrency < 1 or max_concurrency < min_concurrency:
+            raise ValueError("并发上限必须满足 1 <= min_concurrency <= max_concurrency")
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(initial if initial is not None else max_concurrency)
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.baseline: Optional[float] = None
+        self.inflight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> float:
+        """等待空闲并发名额，返回等待的秒数."""
+        start = time.monotonic()
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+        return time.monotonic() - start
+
+    def release(self, latency: float, ok: bool) -> None:
+        with self._cond:
+            self.inflight -= 1
+            if ok:
+                self.baseline = latency if self.baseline is None else min(
+                    latency, self.baseline + (latency - self.baseline) * 0.01)
+            target = self.target_latency or (self.baseline * self.tolerance if self.baseline else None)
+            slow = target is not None and latency > target
+            now = time.monotonic()
+            if not ok or slow:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(float(self.min_concurrency), self.limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class _Budget:
+    def __init__(self, rate: Optional[float], burst: Optional[float], limiter: AIMDLimiter):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.limiter = limiter
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0.0
+
+
+class Governor:
+    """THS 会话请求的限速和自适应并发控制.
+
+    每个接口 (query_data, download, security_bars, get_block_data, get_block_components,
+    wencai_base, wencai_nlp 以及网页接口) 有独立的预算：令牌桶限制每秒请求数，
+    AIMD 根据耗时和错误码 (response.code != 0 或异常) 调整同时进行的请求数，
+    批量任务会自动稳定在服务器可承受的最高吞吐。
+
+    Example::
+
+        governor = Governor(rate=50, max_concurrency=8, budgets={"download": {"rate": 20}})
+        td = THSData(pool_size=8, governor=governor)
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None, max_concurrency: int = 8,
+                 min_concurrency: int = 1, target_latency: Optional[float] = None, tolerance: float = 2.0,
+                 decrease: float = 0.5, cooldown: float = 1.0, budgets: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        :param rate: 每个接口默认每秒最大请求数，None 表示不限速
+        :param burst: 令牌桶容量，默认等于 rate
+        :param max_concurrency: 每个接口默认最大并发数
+        :param min_concurrency: 自适应下调的最低并发数
+        :param target_latency: 超过该耗时(秒)视为变慢，默认为基准耗时的 tolerance 倍
+        :param tolerance: 未指定 target_latency 时判断变慢的倍数
+        :param decrease: 出错或变慢时并发上限的缩小比例
+        :param cooldown: 两次下调之间的最短间隔(秒)
+        :param budgets: 按接口覆盖以上参数，例如 {"download": {"rate": 20, "max_concurrency": 4}}
+        """
+        self.defaults = dict(rate=rate, burst=burst, max_concurrency=max_concurrency,
+                             min_concurrency=min_concurrency, target_latency=target_latency,
+                             tolerance=tolerance, decrease=decrease, cooldown=cooldown)
+        self.overrides = budgets or {}
+        self._budgets: Dict[str, _Budget] = {}
+        self._lock = threading.Lock()
+
+    def _budget(self, endpoint: str) -> _Budget:
+        with self._lock:
+            budget = self._budgets.get(endpoint)
+            if budget is None:
+                opts = {**self.defaults, **self.overrides.get(endpoint, {})}
+                limiter = AIMDLimiter(max_concurrency=opts["max_concurrency"],
+                                      min_concurrency=opts["min_concurrency"],
+                                      decrease=opts["decrease"], tolerance=opts["tolerance"],
+                                      target_latency=opts["target_latency"], cooldown=opts["cooldown"])
+                budget = self._budgets[endpoint] = _Budget(opts["rate"], opts["burst"], limiter)
+            return budget
+
+    def call(self, endpoint: str, fn: Callable[[], Any]) -> Any:
+        """在接口预算内执行 fn."""
+        budget = self._budget(endpoint)
+        waited = budget.limiter.acquire()
+        if budget.bucket is not None:
+            waited += budget.bucket.acquire()
+        start = time.monotonic()
+        ok = False
+        try:
+            result = fn()
+            ok = getattr(result, "code", 0) == 0
+            return result
+        finally:
+            budget.limiter.release(time.monotonic() - start, ok)
+            with self._lock:
+                budget.calls += 1
+                budget.errors += 0 if ok else 1
+                budget.throttled += waited
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """各接口当前并发上限、进行中请求数、基准耗时、请求数、错误数和累计等待时间."""
+        with self._lock:
+            return {endpoint: {"limit": budget.limiter.limit, "inflight": budget.limiter.inflight,
+                               "baseline": budget.limiter.baseline, "calls": budget.calls,
+                               "errors": budget.errors, "throttled": budget.throttled}
+                    for endpoint, budget in self._budgets.items()}
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# File: metrics.py
+# Description: Per-endpoint counters and phase latency histograms with dict and Prometheus text export.
+# Author: bensema
+# License: MIT
+
+import re
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# 默认耗时分桶(秒)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 阶段: request 为会话请求(含网络和 thsdk 解码)，frame 为构造 DataFrame 及列排序、类型转换等整理
+PHASES = ("request", "frame")
+
+Hook = Callable[[str, Dict[str, Any]], None]
+
+_QUERY_ID = re.compile(r"(?:^|&)id=(\d+)")
+
+
+def endpoint_label(key: Tuple) -> str:
+    """请求键对应的指标接口名，query_data 按请求 id 区分，例如 'query_data:205'."""
+    endpoint = key[0]
+    if endpoint == "query_data" and len(key) > 1:
+        match = _QUERY_ID.search(key[1])
+        if match:
+            return f"query_data:{match.group(1)}"
+    return endpoint
+
+
+class Histogram:
+    """累计分桶直方图."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按分桶上界估计分位数."""
+        if self.count == 0:
+            return None
+        target = q * self.count
+        total = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            if total >= target:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "sum": self.sum, "buckets": dict(zip(map(str, self.buckets + ("+Inf",)),
+                                                                          self.counts)),
+                "p50": self.quantile(0.5), "p99": self.quantile(0.99)}
+
+
+class Metrics:
+    """请求指标.
+
+    记录每个接口的请求数、错误码、返回行数和字节数，以及 request/frame 各阶段耗时直方图。
+    THSData 未设置 metrics 时不做任何记录。
+
+    Example::
+
+        metrics = Metrics()
+        metrics.add_hook(lambda event, data: print(event, data))
+        td = THSData(metrics=metrics)
+        ...
+        print(metrics.to_prometheus())
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._hooks: List[Hook] = []
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls: Dict[str, int] = {}
+            self.rows: Dict[str, int] = {}
+            self.bytes: Dict[str, int] = {}
+            self.errors: Dict[Tuple[str, str], int] = {}
+            self.latency: Dict[Tuple[str, str], Histogram] = {}
+
+    # ---- 钩子 ----
+
+    def add_hook(self, hook: Hook) -> None:
+        """添加钩子，每次记录时以 (事件名, 数据) 调用，事件名为 'phase'、'result' 或 'error'."""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def _emit(self, event: str, data: Dict[str, Any]) -> None:
+        for hook in self._hooks:
+            try:
+                hook(event, data)
+            except Exception as e:
+                print(f"metrics hook exception occurred: {e}")
+
+    # ---- 记录 ----
+
+    def observe(self, endpoint: str, phase: str, seconds: float) -> None:
+        """记录一个阶段的耗时."""
+        with self._lock:
+            key = (endpoint, phase)
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if phase == "request":
+                self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        if self._hooks:
+            self._emit("phase", {"endpoint": endpoint, "phase": phase, "seconds": seconds})
+
+    def result(self, endpoint: str, rows: int, nbytes: int = 0) -> None:
+        """记录返回的行数和字节数，字节数为构造出的 DataFrame 各列占用的内存."""
+        with self._lock:
+            self.rows[endpoint] = self.rows.get(endpoint, 0) + rows
+            self.bytes[endpoint] = self.bytes.get(endpoint, 0) + nbytes
+        if self._hooks:
+            self._emit("result", {"endpoint": endpoint, "rows": rows, "bytes": nbytes})
+
+    def error(self, endpoint: str, code: Any) -> None:
+        """记录错误，code 为 response.code 或异常类型名."""
+        with self._lock:
+            key = (endpoint, str(code))
+            self.errors[key] = self.errors.get(key, 0) + 1
+        if self._hooks:
+            self._emit("error", {"endpoint": endpoint, "code": code})
+
+    def timed(self, endpoint: str, fn: Callable[[], Any]) -> Any:
+        """执行会话请求 fn，记录 request 阶段耗时和错误码."""
+        start = time.perf_counter()
+        try:
+            response = fn()
+        except Exception as e:
+            self.observe(endpoint, "request", time.perf_counter() - start)
+            self.error(endpoint, type(e).__name__)
+            raise
+        self.observe(endpoint, "request", time.perf_counter() - start)
+        code = getattr(response, "code", 0)
+        if code != 0:
+            self.error(endpoint, code)
+        return response
+
+    # ---- 导出 ----
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """按接口汇总的字典."""
+        with self._lock:
+            endpoints = sorted(set(self.calls) | set(self.rows) | {e for e, _ in self.latency} | {e for e, _ in self.errors})
+            return {endpoint: {
+                "calls": self.calls.get(endpoint, 0),
+                "rows": self.rows.get(endpoint, 0),
+                "bytes": self.bytes.get(endpoint, 0),
+                "errors": {code: n for (e, code), n in self.errors.items() if e == endpoint},
+                "latency": {phase: h.to_dict() for (e, phase), h in self.latency.items() if e == endpoint},
+            } for endpoint in endpoints}
+
+    def to_prometheus(self, prefix: str = "thsdata") -> str:
+        """Prometheus 文本格式."""
+        lines = []
+        with self._lock:
+            for name, values, help_ in ((f"{prefix}_requests_total", self.calls, "会话请求数"),
+                                        (f"{prefix}_rows_total", self.rows, "返回行数"),
+                                        (f"{prefix}_bytes_total", self.bytes, "返回字节数")):
+                lines += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+                lines += [f'{name}{{endpoint="{e}"}} {v}' for e, v in sorted(values.items())]
+
+            name = f"{prefix}_errors_total"
+            lines += [f"# HELP {name} 错误数", f"# TYPE {name} counter"]
+            lines += [f'{name}{{endpoint="{e}",code="{c}"}} {v}' for (e, c), v in sorted(self.errors.items())]
+
+            name = f"{prefix}_phase_seconds"
+            lines += [f"# HELP {name} 各阶段耗时", f"# TYPE {name} histogram"]
+            for (e, phase), h in sorted(self.latency.items()):
+                labels = f'endpoint="{e}",phase="{phase}"'
+                total = 0
+                for bound, n in zip(h.buckets + (float("inf"),), h.counts):
+                    total += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {total}')
+                lines.append(f"{name}_sum{{{labels}}} {h.sum}")
+                lines.append(f"{name}_count{{{labels}}} {h.count}")
+        return "\n".join(lines) + "\n"
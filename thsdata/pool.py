@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# File: pool.py
+# Description: A fixed-size pool of THS sessions shared by worker threads.
+# Author: bensema
+# License: MIT
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, List
+
+
+class SessionPool:
+    """THS 会话池.
+
+    持有 size 个由 factory 创建的会话，工作线程通过 :meth:`acquire` 独占借用一个会话，
+    用完后归还。当前线程借用的会话可通过 :meth:`current` 取得。
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 1):
+        if size < 1:
+            raise ValueError("连接池大小必须大于0")
+        self.sessions: List[Any] = [factory() for _ in range(size)]
+        self._idle = queue.LifoQueue()
+        for session in self.sessions:
+            self._idle.put(session)
+        self._local = threading.local()
+
+    @property
+    def size(self) -> int:
+        return len(self.sessions)
+
+    def current(self) -> Any:
+        """当前线程借用的会话，没有借用时返回 None."""
+        return getattr(self._local, "session", None)
+
+    @contextmanager
+    def acquire(self):
+        """借用一个空闲会话，所有会话都在使用中时阻塞等待.
+
+        同一线程嵌套调用时直接复用已借用的会话。
+        """
+        session = self.current()
+        if session is not None:
+            yield session
+            return
+
+        session = self._idle.get()
+        self._local.session = session
+        try:
+            yield session
+        finally:
+            self._local.session = None
+            self._idle.put(session)
+
+    @contextmanager
+    def idle(self):
+        """不阻塞地借出当前所有空闲会话，用完后归还，用于健康检查."""
+        sessions = []
+        while True:
+            try:
+                sessions.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            yield sessions
+        finally:
+            for session in reversed(sessions):
+                self._idle.put(session)
+
+    def connect(self) -> None:
+        for session in self.sessions:
+            session.connect()
+
+    def disconnect(self) -> None:
+        for session in self.sessions:
+            session.disconnect()
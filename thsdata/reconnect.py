@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# File: reconnect.py
+# Description: Disconnect detection, reconnect backoff and keepalive settings for THS sessions.
+# Author: bensema
+# License: MIT
+
+import time
+import random
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type
+
+# 断线时可以安全重放的接口 (只读查询)
+REPLAYABLE = frozenset({
+    "query_data", "download", "security_bars", "get_block_data", "get_block_components",
+    "wencai_base", "wencai_nlp",
+})
+
+
+class ReconnectPolicy:
+    """断线重连策略.
+
+    请求抛出 disconnect_errors 中的异常，或返回的 response.code 在 disconnect_codes 中、
+    response.message 包含 disconnect_messages 中的文字时视为断线：重新连接该会话后重放请求，
+    最多 retries 次，第 n 次重连前等待 min(backoff * 2 ** n, max_backoff) 秒 (带随机抖动)。
+    keepalive 指定时，连接后由后台线程每 keepalive 秒检查一次空闲会话，失败时自动重连。
+
+    Example::
+
+        td = THSData(pool_size=4, reconnect=ReconnectPolicy(retries=5, keepalive=30))
+    """
+
+    def __init__(self, retries: int = 3, backoff: float = 0.5, max_backoff: float = 10.0,
+                 keepalive: Optional[float] = None,
+                 disconnect_errors: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError, EOFError),
+                 disconnect_codes: Iterable[int] = (),
+                 disconnect_messages: Iterable[str] = ("未连接", "断开", "not connected", "connection")):
+        """
+        :param retries: 每个请求最多重连重放的次数
+        :param backoff: 重连退避的初始等待(秒)
+        :param max_backoff: 重连退避的最长等待(秒)
+        :param keepalive: 空闲会话健康检查间隔(秒)，默认不检查
+        :param disconnect_errors: 视为断线的异常类型，默认只包含连接断开和超时，其他 OSError 直接抛出
+        :param disconnect_codes: 视为断线的 response.code
+        :param disconnect_messages: response.message 包含这些文字(不区分大小写)时视为断线
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.keepalive = keepalive
+        self.disconnect_errors = tuple(disconnect_errors)
+        self.disconnect_codes = frozenset(disconnect_codes)
+        self.disconnect_messages = tuple(m.lower() for m in disconnect_messages)
+
+    def is_disconnect(self, error: Optional[BaseException] = None, response: Any = None) -> bool:
+        """判断异常或返回结果是否表示连接已断开."""
+        if error is not None:
+            return isinstance(error, self.disconnect_errors)
+        code = getattr(response, "code", 0)
+        if code == 0:
+            return False
+        if code in self.disconnect_codes:
+            return True
+        message = str(getattr(response, "message", "") or "").lower()
+        return any(m in message for m in self.disconnect_messages)
+
+    def delay(self, attempt: int) -> float:
+        """第 attempt 次重连前的等待时间."""
+        return min(self.backoff * 2 ** attempt, self.max_backoff) * random.uniform(0.5, 1.0)
+
+
+class SessionHealth:
+    """记录每个会话的重连代数和最近使用时间，保证同一次断线只重连一次."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: Dict[int, threading.Lock] = {}
+        self._generation: Dict[int, int] = {}
+        self._last_used: Dict[int, float] = {}
+        self.reconnects = 0
+
+    def _session_lock(self, session: Any) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(id(session), threading.Lock())
+
+    def generation(self, session: Any) -> int:
+        return self._generation.get(id(session), 0)
+
+    def touch(self, session: Any) -> None:
+        self._last_used[id(session)] = time.monotonic()
+
+    def idle_for(self, session: Any) -> float:
+        return time.monotonic() - self._last_used.get(id(session), 0.0)
+
+    def reconnect(self, session: Any, generation: int, delay: float) -> bool:
+        """断线时的代数仍为 generation 时等待 delay 秒后重连，已被其他线程重连时直接返回.
+
+        :return: 连接是否成功 (已被其他线程重连时返回 True)
+        """
+        with self._session_lock(session):
+            if self.generation(session) != generation:
+                return True
+            time.sleep(delay)
+            try:
+                session.disconnect()
+            except Exception:
+                pass
+            try:
+                session.connect()
+            except Exception as e:
+                print(f"reconnect exception occurred: {e}")
+                return False
+            self._generation[id(session)] = generation + 1
+            self.reconnects += 1
+            return True
+
+
+def run_with_reconnect(policy: ReconnectPolicy, health: SessionHealth, endpoint: str,
+                       session_fn: Callable[[], Any], fn: Callable[[], Any]) -> Any:
+    """执行 fn，断线时重连当前会话并重放可重放的请求.
+
+    :param session_fn: 返回本次请求使用的会话
+    """
+    attempt = 0
+    while True:
+        session = session_fn()
+        generation = health.generation(session)
+        health.touch(session)
+        try:
+            result = fn()
+        except Exception as e:
+            if not policy.is_disconnect(error=e) or endpoint not in REPLAYABLE or attempt >= policy.retries:
+                raise
+        else:
+            if not policy.is_disconnect(response=result) or endpoint not in REPLAYABLE or attempt >= policy.retries:
+                return result
+        health.reconnect(session, generation, policy.delay(attempt))
+        attempt += 1
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# File: resample.py
+# Description: Session-aware resampling of 1-minute bars into higher intervals.
+# Author: bensema
+# License: MIT
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+from .times import china_tz
+
+# 周期 -> 分钟数，与 Interval 中的取值一致
+RESAMPLE_MINUTES = {
+    0x3001: 1,  # MIN_1
+    0x3005: 5,  # MIN_5
+    0x300f: 15,  # MIN_15
+    0x301e: 30,  # MIN_30
+    0x303c: 60,  # MIN_60
+    0x3078: 120,  # MIN_120
+}
+RESAMPLE_DAY = 0x4000
+
+_OPEN = 9 * 60 + 30  # 09:30
+_MORNING_CLOSE = 11 * 60 + 30  # 11:30
+_AFTERNOON_OPEN = 13 * 60  # 13:00
+_SESSION_MINUTES = 240
+
+_AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum", "turnover": "sum"}
+
+
+def session_minutes(times: pd.Series) -> np.ndarray:
+    """K线时间转换为交易分钟序号.
+
+    09:30 为 0，11:30 为 120，13:01 为 121，15:00 为 240。09:30 之前的K线并入 0，
+    午休期间并入 120，15:00 之后并入 240。
+    """
+    times = pd.DatetimeIndex(times)
+    if times.tz is not None:
+        times = times.tz_convert(china_tz)
+    minute = np.asarray(times.hour * 60 + times.minute, dtype=np.int64)
+    morning = np.clip(minute - _OPEN, 0, _MORNING_CLOSE - _OPEN)
+    afternoon = np.clip(minute - _AFTERNOON_OPEN, 0, _SESSION_MINUTES - (_MORNING_CLOSE - _OPEN)) + (
+            _MORNING_CLOSE - _OPEN)
+    return np.where(minute <= _MORNING_CLOSE, morning, afternoon)
+
+
+def _label_offsets(end_minutes: np.ndarray) -> np.ndarray:
+    """交易分钟序号转换为距当天 00:00 的分钟数."""
+    morning = end_minutes <= _MORNING_CLOSE - _OPEN
+    return np.where(morning, _OPEN + end_minutes, _AFTERNOON_OPEN + end_minutes - (_MORNING_CLOSE - _OPEN))
+
+
+def resample_bars(data: pd.DataFrame, interval: int, by: Optional[str] = "code") -> pd.DataFrame:
+    """把1分钟K线合成为更高周期.
+
+    按A股交易时段划分：上午 09:30-11:30，下午 13:00-15:00，K线以结束时间标记。
+    09:30 的开盘K线并入第一根K线，例如 5 分钟周期的 09:35 包含 09:30 至 09:35；
+    60 分钟周期为 10:30、11:30、14:00、15:00。日K线时间为当天 00:00 (不带时区)，与服务器返回一致。
+
+    open 取第一根，close 取最后一根，high/low 取最大最小，volume/turnover 求和。
+
+    交易时段之外的K线按以下规则并入相邻的K线，而不是单独成一根：
+
+    - 09:30 及之前 (集合竞价) 并入第一根；
+    - 11:31 至 13:00 并入 11:30，因此标记为 13:00 的K线计入上午最后一根；
+    - 15:00 之后 (例如科创板盘后固定价格交易) 并入 15:00，服务器的 15:00 及日K线不含盘后成交时，
+      成交量会与服务器不同。
+
+    :param data: 1分钟K线，包含 time, open, high, low, close, volume, turnover 列，
+                 可包含多个证券，由 by 列区分
+    :param interval: 目标周期，Interval.MIN_1 至 Interval.MIN_120 或 Interval.DAY
+    :param by: 区分证券的列名，列不存在时视为单个证券
+    :return: pandas.DataFrame
+
+    Example::
+
+        bars = td.download("USHA600519", start=start, end=end, interval=Interval.MIN_1)
+        bars_30 = resample_bars(bars, Interval.MIN_30)
+    """
+    if interval != RESAMPLE_DAY and interval not in RESAMPLE_MINUTES:
+        raise ValueError("interval 只支持分钟级别周期和日K线")
+    if data is None or data.empty:
+        return data
+    if interval == 0x3001:
+        return data
+
+    by = by if by is not None and by in data.columns else None
+    data = data.sort_values([by, "time"] if by else "time", kind="stable")
+    times = pd.DatetimeIndex(data["time"])
+    local = times.tz_convert(china_tz) if times.tz is not None else times
+    day = local.normalize()
+
+    if interval == RESAMPLE_DAY:
+        labels = day.tz_localize(None) if day.tz is not None else day
+    else:
+        n = RESAMPLE_MINUTES[interval]
+        bucket = np.maximum(-(-session_minutes(local) // n), 1)
+        offsets = _label_offsets(np.minimum(bucket * n, _SESSION_MINUTES))
+        labels = day + pd.to_timedelta(offsets, unit="m")
+
+    keys = [data[by]] if by else []
+    keys.append(pd.Series(labels, index=data.index, name="time"))
+    agg = {col: how for col, how in _AGG.items() if col in data.columns}
+    return data[list(agg)].groupby(keys, sort=False).agg(agg).reset_index()
+
+
+def resample_all(data: pd.DataFrame, intervals: Optional[Iterable[int]] = None,
+                 by: Optional[str] = "code") -> Dict[int, pd.DataFrame]:
+    """从同一份1分钟K线合成多个周期.
+
+    :param intervals: 目标周期，默认全部分钟级别周期和日K线
+    :return: {interval: pandas.DataFrame}
+    """
+    if intervals is None:
+        intervals = [*RESAMPLE_MINUTES, RESAMPLE_DAY]
+    return {interval: resample_bars(data, interval, by=by) for interval in intervals}
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# File: schema.py
+# Description: Declared column dtypes per endpoint for compact DataFrames.
+# Author: bensema
+# License: MIT
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+# 服务器用于表示"无数据"的整数值
+SENTINEL = 2147483648
+
+# 列类型: price 为价格(按配置 float32/float64)，volume 为可空整数，category 为分类，
+# datetime 为时间，float 为 float64
+PRICE, VOLUME, CATEGORY, DATETIME, FLOAT = "price", "volume", "category", "datetime", "float"
+
+_BOOK = {**{f"bid{i}": PRICE for i in range(1, 6)},
+         **{f"ask{i}": PRICE for i in range(1, 6)},
+         **{f"bid{i}_vol": VOLUME for i in range(1, 6)},
+         **{f"ask{i}_vol": VOLUME for i in range(1, 6)}}
+
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "codes": {"code": CATEGORY, "name": CATEGORY},
+    "kline": {"time": DATETIME, "open": PRICE, "high": PRICE, "low": PRICE, "close": PRICE,
+              "volume": VOLUME, "turnover": FLOAT},
+    "call_auction": {"time": DATETIME, "price": PRICE, "cur_volume": VOLUME, **_BOOK},
+    "transaction_history": {"time": DATETIME, "price": PRICE, "transaction_count": VOLUME, "cur_volume": VOLUME,
+                            "volume": VOLUME, "turnover": FLOAT},
+    "market_data": {"code": CATEGORY, "name": CATEGORY, "price": PRICE, "open": PRICE, "high": PRICE, "low": PRICE,
+                    "pre_close": PRICE, "limit_up": PRICE, "limit_down": PRICE, "volume": VOLUME,
+                    "turnover": FLOAT, "deal_type": VOLUME, **_BOOK},
+    "order_book": {"code": CATEGORY, **_BOOK},
+}
+
+
+def _nullable_int(series: pd.Series) -> pd.Series:
+    """转换为可空整数，SENTINEL 视为缺失."""
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors="coerce")
+    series = series.mask(series == SENTINEL)
+    if pd.api.types.is_float_dtype(series) and not np.allclose(series.dropna() % 1, 0):
+        return series
+    return series.astype("Int64")
+
+
+def apply_schema(df: pd.DataFrame, endpoint: str, price_dtype: str = "float64") -> pd.DataFrame:
+    """按端点声明的类型转换 DataFrame 各列.
+
+    未声明的列中，包含 SENTINEL 的整数列转换为可空整数，code/name 之外的字符串列保持不变。
+
+    :param df: 原始 DataFrame
+    :param endpoint: SCHEMAS 中的端点名称
+    :param price_dtype: 价格列类型，'float32' 或 'float64'
+    :return: pandas.DataFrame
+    """
+    if price_dtype not in ("float32", "float64"):
+        raise ValueError("price_dtype 必须是 'float32' 或 'float64'")
+    if df is None or df.empty:
+        return df
+
+    schema = SCHEMAS[endpoint]
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        kind = schema.get(col)
+        if kind == PRICE:
+            series = pd.to_numeric(series, errors="coerce").mask(series == SENTINEL).astype(price_dtype)
+        elif kind == VOLUME:
+            series = _nullable_int(series)
+        elif kind == FLOAT:
+            series = pd.to_numeric(series, errors="coerce").astype("float64")
+        elif kind == CATEGORY:
+            series = series.astype("category")
+        elif kind == DATETIME:
+            if series.dtype == object:
+                series = pd.to_datetime(series)
+        elif pd.api.types.is_integer_dtype(series) and (series == SENTINEL).any():
+            series = _nullable_int(series)
+        columns[col] = series
+    return pd.DataFrame(columns, index=df.index)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# File: singleflight.py
+# Description: Coalesce concurrent identical requests into a single in-flight call.
+# Author: bensema
+# License: MIT
+
+import re
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+_INSTANCE = re.compile(r"(?:^|&)instance=[^&]*")
+
+
+def normalize_req(req: str) -> str:
+    """去掉 query_data 请求中每次递增的 instance 参数，作为合并请求的键."""
+    return _INSTANCE.sub("", req).lstrip("&")
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """相同键的并发请求只执行一次.
+
+    第一个调用者执行请求，同一时间到达的其他调用者等待并共享其结果或异常。
+    请求完成后键即被释放，之后的调用会重新请求，因此不会返回过期数据。
+
+    Example::
+
+        flight = SingleFlight()
+        response = flight.do(("query_data", normalize_req(req)), lambda: hq.query_data(req))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.shared = 0  # 共享了其他调用者结果的次数
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def in_flight(self) -> int:
+        """正在执行的请求数量."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# File: storage.py
+# Description: Small helpers for persisting DataFrames and metadata on local disk.
+#              Parquet is used when pyarrow is installed, pickle otherwise.
+# Author: bensema
+# License: MIT
+
+import os
+import json
+import tempfile
+import pandas as pd
+from typing import Optional
+
+try:
+    import pyarrow  # noqa: F401
+
+    FRAME_SUFFIX = ".parquet"
+except ImportError:  # pragma: no cover - optional dependency
+    FRAME_SUFFIX = ".pkl"
+
+
+def _atomic_write(path: str, writer) -> None:
+    """先写入临时文件再替换，避免进程中断留下半个文件."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        writer(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def write_frame(path: str, df: pd.DataFrame) -> str:
+    """保存 DataFrame，path 不含后缀，返回实际写入的文件路径."""
+    target = path + FRAME_SUFFIX
+    if FRAME_SUFFIX == ".parquet":
+        _atomic_write(target, lambda p: df.to_parquet(p, index=False))
+    else:
+        _atomic_write(target, lambda p: df.to_pickle(p))
+    return target
+
+
+def read_frame(path: str) -> Optional[pd.DataFrame]:
+    """读取 write_frame 保存的 DataFrame，文件不存在时返回 None."""
+    target = path + FRAME_SUFFIX
+    if not os.path.exists(target):
+        return None
+    if FRAME_SUFFIX == ".parquet":
+        return pd.read_parquet(target)
+    return pd.read_pickle(target)
+
+
+def write_json(path: str, obj: dict) -> None:
+    def writer(p):
+        with open(p, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False)
+
+    _atomic_write(path, writer)
+
+
+def read_json(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
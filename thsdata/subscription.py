@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+# File: subscription.py
+# Description: Polling subscription engine for real-time snapshots with delta emission.
+# Author: bensema
+# License: MIT
+
+import time
+import asyncio
+import threading
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+
+# 列缓冲区类型，按 int < float < object 的顺序提升
+_INT, _FLOAT, _OBJECT = 0, 1, 2
+
+
+def _kind(series: pd.Series) -> int:
+    if pd.api.types.is_bool_dtype(series):
+        return _OBJECT
+    if pd.api.types.is_integer_dtype(series):
+        return _INT
+    if pd.api.types.is_float_dtype(series):
+        return _FLOAT
+    return _OBJECT
+
+
+class _Column:
+    """一个字段的列缓冲区：浮点为 float64 (缺失为 NaN)，整数为 int64，字符串等其他类型为 object.
+
+    valid 标记每个证券是否已有值。
+    """
+
+    __slots__ = ("kind", "values", "valid")
+
+    def __init__(self, kind: int, values: np.ndarray, valid: np.ndarray):
+        self.kind = kind
+        self.values = values
+        self.valid = valid
+
+    @classmethod
+    def empty(cls, kind: int, n: int) -> "_Column":
+        if kind == _INT:
+            values = np.zeros(n, dtype=np.int64)
+        elif kind == _FLOAT:
+            values = np.full(n, np.nan)
+        else:
+            values = np.full(n, None, dtype=object)
+        return cls(kind, values, np.zeros(n, dtype=bool))
+
+    def convert(self, series: pd.Series):
+        """把一列新数据转换为本缓冲区的类型，返回 (值, 是否有值)."""
+        valid = series.notna().to_numpy()
+        if self.kind == _INT:
+            values = series.fillna(0).to_numpy(dtype=np.int64)
+        elif self.kind == _FLOAT:
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            values = series.to_numpy(dtype=object)
+        return values, valid
+
+    def promote(self, kind: int) -> "_Column":
+        if kind <= self.kind:
+            return self
+        if kind == _FLOAT:
+            values = np.where(self.valid, self.values, np.nan).astype(np.float64)
+        else:
+            values = self.values.astype(object)
+            values[~self.valid] = None
+        return _Column(kind, values, self.valid)
+
+    def extend(self, n: int) -> "_Column":
+        tail = _Column.empty(self.kind, n)
+        return _Column(self.kind, np.concatenate([self.values, tail.values]),
+                       np.concatenate([self.valid, tail.valid]))
+
+    def take(self, mask: np.ndarray) -> "_Column":
+        return _Column(self.kind, self.values[mask], self.valid[mask])
+
+    def to_array(self) -> Any:
+        if self.kind == _INT:
+            return pd.arrays.IntegerArray(self.values.copy(), ~self.valid)
+        return self.values.copy()
+
+
+class SnapshotDelta:
+    """一次轮询中发生变化的数据.
+
+    :ivar time: 本次轮询完成时间 (Unix 时间戳)
+    :ivar latency: 本次请求耗时(秒)
+    :ivar changes: {code: {字段: 新值}}，只包含变化的证券和字段
+    """
+
+    def __init__(self, time_: float, latency: float, changes: Dict[str, Dict[str, Any]]):
+        self.time = time_
+        self.latency = latency
+        self.changes = changes
+
+    def __len__(self):
+        return len(self.changes)
+
+    def to_frame(self) -> pd.DataFrame:
+        """变化转换为 DataFrame，未变化的字段为 NaN."""
+        return pd.DataFrame.from_dict(self.changes, orient="index").rename_axis("code").reset_index()
+
+    def __repr__(self):
+        return f"SnapshotDelta(time={self.time:.3f}, latency={self.latency:.3f}, changes={len(self.changes)})"
+
+
+class Subscription:
+    """行情快照订阅.
+
+    按固定间隔轮询关注列表的 :meth:`THSData.stock_cur_market_data` (或 conbond_cur_market_data)，
+    请求按市场分组分批发出。上一次快照按字段保存在定类型的 NumPy 数组中 (float64、带有效位的 int64，
+    只有 name 等字符串字段为 object)，每次只把变化的证券和字段
+    通过回调或异步迭代器发出，并记录每轮请求耗时。
+
+    Example::
+
+        sub = Subscription(td, ["USHA600519", "USZA000001"], interval=3)
+        sub.add_callback(lambda delta: print(delta.changes))
+        sub.start()
+        ...
+        sub.stop()
+
+        async for delta in sub.stream():
+            ...
+    """
+
+    def __init__(self, td, codes: Iterable[str], interval: float = 3.0, kind: str = "stock",
+                 fields: Optional[List[str]] = None, batch_size: int = 100, latency_window: int = 1000):
+        """
+        :param td: THSData 实例
+        :param codes: 关注的证券代码
+        :param interval: 轮询间隔(秒)
+        :param kind: 'stock' 使用 stock_cur_market_data，'conbond' 使用 conbond_cur_market_data
+        :param fields: 只比较和发出这些字段，默认全部字段
+        :param batch_size: 每次请求的最大代码数量
+        :param latency_window: 保留最近多少轮的耗时用于统计
+        """
+        if kind not in ("stock", "conbond"):
+            raise ValueError("kind 必须是 'stock' 或 'conbond'")
+        self.td = td
+        self.interval = interval
+        self.kind = kind
+        self.fields = fields
+        self.batch_size = batch_size
+        self._codes: List[str] = list(dict.fromkeys(codes))
+        self._columns: Dict[str, _Column] = {}
+        self._latencies = deque(maxlen=latency_window)
+        self._callbacks: List[Callable[[SnapshotDelta], None]] = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- 关注列表 ----
+
+    @property
+    def codes(self) -> List[str]:
+        return list(self._codes)
+
+    def add_codes(self, codes: Iterable[str]) -> None:
+        with self._lock:
+            new = [code for code in codes if code not in self._codes]
+            if not new:
+                return
+            self._codes.extend(new)
+            # 新代码以缺失值开头，下一轮全部字段作为变化发出
+            for field, column in self._columns.items():
+                self._columns[field] = column.extend(len(new))
+
+    def remove_codes(self, codes: Iterable[str]) -> None:
+        with self._lock:
+            removed = set(codes)
+            keep = np.array([code not in removed for code in self._codes], dtype=bool)
+            self._codes = [code for code in self._codes if code not in removed]
+            for field, column in self._columns.items():
+                self._columns[field] = column.take(keep)
+
+    def snapshot(self) -> pd.DataFrame:
+        """最近一次快照."""
+        with self._lock:
+            data = pd.DataFrame({field: column.to_array() for field, column in self._columns.items()})
+            data.insert(0, "code", self._codes)
+            return data
+
+    # ---- 回调 ----
+
+    def add_callback(self, callback: Callable[[SnapshotDelta], None]) -> None:
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[SnapshotDelta], None]) -> None:
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    # ---- 轮询 ----
+
+    def _fetch(self, codes: List[str]) -> pd.DataFrame:
+        if self.kind == "stock":
+            return self.td.stock_cur_market_data(codes, batch_size=self.batch_size)
+        return self.td.conbond_cur_market_data(codes, batch_size=self.batch_size)
+
+    def poll(self) -> SnapshotDelta:
+        """请求一次快照并返回与上一次相比的变化，同时通知回调."""
+        with self._lock:
+            codes = list(self._codes)
+        started = time.perf_counter()
+        data = self._fetch(codes) if codes else pd.DataFrame()
+        latency = time.perf_counter() - started
+        self._latencies.append(latency)
+
+        changes = self._apply(codes, data)
+        delta = SnapshotDelta(time.time(), latency, changes)
+        for callback in list(self._callbacks):
+            try:
+                callback(delta)
+            except Exception as e:
+                print(f"subscription callback exception occurred: {e}")
+        return delta
+
+    def _apply(self, codes: List[str], data: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """把新快照写入列缓冲区，返回变化."""
+        if data is None or data.empty or "code" not in data.columns:
+            return {}
+
+        data = data.drop_duplicates("code").set_index("code")
+        fields = [f for f in (self.fields or data.columns) if f in data.columns]
+        # 类型按对齐前的列判断，reindex 产生的缺失值会把整数列变成浮点
+        kinds = {field: _kind(data[field]) for field in fields}
+        data = data.reindex(codes)
+        changed_rows: Dict[int, Dict[str, Any]] = {}
+
+        with self._lock:
+            if codes != self._codes:
+                # 轮询期间关注列表发生变化，按最新列表对齐
+                data = data.reindex(self._codes)
+                codes = list(self._codes)
+            for field in fields:
+                column = self._columns.get(field)
+                if column is None:
+                    column = _Column.empty(kinds[field], len(codes))
+                column = self._columns[field] = column.promote(kinds[field])
+                new, new_valid = column.convert(data[field])
+                both = new_valid & column.valid
+                diff = new_valid & ~column.valid
+                diff[both] = (new[both] != column.values[both]).astype(bool)
+                for i in np.flatnonzero(diff):
+                    value = new[i]
+                    changed_rows.setdefault(i, {})[field] = value.item() if isinstance(value, np.generic) else value
+                # 本轮未返回数据的证券保留旧值，不算作变化
+                column.values[new_valid] = new[new_valid]
+                column.valid |= new_valid
+
+        return {codes[i]: fields_ for i, fields_ in sorted(changed_rows.items())}
+
+    def latency_stats(self) -> Dict[str, float]:
+        """最近若干轮请求耗时统计(秒)."""
+        values = np.array(self._latencies, dtype=float)
+        if len(values) == 0:
+            return {"count": 0}
+        return {
+            "count": int(len(values)),
+            "last": float(values[-1]),
+            "mean": float(values.mean()),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(values.max()),
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动后台轮询线程."""
+        if self.running:
+            return
+        self._stop.clear()
+
+        def loop():
+            next_run = time.monotonic()
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"subscription poll exception occurred: {e}")
+                # 按固定节拍轮询，请求耗时超过间隔时立即开始下一轮
+                next_run = max(next_run + self.interval, time.monotonic())
+                self._stop.wait(next_run - time.monotonic())
+
+        self._thread = threading.Thread(target=loop, name="thsdata-subscription", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台轮询."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def stream(self, skip_empty: bool = True, maxsize: int = 0) -> AsyncIterator[SnapshotDelta]:
+        """异步迭代每轮的变化，未启动轮询时自动启动，迭代结束时停止.
+
+        :param skip_empty: 跳过没有变化的轮次
+        :param maxsize: 队列长度上限，消费过慢时丢弃最旧的变化，0 表示不限
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+        def put(delta):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(delta)
+
+        def callback(delta):
+            if skip_empty and not delta.changes:
+                return
+            loop.call_soon_threadsafe(put, delta)
+
+        started_here = not self.running
+        self.add_callback(callback)
+        if started_here:
+            self.start()
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.remove_callback(callback)
+            if started_here:
+                await loop.run_in_executor(None, self.stop)
@@ -9,59 +9,67 @@
 # Note: This project is for personal research and study purposes only.
 #       It is not intended for illegal use, and the author is not responsible for any issues caused by misuse.
 
-import pytz
 import json
 import random
 import inspect
-import requests
+import functools
+import itertools
 import datetime
+import threading
+import numpy as np
 import pandas as pd
 from thsdk import THS
-from typing import Any, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime, time
-
-china_tz = pytz.timezone('Asia/Shanghai')
-
-
-def _isdigit2code(code: str) -> str:
-    """
-    Convert a 6-digit stock code to a 10-character code with a market prefix.
-
-    :param code: A 6-digit stock code (e.g., '600519').
-    :return: A 10-character code with the market prefix (e.g., 'USHA600519').
-    :raises ValueError: If the code is not 6 digits or does not match any known prefix.
-    """
-    if not code.isdigit() or len(code) != 6:
-        raise ValueError("证券数字代码必须是6位数字")
-
-    if code.startswith(("688", "60")):  # 沪
-        market = "USHA"
-    elif code.startswith(("300", "00")):  # 深
-        market = "USZA"
-    elif code.startswith(("8", "4", "9")):  # 京
-        market = "USTM"
-    elif code.startswith("11"):  # 深可转债
-        market = "USZD"
-    elif code.startswith("12"):  # 沪可转债
-        market = "USHD"
-    elif code.startswith("5"):  # 沪基金
-        market = "USHJ"
-    elif code.startswith("15"):  # 深基金
-        market = "USZJ"
-    else:
-        raise ValueError("未知的证券代码前缀")
-
-    return market + code
-
-
-def _time_2_int(t: datetime) -> int:
-    dst = (t.minute +
-           (t.hour << 6) +
-           (t.day << 11) +
-           (t.month << 16) +
-           (t.year << 20) -
-           0x76c00000)
-    return dst
+from time import perf_counter
+from .cache import KlineCache, _local_naive, _to_timestamp
+from .codes import _isdigit2code, _normalize_code, normalize_codes
+from .pool import SessionPool
+from .resample import resample_all
+from .adjust import adjust_bars, parse_events
+from .schema import SENTINEL, apply_schema
+from .formats import check_format, columns_to_format, frame_to_columns, records_to_columns
+from .times import china_tz, _time_2_int
+from .governor import Governor
+from .metrics import Metrics, endpoint_label
+from .reconnect import ReconnectPolicy, SessionHealth, run_with_reconnect
+from .singleflight import SingleFlight, normalize_req
+from .web import ATTENTION_URL, GETSHAPE_URL, WENCAI_URL, HttpClient
+
+# 5档盘口 datatype 及列名
+ORDER_BOOK_DATATYPE = "24,25,26,27,28,29,150,151,154,155,30,31,32,33,34,35,152,153,156,157"
+ORDER_BOOK_COLUMNS = ([f"bid{i}" for i in range(1, 6)] + [f"bid{i}_vol" for i in range(1, 6)] +
+                      [f"ask{i}" for i in range(1, 6)] + [f"ask{i}_vol" for i in range(1, 6)])
+
+# download 返回的K线列顺序
+KLINE_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume', 'turnover']
+
+# 列表接口对应的 get_block_data 板块 id
+BLOCK_IDS = {
+    "stock_codes": 0xC6A6,
+    "conbond_codes": 0xCE14,
+    "etf_codes": 0xCFF3,
+    "ths_industry_block": 0xCE5F,
+    "ths_industry_sub_block": 0xc4b5,
+    "ths_concept_block": 0xCE5E,
+}
+
+
+def _bar_arg(ts: datetime, interval: int) -> Any:
+    """把时间转换为 download 的起止参数：分钟级别为 datetime，日级别及以上为 20240101 形式的整数."""
+    if interval in Interval.minute_intervals():
+        return ts.to_pydatetime() if hasattr(ts, 'to_pydatetime') else ts
+    return int(ts.strftime('%Y%m%d'))
+
+
+def _concat_bars(results: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """合并多个证券的K线，增加 code 列."""
+    frames = [data.assign(code=code) for code, data in results.items()]
+    if not frames:
+        return pd.DataFrame(columns=['code'] + KLINE_COLUMNS)
+    data = pd.concat(frames, ignore_index=True)
+    return data[['code'] + [col for col in data.columns if col != 'code']]
 
 
 class Adjust:
@@ -107,10 +115,43 @@ class Interval:
 
 
 class THSData:
-    def __init__(self, ops: dict = None, ths_class: Optional[Any] = None):
+    def __init__(self, ops: dict = None, ths_class: Optional[Any] = None, cache_dir: Optional[str] = None,
+                 pool_size: int = 1, typed: bool = False, price_dtype: str = "float64",
+                 http: Optional[HttpClient] = None, coalesce: bool = True, governor: Optional[Governor] = None,
+                 reconnect: Union[bool, ReconnectPolicy] = True, metrics: Optional[Metrics] = None):
+        """
+        :param ops: thsdk 连接参数
+        :param ths_class: 自定义 THS 实现，默认使用 thsdk.THS
+        :param cache_dir: K线本地缓存目录，指定后 download/security_bars 只请求缺失区间，默认不缓存
+        :param pool_size: 会话数量，大于1时 download_many 等批量接口会在多个会话上并发请求
+        :param typed: 为 True 时按各接口声明的类型构造 DataFrame：价格为 price_dtype，成交量为可空整数
+                      (2147483648 视为缺失)，code/name 为 category，时间为 datetime64
+        :param price_dtype: typed 模式下价格列类型，'float32' 或 'float64'
+        :param http: 问财、舆情等网页接口使用的 HttpClient，默认创建共享连接池、超时和重试的客户端
+        :param coalesce: 为 True 时多个线程同时发出的相同请求(query_data 忽略 instance 参数)只发送一次并共享结果
+        :param governor: 请求限速和自适应并发控制，见 :class:`thsdata.governor.Governor`，默认不限制
+        :param reconnect: 断线重连策略，见 :class:`thsdata.reconnect.ReconnectPolicy`；True 使用默认策略，
+                          False 关闭自动重连
+        :param metrics: 请求指标，见 :class:`thsdata.metrics.Metrics`，记录各接口请求数、错误码、
+                        返回行数以及请求、解码、构造 DataFrame 的耗时，默认不记录
+        """
+        if price_dtype not in ("float32", "float64"):
+            raise ValueError("price_dtype 必须是 'float32' 或 'float64'")
         self.ops = ops
-        self.hq = ths_class(self.ops) if ths_class else THS(self.ops)
+        self.typed = typed
+        self.price_dtype = price_dtype
+        self._pool = SessionPool(lambda: ths_class(self.ops) if ths_class else THS(self.ops), pool_size)
+        self.cache = KlineCache(cache_dir) if cache_dir else None
+        self.http = http or HttpClient()
+        self._flight = SingleFlight() if coalesce else None
+        self.governor = governor
+        self.reconnect = ReconnectPolicy() if reconnect is True else (reconnect or None)
+        self._health = SessionHealth()
+        self.metrics = metrics
+        self._keepalive_stop = threading.Event()
+        self._keepalive_thread: Optional[threading.Thread] = None
         self.__share_instance = random.randint(6666666, 8888888)
+        self.__share_instance_lock = threading.Lock()
 
     def __enter__(self):
         self.connect()
@@ -119,16 +160,159 @@ class THSData:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.disconnect()
 
+    @property
+    def hq(self):
+        """当前线程借用的 THS 会话，未借用时为第一个会话 (会话请求都经 :meth:`_request` 借用)."""
+        return self._pool.current() or self._pool.sessions[0]
+
     @property
     def share_instance(self):
-        self.__share_instance += 1  # Increment on access
-        return self.__share_instance
+        with self.__share_instance_lock:
+            self.__share_instance += 1  # Increment on access
+            return self.__share_instance
 
     def connect(self):
-        self.hq.connect()
+        self._pool.connect()
+        if self.reconnect is not None and self.reconnect.keepalive:
+            self._start_keepalive(self.reconnect.keepalive)
 
     def disconnect(self):
-        self.hq.disconnect()
+        self._stop_keepalive()
+        self._pool.disconnect()
+
+    def _probe(self, session: Any) -> bool:
+        """用一次很小的行情查询检查会话是否可用."""
+        req = f"id=200&instance={self.share_instance}&zipversion=2&codelist=1A0001&market=USHI&datatype=5"
+        try:
+            response = session.query_data(req)
+        except Exception as e:
+            return not self.reconnect.is_disconnect(error=e)
+        return not self.reconnect.is_disconnect(response=response)
+
+    def health_check(self, min_idle: float = 0.0) -> Dict[int, bool]:
+        """检查空闲会话，断开的会话立即重连.
+
+        只检查当前未被借用的会话；检查期间这些会话被借出，请求会等待检查完成。
+
+        :param min_idle: 只检查至少空闲了这么多秒的会话
+        :return: {会话序号: 检查后是否可用}
+        """
+        if self.reconnect is None:
+            raise ValueError("reconnect 未开启")
+        result = {}
+        with self._pool.idle() as sessions:
+            for session in sessions:
+                if self._health.idle_for(session) < min_idle:
+                    continue
+                generation = self._health.generation(session)
+                ok = self._probe(session)
+                if not ok:
+                    ok = self._health.reconnect(session, generation, 0) and self._probe(session)
+                self._health.touch(session)
+                result[self._pool.sessions.index(session)] = ok
+        return result
+
+    def _start_keepalive(self, interval: float) -> None:
+        if self._keepalive_thread is not None and self._keepalive_thread.is_alive():
+            return
+        self._keepalive_stop.clear()
+
+        def loop():
+            while not self._keepalive_stop.wait(interval):
+                try:
+                    self.health_check(min_idle=interval)
+                except Exception as e:
+                    print(f"keepalive exception occurred: {e}")
+
+        self._keepalive_thread = threading.Thread(target=loop, name="thsdata-keepalive", daemon=True)
+        self._keepalive_thread.start()
+
+    def _stop_keepalive(self) -> None:
+        self._keepalive_stop.set()
+        if self._keepalive_thread is not None:
+            self._keepalive_thread.join()
+            self._keepalive_thread = None
+
+    def _pooled_map(self, fn: Callable[[Any], Any], items: Iterable[Any],
+                    max_workers: Optional[int] = None) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """在连接池上并发执行 fn(item)，按完成顺序返回 (item, 结果, 异常)."""
+        items = list(items)
+        if self._pool.current() is not None or self._pool.size == 1 or len(items) <= 1:
+            # 已在池中工作线程内(避免嵌套借用死锁)或无需并发时，在当前线程依次执行
+            for item in items:
+                try:
+                    yield item, fn(item), None
+                except Exception as e:
+                    yield item, None, e
+            return
+
+        workers = min(max_workers or self._pool.size, self._pool.size)
+
+        def run(item):
+            with self._pool.acquire():
+                return fn(item)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {executor.submit(run, item): item for item in items}
+            for future in as_completed(futures):
+                exc = future.exception()
+                yield futures[future], (None if exc else future.result()), exc
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _iter_pooled(self, fn: Callable[[Any], Any], items: Iterable[Any], window: Optional[int] = None,
+                     errors: str = "raise") -> Iterator[Tuple[Any, Any]]:
+        """在连接池上预取执行 fn(item)，按完成顺序逐个返回 (item, 结果).
+
+        同时执行和已完成未取走的结果总数不超过 window (默认 2 * pool_size)，内存占用与 items 数量无关。
+        """
+        if errors not in ("raise", "ignore"):
+            raise ValueError("errors 必须是 'raise' 或 'ignore'")
+        window = window or 2 * self._pool.size
+        if window < 1:
+            raise ValueError("window 必须大于0")
+
+        def handle(item, exc):
+            if errors == "raise":
+                raise exc
+            print(f"{item} exception occurred: {exc}")
+
+        items = iter(items)
+        if self._pool.current() is not None:
+            # 已在池中工作线程内，直接在当前线程依次执行
+            for item in items:
+                try:
+                    result = fn(item)
+                except Exception as e:
+                    handle(item, e)
+                    continue
+                yield item, result
+            return
+
+        def run(item):
+            with self._pool.acquire():
+                return fn(item)
+
+        executor = ThreadPoolExecutor(max_workers=min(window, self._pool.size))
+        pending = {}
+        try:
+            for item in itertools.islice(items, window):
+                pending[executor.submit(run, item)] = item
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    # 取走一个结果后再提交下一个请求
+                    for next_item in itertools.islice(items, 1):
+                        pending[executor.submit(run, next_item)] = next_item
+                    exc = future.exception()
+                    if exc is not None:
+                        handle(item, exc)
+                        continue
+                    yield item, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def about(self):
         about = "\n\nabout me: 本项目基于thsdk二次开发。仅用于个人对网络协议的研究和习作，不对外提供服务。请勿用于非法用途，对此造成的任何问题概不负责。 \n\n"
@@ -139,42 +323,122 @@ class THSData:
 
         return about
 
-    def query_data(self, req: str, query_type: str = "zhu") -> pd.DataFrame:
+    def _typed(self, data: pd.DataFrame, endpoint: str) -> pd.DataFrame:
+        """typed 模式下按端点 schema 转换列类型."""
+        if not self.typed:
+            return data
+        return apply_schema(data, endpoint, self.price_dtype)
+
+    def _result(self, data: pd.DataFrame, endpoint: str, result_format: str) -> Any:
+        """把 DataFrame 结果转换为 result_format 指定的格式."""
+        if result_format == "pandas":
+            return self._typed(data, endpoint)
+        return columns_to_format(frame_to_columns(data), result_format)
+
+    def _request(self, key: Tuple, fn: Callable[[], Any]) -> Any:
+        """执行一次会话请求，key[0] 为接口名.
+
+        开启 coalesce 时合并相同 key 的并发请求；设置了 reconnect 时断线后重连会话并重放请求。
+        请求期间从连接池借用会话 (同一线程已借用时复用)，健康检查不会同时使用该会话。
+        先借用会话再加入合并，因此合并的发起者总是持有会话；当前线程已借用会话时 (连接池工作线程)
+        直接请求，不等待其他线程的请求，避免持有会话等待而发起者借不到会话的死锁。
+        """
+        endpoint = key[0]
+        fn = self._timed(key, fn)
+
+        def call():
+            if self.reconnect is None:
+                return self._governed(endpoint, fn)
+            return run_with_reconnect(self.reconnect, self._health, endpoint, lambda: self.hq,
+                                      lambda: self._governed(endpoint, fn))
+
+        if self._flight is None or self._pool.current() is not None:
+            with self._pool.acquire():
+                return call()
+        with self._pool.acquire():
+            return self._flight.do(key, call)
+
+    def _governed(self, endpoint: str, fn: Callable[[], Any]) -> Any:
+        """设置了 governor 时在接口预算内执行 fn."""
+        if self.governor is None:
+            return fn()
+        return self.governor.call(endpoint, fn)
+
+    def _timed(self, key: Tuple, fn: Callable[[], Any]) -> Callable[[], Any]:
+        """设置了 metrics 时记录 fn 的请求耗时和错误码."""
+        if self.metrics is None:
+            return fn
+        return functools.partial(self.metrics.timed, endpoint_label(key), fn)
+
+    def _frame(self, key: Tuple, records: Any,
+               finish: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+        """构造 DataFrame 并执行 finish (列排序、类型转换等)，设置了 metrics 时记录整个过程的耗时、行数和字节数."""
+        if self.metrics is None:
+            data = pd.DataFrame(records)
+            return data if finish is None else finish(data)
+        start = perf_counter()
+        data = pd.DataFrame(records)
+        if finish is not None:
+            data = finish(data)
+        name = endpoint_label(key)
+        self.metrics.observe(name, "frame", perf_counter() - start)
+        self.metrics.result(name, len(data), int(data.memory_usage(index=False).sum()))
+        return data
+
+    def _query_records(self, req: str, query_type: str = "zhu") -> Optional[List[dict]]:
+        """查询并返回原始 payload 记录，出错时返回 None."""
+        key = ("query_data", normalize_req(req), query_type)
         try:
-            response = self.hq.query_data(req, query_type)
+            response = self._request(key, lambda: self.hq.query_data(req, query_type))
             if response.code != 0:
                 print(f"查询错误: {response.code}, 信息: {response.message}")
-                return pd.DataFrame()  # Return an empty DataFrame on error
-            df = pd.DataFrame(response.payload.data)
-            return df
+                return None
+            return response.payload.data
 
         except Exception as e:
             print(f"query_data exception occurred: {e}")
-        return pd.DataFrame()  # Return an empty DataFrame on exception
+        return None
 
-    def _block_data(self, block_id: int):
+    def query_data(self, req: str, query_type: str = "zhu") -> pd.DataFrame:
+        return self._query_frame(req, query_type)
+
+    def _query_frame(self, req: str, query_type: str = "zhu",
+                     finish: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+        """查询并构造 DataFrame，finish 在 frame 阶段内执行，出错时返回空 DataFrame."""
+        records = self._query_records(req, query_type)
+        if records is None:
+            return pd.DataFrame()  # Return an empty DataFrame on error
+        return self._frame(("query_data", req), records, finish)
+
+    def _codes_frame(self, key: Tuple, fn: Callable[[], Any]) -> Optional[pd.DataFrame]:
+        """代码列表请求，出错时返回 None，以便与空列表区分."""
         try:
-            response = self.hq.get_block_data(block_id)
+            response = self._request(key, fn)
             if response.code != 0:
                 print(f"查询错误: {response.code}, 信息: {response.message}")
-                return pd.DataFrame()  # Return an empty DataFrame on error
-            df = pd.DataFrame(response.payload.data)
-            return df
+                return None
+            return self._frame(key, response.payload.data, lambda df: self._typed(df, "codes"))
         except Exception as e:
             print(f"An exception occurred: {e}")
-            return pd.DataFrame()  # Return an empty DataFrame on exception
+            return None
+
+    def _block_data(self, block_id: int):
+        data = self._codes_frame(("get_block_data", block_id), lambda: self.hq.get_block_data(block_id))
+        return pd.DataFrame() if data is None else data  # Return an empty DataFrame on error
 
     def _get_block_components(self, block_code: str) -> pd.DataFrame:
-        try:
-            response = self.hq.get_block_components(block_code)
-            if response.code != 0:
-                print(f"查询错误: {response.code}, 信息: {response.message}")
-                return pd.DataFrame()  # Return an empty DataFrame on error
-            df = pd.DataFrame(response.payload.data)
-            return df
-        except Exception as e:
-            print(f"An exception occurred: {e}")
-            return pd.DataFrame()  # Return an empty DataFrame on exception
+        data = self._codes_frame(("get_block_components", block_code),
+                                 lambda: self.hq.get_block_components(block_code))
+        return pd.DataFrame() if data is None else data  # Return an empty DataFrame on error
+
+    def _list_frame(self, name: str, *args: str) -> Optional[pd.DataFrame]:
+        """Catalog 可缓存的列表接口 (stock_codes、ths_block_components 等)，查询出错时返回 None."""
+        if name == "ths_block_components":
+            block_code, = args
+            return self._codes_frame(("get_block_components", block_code),
+                                     lambda: self.hq.get_block_components(block_code))
+        block_id = BLOCK_IDS[name]
+        return self._codes_frame(("get_block_data", block_id), lambda: self.hq.get_block_data(block_id))
 
     def stock_codes(self) -> pd.DataFrame:
         """获取股票市场代码.
@@ -188,7 +452,7 @@ class THSData:
             USZA300750  宁德时代
             USTM832566    梓橦宫
         """
-        return self._block_data(0xC6A6)
+        return self._block_data(BLOCK_IDS["stock_codes"])
 
     def conbond_codes(self) -> pd.DataFrame:
         """获取可转债市场代码.
@@ -202,7 +466,7 @@ class THSData:
             USZD123158   宙邦转债
             USHD110094   众和转债
         """
-        return self._block_data(0xCE14)
+        return self._block_data(BLOCK_IDS["conbond_codes"])
 
     def etf_codes(self) -> pd.DataFrame:
         """获取ETF基金市场代码.
@@ -216,9 +480,10 @@ class THSData:
             USZJ159201   自由现金流ETF
             USHJ510410      资源ETF
         """
-        return self._block_data(0xCFF3)
+        return self._block_data(BLOCK_IDS["etf_codes"])
 
-    def security_bars(self, code: str, start: datetime, end: datetime, adjust: str, period: int) -> pd.DataFrame:
+    def security_bars(self, code: str, start: datetime, end: datetime, adjust: str, period: int,
+                      result_format: str = "pandas") -> Any:
         """获取指定证券的K线数据.
         支持日k线、周k线、月k线，以及5分钟、15分钟、30分钟和60分钟k线数据.
 
@@ -232,8 +497,10 @@ class THSData:
         :type adjust: str
         :param period: 数据类型，
         :type period: int
+        :param result_format: 返回格式，'pandas', 'numpy' (recarray), 'arrow' (pyarrow.Table) 或 'polars'
+        :type result_format: str
 
-        :return: pandas.DataFrame
+        :return: pandas.DataFrame 或 result_format 指定的格式
 
         Example::
 
@@ -242,6 +509,28 @@ class THSData:
             2024-01-03  1694.00  2022929  3411400700  1681.11  1695.22  1676.33
             2024-01-04  1669.00  2155107  3603970100  1693.00  1693.00  1662.93
         """
+        check_format(result_format)
+
+        if self.cache is not None:
+            data = self.cache.fetch("security_bars", code, start, end, period, adjust,
+                                    lambda s, e: self._security_bars(code, s.to_pydatetime(), e.to_pydatetime(),
+                                                                     adjust, period))
+            if data is not None:
+                return self._result(data, "kline", result_format)
+
+        if result_format != "pandas":
+            records = self._security_bars_records(code, start, end, adjust, period)
+            return columns_to_format(records_to_columns(records), result_format)
+
+        return self._security_bars(code, start, end, adjust, period, typed=True)
+
+    def _security_bars(self, code: str, start: datetime, end: datetime, adjust: str, period: int,
+                       typed: bool = False) -> pd.DataFrame:
+        finish = (lambda df: self._typed(df, "kline")) if typed else None
+        return self._frame(("security_bars",), self._security_bars_records(code, start, end, adjust, period), finish)
+
+    def _security_bars_records(self, code: str, start: datetime, end: datetime, adjust: str,
+                               period: int) -> List[dict]:
         m_period = {0x3001, 0x3005, 0x300f, 0x301e, 0x303c, 0x3078, }
 
         if period in m_period:
@@ -265,11 +554,11 @@ class THSData:
             start_int = int(start.strftime('%Y%m%d'))
             end_int = int(end.strftime('%Y%m%d'))
 
-        response = self.hq.security_bars(code, start_int, end_int, adjust, period)
+        key = ("security_bars", code, start_int, end_int, adjust, period)
+        response = self._request(key, lambda: self.hq.security_bars(code, start_int, end_int, adjust, period))
         if response.code != 0:
-            func_name = inspect.currentframe().f_code.co_name
-            raise ValueError(f"[{func_name}] 查询错误: {response.code}, 信息: {response.message}")
-        return pd.DataFrame(response.payload.data)
+            raise ValueError(f"[security_bars] 查询错误: {response.code}, 信息: {response.message}")
+        return response.payload.data
 
     def ths_industry_block(self) -> pd.DataFrame:
         """获取行业板块.
@@ -291,7 +580,7 @@ class THSData:
             88  URFI881273     白酒
             89  URFI881271   IT服务
         """
-        return self._block_data(0xCE5F)
+        return self._block_data(BLOCK_IDS["ths_industry_block"])
 
     def ths_industry_sub_block(self) -> pd.DataFrame:
         """获取三级行业板块.
@@ -313,7 +602,7 @@ class THSData:
             228  URFA884045      氨纶
             229  URFA884095     LED
         """
-        return self._block_data(0xc4b5)
+        return self._block_data(BLOCK_IDS["ths_industry_sub_block"])
 
     def ths_concept_block(self) -> pd.DataFrame:
         """获取概念板块.
@@ -335,7 +624,7 @@ class THSData:
             394  URFI886088  2024三季报预增
             395  URFI886097   2024年报预增
         """
-        return self._block_data(0xCE5E)
+        return self._block_data(BLOCK_IDS["ths_concept_block"])
 
     def ths_block_components(self, block_code: str) -> pd.DataFrame:
         """查询行业，行业三级，概念板块成分股.
@@ -357,11 +646,80 @@ class THSData:
         """
         return self._get_block_components(block_code)
 
-    def stock_cur_market_data(self, codes: List[str]) -> pd.DataFrame:
+    def _codelist_query(self, codes: List[str], datatype: str, batch_size: int, errors: str = "ignore",
+                        finish: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+                        ) -> Tuple[pd.DataFrame, List[str]]:
+        """按市场分组、分批查询 id=200 行情，返回 (按输入代码顺序排列的结果, 没有返回数据的代码).
+
+        pool_size 大于1时各批在多个会话上并发请求，否则在当前会话上依次请求。
+        各批记录合并后一次构造 DataFrame，排序和 finish 计入 frame 阶段。
+        """
+        if errors not in ("raise", "ignore"):
+            raise ValueError("errors 必须是 'raise' 或 'ignore'")
+        if batch_size < 1:
+            raise ValueError("batch_size 必须大于0")
+
+        codes = list(dict.fromkeys(codes))
+        groups = {}
+        for code in codes:
+            if len(code) != 10:
+                raise ValueError("证券代码长度不足")
+            groups.setdefault(code[:4], []).append(code[4:])
+
+        batches = [(market, short_codes[i:i + batch_size])
+                   for market, short_codes in groups.items()
+                   for i in range(0, len(short_codes), batch_size)]
+
+        def fetch(i):
+            market, short_codes = batches[i]
+            short_code = ','.join(short_codes)  # 用逗号连接
+            req = f"id=200&instance={self.share_instance}&zipversion=2&codelist={short_code}&market={market}&datatype={datatype}"
+            records = self._query_records(req)
+            if records is None:
+                raise ValueError(f"{market} 批次查询失败")
+            return records
+
+        results, failed = {}, 0
+        for i, records, exc in self._pooled_map(fetch, range(len(batches))):
+            if exc is not None:
+                failed += 1
+            else:
+                results[i] = records
+
+        def order(data: pd.DataFrame) -> pd.DataFrame:
+            if 'code' in data.columns:
+                position = {code: i for i, code in enumerate(codes)}
+                data = data.iloc[data['code'].map(position).fillna(len(codes)).argsort(kind='stable')]
+                data = data.reset_index(drop=True)
+            return data if finish is None else finish(data)
+
+        records = [record for i in sorted(results) for record in results[i]]
+        data = self._frame(("query_data", "id=200"), records, order)
+        returned = set(data['code']) if 'code' in data.columns else set()
+        missing = [code for code in codes if code not in returned]
+
+        if missing:
+            message = f"{len(missing)}/{len(codes)} 个代码没有返回数据 ({failed}/{len(batches)} 批查询失败): " \
+                      f"{', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}"
+            if errors == "raise":
+                raise ValueError(message)
+            if failed:
+                print(message)
+        return data, missing
+
+    def stock_cur_market_data(self, codes: List[str], batch_size: int = 100, errors: str = "ignore") -> pd.DataFrame:
         """股票当前时刻市场数据
 
-        :param codes: 证券代码，例如 'USHA600519, USHA600036' 注意只能同一市场
+        代码可以来自不同市场，按市场分组并分批查询，结果按输入顺序返回。
+        各批只在 pool_size 大于1时并发请求，默认 pool_size=1 时依次请求；没有返回数据的代码记录在
+        ``data.attrs['missing_codes']`` 中。
+
+        :param codes: 证券代码，例如 ['USHA600519', 'USZA000001']
         :type codes: List[str]
+        :param batch_size: 每次请求的最大代码数量
+        :type batch_size: int
+        :param errors: 'ignore' 时返回已查到的数据，'raise' 时有代码没有返回数据则抛出 ValueError
+        :type errors: str
 
         :return: pandas.DataFrame
 
@@ -371,30 +729,25 @@ class THSData:
 
 
         """
-
-        market = codes[0][:4]
-
-        # 检查所有代码是否属于同一市场
-        for code in codes:
-            if len(code) != 10:
-                raise ValueError("证券代码长度不足")
-            if code[:4] != market:
-                raise ValueError("只能同一市场的证券代码")
-
-        short_codes = [code[4:] for code in codes]  # 剔除前4位
-        short_code = ','.join(short_codes)  # 用逗号连接
-
-        req = f"id=200&instance={self.share_instance}&zipversion=2&codelist={short_code}&market={market}&datatype=5,6,8,9,10,12,13,402,19,407,24,30,48,49,69,70,3250,920371,55,199112,264648,1968584,461256,1771976,3475914,3541450,526792,3153,592888,592890"
-
-        data = self.query_data(req)
-
+        datatype = "5,6,8,9,10,12,13,402,19,407,24,30,48,49,69,70,3250,920371,55,199112,264648,1968584,461256,1771976,3475914,3541450,526792,3153,592888,592890"
+        data, missing = self._codelist_query(codes, datatype, batch_size, errors,
+                                             lambda df: self._typed(df, "market_data"))
+        data.attrs["missing_codes"] = missing
         return data
 
-    def conbond_cur_market_data(self, codes: List[str]) -> pd.DataFrame:
+    def conbond_cur_market_data(self, codes: List[str], batch_size: int = 100, errors: str = "ignore") -> pd.DataFrame:
         """可转债当前时刻市场数据
 
-        :param codes: 证券代码，例如 'USHD600519, USHD600036' 注意只能同一市场
+        代码可以来自不同市场，按市场分组并分批查询，结果按输入顺序返回。
+        各批只在 pool_size 大于1时并发请求，默认 pool_size=1 时依次请求；没有返回数据的代码记录在
+        ``data.attrs['missing_codes']`` 中。
+
+        :param codes: 证券代码，例如 ['USHD113037', 'USZD123158']
         :type codes: List[str]
+        :param batch_size: 每次请求的最大代码数量
+        :type batch_size: int
+        :param errors: 'ignore' 时返回已查到的数据，'raise' 时有代码没有返回数据则抛出 ValueError
+        :type errors: str
 
         :return: pandas.DataFrame
 
@@ -404,23 +757,10 @@ class THSData:
 
 
         """
-
-        market = codes[0][:4]
-
-        # 检查所有代码是否属于同一市场
-        for code in codes:
-            if len(code) != 10:
-                raise ValueError("证券代码长度不足")
-            if code[:4] != market:
-                raise ValueError("只能同一市场的证券代码")
-
-        short_codes = [code[4:] for code in codes]  # 剔除前4位
-        short_code = ','.join(short_codes)  # 用逗号连接
-
-        req = f"id=200&instance={self.share_instance}&zipversion=2&codelist={short_code}&market={market}&datatype=5,55,10,80,49,13,19,25,31,24,30,6,7,8,9,12,199112,264648,48,1771976,1968584,527527"
-
-        data = self.query_data(req)
-
+        datatype = "5,55,10,80,49,13,19,25,31,24,30,6,7,8,9,12,199112,264648,48,1771976,1968584,527527"
+        data, missing = self._codelist_query(codes, datatype, batch_size, errors,
+                                             lambda df: self._typed(df, "market_data"))
+        data.attrs["missing_codes"] = missing
         return data
 
     def call_auction(self, code: str) -> pd.DataFrame:
@@ -460,10 +800,11 @@ class THSData:
         short_code = code[4:]
         req = f"id=204&instance={self.share_instance}&zipversion=2&code={short_code}&market={market}&datatype=1,10,27,33,49&start={start_unix}&end={end_unix}"
 
-        data = self.query_data(req)
-        data['time'] = pd.to_datetime(data['time'], unit='s').dt.tz_localize('UTC').dt.tz_convert(china_tz)
+        def finish(data: pd.DataFrame) -> pd.DataFrame:
+            data['time'] = pd.to_datetime(data['time'], unit='s').dt.tz_localize('UTC').dt.tz_convert(china_tz)
+            return self._typed(data, "call_auction")
 
-        return data
+        return self._query_frame(req, finish=finish)
 
     def corporate_action(self, code: str) -> pd.DataFrame:
         """权息资料
@@ -505,15 +846,23 @@ class THSData:
             26  20241220                         2024-12-20(每十股 红利238.82元)$
         """
 
+        data = self._corporate_action(code)
+        if data is None:
+            return pd.DataFrame()  # Return an empty DataFrame on error
+        return data
+
+    def _corporate_action(self, code: str) -> Optional[pd.DataFrame]:
+        """权息资料，查询出错时返回 None，以便与没有权息事件的空结果区分."""
         market = code[:4]
         short_code = code[4:]
         req = f"id=211&instance={self.share_instance}&zipversion=2&code={short_code}&market={market}&start=-36500&end=0&fuquan=Q&datatype=471&period=16384"
 
-        data = self.query_data(req)
+        records = self._query_records(req)
+        if records is None:
+            return None
+        return self._frame(("query_data", req), records)
 
-        return data
-
-    def transaction_history(self, code: str, date: datetime) -> pd.DataFrame:
+    def transaction_history(self, code: str, date: datetime, result_format: str = "pandas") -> Any:
         """tick3秒l1快照数据
 
         :param code: 证券代码，例如 'USHA600519'
@@ -522,7 +871,10 @@ class THSData:
         :param date: 指定日期
         :type date: datetime
 
-        :return: pandas.DataFrame
+        :param result_format: 返回格式，'pandas', 'numpy' (recarray), 'arrow' (pyarrow.Table) 或 'polars'
+        :type result_format: str
+
+        :return: pandas.DataFrame 或 result_format 指定的格式
 
         Example::
 
@@ -539,6 +891,21 @@ class THSData:
             4845 2025-04-11 15:00:00+08:00  1565.30  ...              23044           0
             4846 2025-04-11 15:00:03+08:00  1568.98  ...              23616      159400
         """
+        req = self._transaction_history_req(code, date)
+
+        check_format(result_format)
+        if result_format != "pandas":
+            records = self._query_records(req) or []
+            return columns_to_format(records_to_columns(records, time_unit='s'), result_format)
+
+        def finish(data: pd.DataFrame) -> pd.DataFrame:
+            data['time'] = pd.to_datetime(data['time'], unit='s').dt.tz_localize('UTC').dt.tz_convert(china_tz)
+            return self._typed(data, "transaction_history")
+
+        return self._query_frame(req, finish=finish)
+
+    def _transaction_history_req(self, code: str, date: datetime) -> str:
+        """tick3秒l1快照的 id=205 请求."""
         # Ensure the date is in Beijing timezone
         if date.tzinfo is None:
             # If naive, localize to Beijing timezone
@@ -557,12 +924,11 @@ class THSData:
 
         market = code[:4]
         short_code = code[4:]
-        req = f"id=205&instance={self.share_instance}&zipversion=2&code={short_code}&market={market}&start={start_unix}&end={end_unix}&datatype=1,5,10,12,18,49&TraceDetail=0"
-
-        data = self.query_data(req)
-        data['time'] = pd.to_datetime(data['time'], unit='s').dt.tz_localize('UTC').dt.tz_convert(china_tz)
+        return f"id=205&instance={self.share_instance}&zipversion=2&code={short_code}&market={market}&start={start_unix}&end={end_unix}&datatype=1,5,10,12,18,49&TraceDetail=0"
 
-        return data
+    def _transaction_history_records(self, code: str, date: datetime) -> Optional[List[dict]]:
+        """tick3秒l1快照的原始记录，查询出错时返回 None，以便与没有成交的空结果区分."""
+        return self._query_records(self._transaction_history_req(code, date))
 
     def order_book(self, code: str) -> dict:
         """5档盘口
@@ -580,12 +946,58 @@ class THSData:
 
         market = code[:4]
         short_code = code[4:]
-        req = f"id=200&instance={self.share_instance}&zipversion=2&codelist={short_code}&market={market}&datatype=24,25,26,27,28,29,150,151,154,155,30,31,32,33,34,35,152,153,156,157"
+        req = f"id=200&instance={self.share_instance}&zipversion=2&codelist={short_code}&market={market}&datatype={ORDER_BOOK_DATATYPE}"
 
         data = self.query_data(req)
 
         return data.iloc[0].to_dict()
 
+    def order_books(self, codes: List[str], batch_size: int = 100,
+                    as_arrays: bool = False, errors: str = "ignore") -> Union[pd.DataFrame, Dict[str, Any]]:
+        """多个证券的5档盘口
+
+        代码可以来自不同市场，按市场分组并分批查询。各批只在 pool_size 大于1时并发请求，默认 pool_size=1 时依次请求；
+        没有返回数据的代码记录在 ``data.attrs['missing_codes']`` 中 (as_arrays 时对应行为 NaN)。
+
+        :param codes: 证券代码，例如 ['USHA600519', 'USZA000001']
+        :type codes: List[str]
+        :param batch_size: 每次请求的最大代码数量
+        :type batch_size: int
+        :param as_arrays: 为 True 时返回 {'code': (n,), 'bid': (n, 5), 'bid_vol': (n, 5), 'ask': (n, 5), 'ask_vol': (n, 5)}
+                          的 numpy 数组，行与输入代码一一对应，没有数据的位置为 NaN
+        :type as_arrays: bool
+        :param errors: 'ignore' 时返回已查到的数据，'raise' 时有代码没有返回数据则抛出 ValueError
+        :type errors: str
+
+        :return: pandas.DataFrame 或 dict
+
+        Example::
+
+                     code     bid1  bid1_vol  ...     ask5  ask5_vol
+            0  USHA600519  1585.21         2  ...   1586.6       100
+        """
+        def finish(data: pd.DataFrame) -> pd.DataFrame:
+            if not data.empty:
+                columns = [col for col in ['code'] + ORDER_BOOK_COLUMNS if col in data.columns]
+                data = data[columns + [col for col in data.columns if col not in columns]]
+            return data if as_arrays else self._typed(data, "order_book")
+
+        data, missing = self._codelist_query(codes, ORDER_BOOK_DATATYPE, batch_size, errors, finish)
+        if not as_arrays:
+            data.attrs["missing_codes"] = missing
+            return data
+
+        codes = list(dict.fromkeys(codes))
+        rows = pd.DataFrame(index=pd.Index(codes, name='code'))
+        if not data.empty and 'code' in data.columns:
+            rows = data.drop_duplicates('code').set_index('code').reindex(codes)
+        result = {'code': np.asarray(codes, dtype=object)}
+        for side in ('bid', 'bid_vol', 'ask', 'ask_vol'):
+            names = [f"{side[:3]}{i}{side[3:]}" for i in range(1, 6)]
+            block = rows.reindex(columns=names).apply(pd.to_numeric, errors='coerce')
+            result[side] = block.mask(block == SENTINEL).to_numpy(dtype=np.float64, na_value=np.nan)
+        return result
+
     def moneyflow_major(self, code: str) -> pd.DataFrame:
         # todo  https://zx.10jqka.com.cn/marketinfo/moneyflow/graph/major?code=600519&start=20250101&end=20250314
         pass
@@ -658,27 +1070,14 @@ class THSData:
 
         """
 
-        url = "https://eq.10jqka.com.cn/dataQuery/query"
-
-        # 定义请求头
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Referer": "https://eq.10jqka.com.cn/",
-            "Connection": "keep-alive"
-        }
-
         # Prepare query parameters
         params = {"query": condition}
 
         try:
-            # Make HTTP GET request
-            response = requests.get(url, params=params, headers=headers)
-            response.raise_for_status()  # Raise exception for bad status codes
-
-            # Parse JSON response
-            data = response.json()
+            # Make HTTP GET request and parse JSON response
+            data = self._governed("wencai_select_codes", self._timed(
+                ("wencai_select_codes",),
+                lambda: self.http.get_json(WENCAI_URL, params, referer="https://eq.10jqka.com.cn/")))
 
             # Check status_msg
             if data.get("status_msg") != "success":
@@ -719,7 +1118,7 @@ class THSData:
 
             return ret, None
 
-        except requests.RequestException as e:
+        except self.http.errors as e:
             return [], e
         except json.JSONDecodeError as e:
             return [], e
@@ -730,12 +1129,13 @@ class THSData:
         :param condition: 条件选股
         :return:
         """
-        response = self.hq.wencai_base(condition)
+        key = ("wencai_base", condition)
+        response = self._request(key, lambda: self.hq.wencai_base(condition))
         if response.code != 0:
             func_name = inspect.currentframe().f_code.co_name
             raise ValueError(f"[{func_name}] 错误: {response.code}, 信息: {response.message}")
 
-        return pd.DataFrame(response.payload.data)
+        return self._frame(key, response.payload.data)
 
     def wencai_nlp(self, condition: str) -> pd.DataFrame:
         """问财nlp.
@@ -743,41 +1143,31 @@ class THSData:
         :param condition: 条件选股
         :return:
         """
-        response = self.hq.wencai_nlp(condition)
+        key = ("wencai_nlp", condition)
+        response = self._request(key, lambda: self.hq.wencai_nlp(condition))
         if response.code != 0:
             func_name = inspect.currentframe().f_code.co_name
             raise ValueError(f"[{func_name}] 错误: {response.code}, 信息: {response.message}")
 
-        return pd.DataFrame(response.payload.data)
+        return self._frame(key, response.payload.data)
 
-    def attention(self, code: str) -> pd.DataFrame:
+    def attention(self, code: str, timeout: Optional[Any] = None) -> pd.DataFrame:
         """舆情关注度.
 
         :param code: 6位股票代码 eg. 600519
+        :param timeout: 超时(秒)，默认使用 http 客户端的设置
         :return:
         """
 
-        url = "https://ai.10jqka.com.cn/stockapi/yuqing/attention"
-
-        # 定义请求头
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Referer": "https://ai.10jqka.com.cn/",
-            "Connection": "keep-alive"
-        }
-
         # Prepare query parameters
         params = {"stockCode": code}
 
         try:
-            # Make HTTP GET request
-            response = requests.get(url, params=params, headers=headers)
-            response.raise_for_status()  # Raise exception for bad status codes
-
-            # Parse JSON response
-            data = response.json()
+            # Make HTTP GET request and parse JSON response
+            data = self._governed("attention", self._timed(
+                ("attention",),
+                lambda: self.http.get_json(ATTENTION_URL, params, referer="https://ai.10jqka.com.cn/",
+                                           timeout=timeout)))
 
             # Check status_msg
             if data.get("message") != "success":
@@ -786,13 +1176,31 @@ class THSData:
             # Get stockList array
             data = data.get("data", [])
 
-            return pd.DataFrame(data)
+            return self._frame(("attention",), data)
 
 
 
         except Exception as e:
             return pd.DataFrame()
 
+    def attention_many(self, codes: List[str], max_workers: int = 8,
+                       timeout: Optional[Any] = None) -> Dict[str, pd.DataFrame]:
+        """批量获取舆情关注度.
+
+        请求通过共享的 HTTP 连接池并发执行，失败的代码返回空 DataFrame。
+
+        :param codes: 6位股票代码列表 eg. ['600519', '000001']
+        :param max_workers: 最大并发数
+        :param timeout: 每个请求的超时(秒)
+        :return: {code: pandas.DataFrame}，顺序同输入
+        """
+        codes = list(dict.fromkeys(codes))
+        if not codes:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(codes)))) as executor:
+            results = dict(zip(codes, executor.map(lambda code: self.attention(code, timeout=timeout), codes)))
+        return results
+
     def getshape(self) -> pd.DataFrame:
         """k线策略形态.
 
@@ -800,27 +1208,14 @@ class THSData:
         :return:
         """
 
-        url = "https://ai.10jqka.com.cn/igroup/strategy/getshape/"
-
-        # 定义请求头
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Referer": "https://ai.10jqka.com.cn/",
-            "Connection": "keep-alive"
-        }
-
         # Prepare query parameters
         params = {}
 
         try:
-            # Make HTTP GET request
-            response = requests.get(url, params=params, headers=headers)
-            response.raise_for_status()  # Raise exception for bad status codes
-
-            # Parse JSON response
-            data = response.json()
+            # Make HTTP GET request and parse JSON response
+            data = self._governed("getshape", self._timed(
+                ("getshape",),
+                lambda: self.http.get_json(GETSHAPE_URL, params, referer="https://ai.10jqka.com.cn/")))
 
             # Check status_msg
             if data.get("errormsg") != "":
@@ -829,7 +1224,7 @@ class THSData:
             # Get stockList array
             data = data.get("result", [])
 
-            return pd.DataFrame(data)
+            return self._frame(("getshape",), data)
 
         except Exception as e:
             return pd.DataFrame()
@@ -837,7 +1232,8 @@ class THSData:
     def download(self, code: str, start: Optional[Any] = None, end: Optional[Any] = None, adjust: str = Adjust.NONE,
                  period: str = "max",
                  interval: int = Interval.DAY,
-                 count: int = -1) -> pd.DataFrame:
+                 count: int = -1,
+                 result_format: str = "pandas") -> Any:
         """获取历史k线数据。
 
        :param period:  str max
@@ -851,9 +1247,11 @@ class THSData:
        :param end: 结束时间，格式取决于周期。对于日级别，使用日期（例如，20241224）。对于分钟级别，datetime。
        :param adjust: 复权类型，必须是有效的复权值之一。
        :param interval: 周期类型，必须是有效的周期值之一。
-       :param count: 指定数量
+       :param count: 指定数量，指定数量时不使用本地缓存
+       :param result_format: 返回格式，'pandas', 'numpy' (recarray), 'arrow' (pyarrow.Table) 或 'polars'，
+                             非 pandas 格式直接由返回数据按列构造
 
-       :return: pandas.DataFrame
+       :return: pandas.DataFrame 或 result_format 指定的格式
 
         Example::
 
@@ -863,48 +1261,206 @@ class THSData:
             2024-01-04  1669.00  2155107  3603970100  1693.00  1693.00  1662.93
         """
 
-        code = code.upper()
+        check_format(result_format)
+        code = _normalize_code(code)
 
-        if len(code) == 6:
-            code = _isdigit2code(code)
-        elif len(code) == 8:
-            if code.startswith(("SH", "SZ", "BJ")):
-                code = _isdigit2code(code[2:])
-            elif code.endswith(("SH", "SZ", "BJ")):
-                code = _isdigit2code(code[:6])
-            else:
-                raise ValueError(
-                    "8位代码必须以SH或SZ开头或者结尾，例如 'SH600519' 或 'SZ000001'， '600519SH' 或 '000001SZ'")
-        elif len(code) == 9:
-            if code.startswith(("SH.", "SZ.", "BJ.")):
-                code = _isdigit2code(code[3:])
-            elif code.endswith((".SH", ".SZ")):
-                code = _isdigit2code(code[:6])
-            else:
-                raise ValueError("9位代码必须以.SH或.SZ结尾，例如 '600519.SH' 或 '000001.SZ'")
+        if self.cache is not None and count == -1:
+            data = self.cache.fetch("download", code, start, end, interval, adjust,
+                                    lambda s, e: self._download(code, _bar_arg(s, interval), _bar_arg(e, interval),
+                                                                adjust, period, interval, count))
+            if data is not None:
+                return self._result(data, "kline", result_format)
+
+        if result_format != "pandas":
+            records = self._download_records(code, start, end, adjust, period, interval, count)
+            return columns_to_format(records_to_columns(records, KLINE_COLUMNS), result_format)
 
+        return self._download(code, start, end, adjust, period, interval, count, typed=True)
+
+    def _download_records(self, code: str, start: Optional[Any], end: Optional[Any], adjust: str, period: str,
+                          interval: int, count: int) -> List[dict]:
         if interval in Interval.minute_intervals() and isinstance(start, datetime) and isinstance(end, datetime):
             start, end = _time_2_int(start), _time_2_int(end)
 
-        code = code.upper()
-
-        response = self.hq.download(code, start, end, adjust, period, interval, count)
-        data = pd.DataFrame(response.payload.data)
+        key = ("download", code, start, end, adjust, period, interval, count)
+        response = self._request(key, lambda: self.hq.download(code, start, end, adjust, period, interval, count))
         if response.code != 0:
-            func_name = inspect.currentframe().f_code.co_name
-            raise ValueError(f"[{func_name}] 错误: {response.code}, 信息: {response.message}")
+            raise ValueError(f"[download] 错误: {response.code}, 信息: {response.message}")
+        return response.payload.data
+
+    def _download(self, code: str, start: Optional[Any], end: Optional[Any], adjust: str, period: str,
+                  interval: int, count: int, typed: bool = False) -> pd.DataFrame:
+        def finish(data: pd.DataFrame) -> pd.DataFrame:
+            # Check if data is not empty
+            if data is not None and not data.empty:
+                # Specify column order
+                if all(col in data.columns for col in KLINE_COLUMNS):
+                    data = data[KLINE_COLUMNS]
+            else:
+                # Handle the case where no data is returned
+                data = pd.DataFrame(columns=KLINE_COLUMNS)
+            return self._typed(data, "kline") if typed else data
 
-        # Check if data is not empty
-        if data is not None and not data.empty:
-            # Specify column order
-            desired_columns = ['time', 'open', 'high', 'low', 'close', 'volume', 'turnover']
-            if all(col in data.columns for col in desired_columns):
-                data = data[desired_columns]
-        else:
-            # Handle the case where no data is returned
-            data = pd.DataFrame(columns=['time', 'open', 'high', 'low', 'close', 'volume', 'turnover'])
+        return self._frame(("download",), self._download_records(code, start, end, adjust, period, interval, count),
+                           finish)
 
-        return data
+    def download_resampled(self, code: str, start: Optional[Any] = None, end: Optional[Any] = None,
+                           adjust: str = Adjust.NONE, intervals: Optional[List[int]] = None,
+                           count: int = -1) -> Dict[int, pd.DataFrame]:
+        """只请求一次1分钟K线，在本地合成多个周期。
+
+        按A股交易时段合成，规则见 :func:`thsdata.resample.resample_bars`。
+        指定 cache_dir 时1分钟K线从本地缓存读取。
+
+        :param code: 证券代码，支持格式同 :meth:`download`
+        :param start: 开始时间，datetime
+        :param end: 结束时间，datetime
+        :param intervals: 需要的周期，默认全部分钟级别周期和日K线
+        :return: {interval: pandas.DataFrame}
+
+        Example::
+
+            bars = td.download_resampled("USHA600519", start, end, intervals=[Interval.MIN_5, Interval.MIN_30])
+            bars[Interval.MIN_30]
+        """
+        data = self.download(code, start=start, end=end, adjust=adjust, interval=Interval.MIN_1, count=count)
+        return resample_all(data, intervals)
+
+    def download_adjusted(self, code: str, start: Optional[Any] = None, end: Optional[Any] = None,
+                          adjust: str = Adjust.FORWARD, interval: int = Interval.DAY) -> pd.DataFrame:
+        """用不复权K线和权息资料在本地计算复权K线。
+
+        请求(或从 cache_dir 缓存读取)完整的不复权K线和 :meth:`corporate_action`，
+        按 :func:`thsdata.adjust.adjust_factors` 计算因子后再截取 start 至 end，
+        同一份不复权数据可用于所有复权类型，新的分红不会使缓存失效。
+
+        :param code: 证券代码，支持格式同 :meth:`download`
+        :param start: 开始时间，格式同 :meth:`download`
+        :param end: 结束时间，格式同 :meth:`download`
+        :param adjust: 复权类型，Adjust.FORWARD, Adjust.BACKWARD 或 Adjust.NONE
+        :param interval: 周期类型
+        :return: pandas.DataFrame，权息资料查询失败时抛出 ValueError
+        """
+        if adjust not in Adjust.all_types():
+            raise ValueError("adjust 必须是有效的复权值之一")
+        code = _normalize_code(code)
+        bars = self.download(code, adjust=Adjust.NONE, interval=interval)
+        if adjust != Adjust.NONE:
+            actions = self._corporate_action(code)
+            if actions is None:
+                # 查询失败时不能当作没有权息事件，否则会返回未复权的K线
+                raise ValueError(f"[download_adjusted] 权息资料查询失败: {code}")
+            bars = adjust_bars(bars, parse_events(actions), adjust)
+
+        if bars is None or bars.empty:
+            return bars
+        times = _local_naive(bars['time'])
+        mask = pd.Series(True, index=bars.index)
+        if start is not None:
+            mask &= times >= _to_timestamp(start, None)
+        if end is not None:
+            end_ts = _to_timestamp(end, None)
+            if interval not in Interval.minute_intervals() and end_ts == end_ts.normalize():
+                end_ts += pd.Timedelta(days=1) - pd.Timedelta(1)
+            mask &= times <= end_ts
+        return bars[mask].reset_index(drop=True)
+
+    def download_many(self, codes: List[str], start: Optional[Any] = None, end: Optional[Any] = None,
+                      adjust: str = Adjust.NONE, period: str = "max", interval: int = Interval.DAY, count: int = -1,
+                      max_workers: Optional[int] = None, concat: bool = False,
+                      errors: str = "raise") -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+        """批量获取多个证券的历史k线数据。
+
+        请求在连接池的多个会话上并发执行，并发数由 pool_size 和 max_workers 中较小者决定。
+        其余参数含义同 :meth:`download`。
+
+        :param codes: 证券代码列表，支持格式同 :meth:`download`
+        :param max_workers: 最大并发数，默认等于 pool_size
+        :param concat: 为 True 时返回合并后的 DataFrame，并增加 code 列
+        :param errors: 'raise' 遇到错误时抛出异常；'ignore' 跳过出错的代码
+
+        :return: {code: pandas.DataFrame} 或 pandas.DataFrame
+        """
+        if errors not in ("raise", "ignore"):
+            raise ValueError("errors 必须是 'raise' 或 'ignore'")
+
+        normalized = normalize_codes(codes, errors="raise" if errors == "raise" else "coerce")
+        for code, norm in zip(codes, normalized):
+            if norm is None:
+                print(f"download {code} exception occurred: 无法识别的证券代码")
+        codes = list(dict.fromkeys(code for code in normalized if code is not None))
+
+        results = {}
+        for code, data, exc in self._pooled_map(
+                lambda c: self.download(c, start, end, adjust, period, interval, count), codes, max_workers):
+            if exc is not None:
+                if errors == "raise":
+                    raise exc
+                print(f"download {code} exception occurred: {exc}")
+                continue
+            results[code] = data
+
+        # 按输入顺序返回
+        results = {code: results[code] for code in codes if code in results}
+        if not concat:
+            return results
+
+        return _concat_bars(results)
+
+    def iter_download(self, codes: Iterable[str], start: Optional[Any] = None, end: Optional[Any] = None,
+                      adjust: str = Adjust.NONE, period: str = "max", interval: int = Interval.DAY, count: int = -1,
+                      window: Optional[int] = None, errors: str = "raise",
+                      result_format: str = "pandas") -> Iterator[Tuple[str, Any]]:
+        """逐个返回多个证券的历史k线数据。
+
+        后台在连接池上预取后续请求，按完成顺序返回 (code, 数据)。同时在途和已获取未取走的结果
+        不超过 window 个，适合把全市场数据直接写入文件而不在内存中合并。其余参数含义同 :meth:`download`。
+
+        :param codes: 证券代码，可以是生成器
+        :param window: 预取窗口大小，默认 2 * pool_size
+        :param errors: 'raise' 遇到错误时抛出异常；'ignore' 跳过出错的代码
+
+        :return: (code, pandas.DataFrame 或 result_format 指定的格式) 迭代器
+
+        Example::
+
+            with THSData(pool_size=8) as td:
+                for code, df in td.iter_download(codes, count=250):
+                    df.to_parquet(f"{code}.parquet")
+        """
+        check_format(result_format)
+
+        def fetch(code):
+            code = _normalize_code(code)
+            return code, self.download(code, start, end, adjust, period, interval, count, result_format=result_format)
+
+        for _, result in self._iter_pooled(fetch, codes, window, errors):
+            yield result
+
+    def iter_transaction_history(self, codes: Iterable[str], dates: Iterable[datetime],
+                                 window: Optional[int] = None, errors: str = "raise",
+                                 result_format: str = "pandas") -> Iterator[Tuple[str, datetime, Any]]:
+        """逐个返回多个证券、多个交易日的tick3秒l1快照数据。
+
+        按 (code, date) 逐块预取，返回顺序和内存控制同 :meth:`iter_download`。
+
+        :param codes: 证券代码，例如 ['USHA600519']
+        :param dates: 日期列表
+        :param window: 预取窗口大小，默认 2 * pool_size
+        :param errors: 'raise' 遇到错误时抛出异常；'ignore' 跳过出错的数据块
+
+        :return: (code, date, pandas.DataFrame 或 result_format 指定的格式) 迭代器
+        """
+        check_format(result_format)
+        dates = list(dates)
+
+        def fetch(item):
+            code, date = item
+            return self.transaction_history(code, date, result_format=result_format)
+
+        items = ((code, date) for code in codes for date in dates)
+        for (code, date), data in self._iter_pooled(fetch, items, window, errors):
+            yield code, date, data
 
     def dc(self):
 
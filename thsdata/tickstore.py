@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+# File: tickstore.py
+# Description: Date/code partitioned on-disk store for transaction_history snapshots.
+#              Each column is a .npy file read back with memory mapping.
+# Author: bensema
+# License: MIT
+
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import date as date_type, datetime, time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .formats import frame_to_columns, records_to_columns
+from .storage import read_json, write_json
+from .times import china_tz
+
+_META = "_meta.json"
+
+
+def _date_key(value: Any) -> str:
+    """日期转换为分区名 20250411."""
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, str):
+        return pd.Timestamp(value).strftime("%Y%m%d")
+    if isinstance(value, (datetime, date_type, pd.Timestamp)):
+        return value.strftime("%Y%m%d")
+    raise ValueError(f"无法识别的日期: {value!r}")
+
+
+def _to_datetime(key: str) -> datetime:
+    return datetime.strptime(key, "%Y%m%d")
+
+
+def _column_array(values: Any) -> np.ndarray:
+    """转换为可以内存映射的定长 dtype，时间转换为北京时间 naive datetime64[ns]."""
+    if isinstance(values, pd.DatetimeIndex):
+        if values.tz is not None:
+            values = values.tz_convert(china_tz).tz_localize(None)
+        values = values.to_numpy(dtype="datetime64[ns]")
+    values = np.ascontiguousarray(values)
+    if values.dtype == object:
+        try:
+            return values.astype(np.float64)
+        except (TypeError, ValueError):
+            return values.astype(str)
+    return values
+
+
+def _to_columns(data: Any) -> Dict[str, Any]:
+    """transaction_history 的结果转换为 {列名: 数组}."""
+    if isinstance(data, pd.DataFrame):
+        return frame_to_columns(data)
+    if isinstance(data, np.ndarray):
+        return {name: data[name] for name in data.dtype.names or ()}
+    return dict(data)
+
+
+def _complete(columns: Dict[str, Any]) -> bool:
+    """是否为可以写入的结果：有 time 列且至少一行."""
+    return "time" in columns and len(columns["time"]) > 0
+
+
+class TickStore:
+    """按 日期/代码 分区的 tick3秒l1快照 本地存储.
+
+    目录结构为 root/20250411/USHA600519/{列名}.npy，time 列为北京时间 datetime64[ns]。
+    读取时以 mmap 方式打开，不需要重新解析。当天及以后(北京时间)的数据尚未完整，不写入存储。
+    :meth:`fetch` 得到的空结果 (非交易日、停牌) 记为 rows 为 0 的空分区，之后不再请求；
+    查询出错的分区不写入，下次 fetch 会重新获取。
+
+    Example::
+
+        store = TickStore("~/.thsdata/ticks")
+        store.fetch(td, ["USHA600519", "USZA000001"], pd.bdate_range("2025-04-01", "2025-04-11"))
+        cols = store.read("USHA600519", 20250411, columns=["time", "price"], start=time(9, 30), end=time(10, 0))
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        os.makedirs(self.root, exist_ok=True)
+
+    def _dir(self, code: str, date: Any) -> str:
+        return os.path.join(self.root, _date_key(date), code)
+
+    def has(self, code: str, date: Any) -> bool:
+        """分区是否已存在."""
+        return os.path.exists(os.path.join(self._dir(code, date), _META))
+
+    def partitions(self, code: Optional[str] = None) -> List[Tuple[str, str]]:
+        """已存储的 (日期, 代码) 列表，按日期排序."""
+        result = []
+        for key in sorted(os.listdir(self.root)):
+            day_dir = os.path.join(self.root, key)
+            if not key.isdigit() or not os.path.isdir(day_dir):
+                continue
+            codes = [code] if code is not None else sorted(os.listdir(day_dir))
+            result.extend((key, c) for c in codes if os.path.exists(os.path.join(day_dir, c, _META)))
+        return result
+
+    # ---- 写入 ----
+
+    def write(self, code: str, date: Any, data: Any) -> None:
+        """写入一个分区，已存在时覆盖.
+
+        :param data: transaction_history 返回的 DataFrame、numpy.recarray 或 {列名: 数组}，
+                     必须包含 time 列且不为空
+        """
+        columns = _to_columns(data)
+        if not _complete(columns):
+            raise ValueError(f"{code} {_date_key(date)} 没有数据或缺少 time 列")
+
+        target = self._dir(code, date)
+        parent = os.path.dirname(target)
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+        try:
+            rows = 0
+            for name, values in columns.items():
+                values = _column_array(values)
+                rows = len(values)
+                np.save(os.path.join(tmp, name + ".npy"), values, allow_pickle=False)
+            write_json(os.path.join(tmp, _META), {"columns": list(columns), "rows": rows})
+            self._replace(tmp, target)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def _write_empty(self, code: str, date: Any) -> None:
+        """写入没有数据的空分区 (非交易日或停牌)，只有 rows 为 0 的元数据."""
+        target = self._dir(code, date)
+        parent = os.path.dirname(target)
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+        try:
+            write_json(os.path.join(tmp, _META), {"columns": [], "rows": 0})
+            self._replace(tmp, target)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def _replace(tmp: str, target: str) -> None:
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+
+    def fetch(self, td, codes: Iterable[str], dates: Iterable[Any], window: Optional[int] = None,
+              errors: str = "ignore", overwrite: bool = False) -> List[Tuple[str, str]]:
+        """批量获取并写入多个证券、多个交易日的数据，已存在的分区跳过.
+
+        请求通过 THSData 连接池预取执行，同 :meth:`THSData.iter_transaction_history`。
+
+        :param td: THSData 实例
+        :param codes: 证券代码
+        :param dates: 日期，datetime、date、'2025-04-11' 或 20250411
+        :param window: 预取窗口大小，默认 2 * pool_size
+        :param errors: 'raise' 遇到错误时抛出异常；'ignore' 跳过出错的分区，下次 fetch 重新获取
+        :param overwrite: 为 True 时重新获取已存在的分区 (包括空分区)
+        :return: 写入的 (日期, 代码) 列表，包括没有数据的空分区
+        """
+        today = datetime.now(china_tz).strftime("%Y%m%d")
+        keys = sorted({_date_key(d) for d in dates})
+        items = [(code, key) for code in codes for key in keys
+                 if key < today and (overwrite or not self.has(code, key))]
+
+        def fetch(item):
+            code, key = item
+            return td._transaction_history_records(code, _to_datetime(key))
+
+        written = []
+        for (code, key), records in td._iter_pooled(fetch, items, window, errors):
+            if records is None:
+                if errors == "raise":
+                    raise ValueError(f"{code} {key} 查询失败")
+                print(f"{(code, key)} 查询失败，未写入")
+                continue
+            if not records:
+                self._write_empty(code, key)
+            else:
+                self.write(code, key, records_to_columns(records, time_unit='s'))
+            written.append((key, code))
+        return written
+
+    # ---- 读取 ----
+
+    def columns(self, code: str, date: Any) -> List[str]:
+        meta = read_json(os.path.join(self._dir(code, date), _META))
+        return meta["columns"] if meta else []
+
+    def read(self, code: str, date: Any, columns: Optional[List[str]] = None,
+             start: Optional[Any] = None, end: Optional[Any] = None) -> Optional[Dict[str, np.ndarray]]:
+        """读取一个分区，返回内存映射的列.
+
+        :param columns: 需要的列，默认全部
+        :param start: 开始时间 (包含)，datetime.time 或 datetime
+        :param end: 结束时间 (包含)，datetime.time 或 datetime
+        :return: {列名: numpy.memmap}，分区不存在时返回 None，空分区返回 {}
+        """
+        directory = self._dir(code, date)
+        meta = read_json(os.path.join(directory, _META))
+        if meta is None:
+            return None
+        if meta["rows"] == 0:
+            return {}
+        columns = columns or meta["columns"]
+        data = {col: np.load(os.path.join(directory, col + ".npy"), mmap_mode="r") for col in columns}
+
+        if start is not None or end is not None:
+            times = data["time"] if "time" in data else np.load(os.path.join(directory, "time.npy"), mmap_mode="r")
+            day = _to_datetime(_date_key(date))
+            lo = 0 if start is None else np.searchsorted(times, self._bound(day, start), side="left")
+            hi = len(times) if end is None else np.searchsorted(times, self._bound(day, end), side="right")
+            data = {col: values[lo:hi] for col, values in data.items()}
+        return data
+
+    @staticmethod
+    def _bound(day: datetime, value: Any) -> np.datetime64:
+        if isinstance(value, time):
+            value = datetime.combine(day.date(), value)
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert(china_tz).tz_localize(None)
+        return ts.to_datetime64()
+
+    def scan(self, codes: Iterable[str], start_date: Any, end_date: Any,
+             columns: Optional[List[str]] = None) -> Iterator[Tuple[str, str, Dict[str, np.ndarray]]]:
+        """按日期顺序逐个返回日期范围内已存储的分区 (代码, 日期, 列)，不复制数据，跳过空分区."""
+        codes = list(codes)
+        lo, hi = _date_key(start_date), _date_key(end_date)
+        for key in sorted(os.listdir(self.root)):
+            if not key.isdigit() or not lo <= key <= hi:
+                continue
+            for code in codes:
+                data = self.read(code, key, columns)
+                if data:
+                    yield code, key, data
+
+    def read_range(self, code: str, start_date: Any, end_date: Any,
+                   columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """读取一个证券多个交易日的数据并合并为 DataFrame."""
+        parts = [data for _, _, data in self.scan([code], start_date, end_date, columns)]
+        if not parts:
+            return pd.DataFrame(columns=columns or [])
+        return pd.DataFrame({col: np.concatenate([part[col] for part in parts]) for col in parts[0]})
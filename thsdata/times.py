@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# File: times.py
+# Description: Encoding and decoding of the THS bit-packed minute time format.
+# Author: bensema
+# License: MIT
+
+import functools
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any
+
+
+@functools.lru_cache(maxsize=None)
+def _china_tz():
+    """北京时间时区，首次使用时创建."""
+    import pytz
+    return pytz.timezone('Asia/Shanghai')
+
+
+# 分钟时间格式: minute(6位) | hour(5位) | day(5位) | month(4位) | year-1900(其余高位)
+_TIME_OFFSET = 0x76c00000
+
+
+def _time_2_int(t: datetime) -> int:
+    """编码单个时间，带时区的时间先转换为北京时间，与 :func:`encode_minute_time` 一致."""
+    if t.tzinfo is not None:
+        t = t.astimezone(_china_tz())
+    dst = (t.minute +
+           (t.hour << 6) +
+           (t.day << 11) +
+           (t.month << 16) +
+           (t.year << 20) -
+           _TIME_OFFSET)
+    return dst
+
+
+def _int_2_time(value: int) -> datetime:
+    """_time_2_int 的逆运算，返回北京时间 naive datetime."""
+    value += _TIME_OFFSET
+    return datetime(value >> 20, (value >> 16) & 0xF, (value >> 11) & 0x1F, (value >> 6) & 0x1F, value & 0x3F)
+
+
+def _to_wall_time(times: Any) -> pd.DatetimeIndex:
+    """转换为北京时间墙上时间(naive)的 DatetimeIndex，naive 输入视为北京时间."""
+    index = pd.DatetimeIndex(times)
+    if index.tz is not None:
+        index = index.tz_convert(_china_tz()).tz_localize(None)
+    return index
+
+
+def encode_minute_time(times: Any) -> np.ndarray:
+    """批量把时间编码为 ths 分钟K线请求使用的整数格式.
+
+    :param times: numpy datetime64 数组、pandas.DatetimeIndex/Series 或 datetime 列表。
+                  带时区的时间先转换为北京时间，naive 时间视为北京时间。
+    :return: numpy.ndarray[int64]，秒及以下部分被舍去
+
+    Example::
+
+        >>> encode_minute_time(pd.DatetimeIndex(["2025-05-19 10:15"]))
+        array([131439247])
+    """
+    # datetime64[m] 的整数值即自 1970-01-01 起的分钟数，由此向量化拆出各字段
+    minutes = _to_wall_time(times).to_numpy(dtype="datetime64[m]")
+    days = minutes.astype("datetime64[D]")
+    months = days.astype("datetime64[M]")
+
+    month_index = months.astype(np.int64)
+    year = month_index // 12 + 1970
+    month = month_index % 12 + 1
+    day = (days - months).astype(np.int64) + 1
+    minute_of_day = (minutes - days).astype(np.int64)
+
+    return ((minute_of_day % 60) +
+            ((minute_of_day // 60) << 6) +
+            (day << 11) +
+            (month << 16) +
+            (year << 20) -
+            _TIME_OFFSET)
+
+
+def decode_minute_time(values: Any, tz: bool = True) -> pd.DatetimeIndex:
+    """批量把 ths 分钟整数时间解码为时间.
+
+    :param values: 整数数组，格式同 :func:`encode_minute_time` 的返回值
+    :param tz: 为 True 时返回 Asia/Shanghai 时区的时间，否则返回北京时间 naive 时间
+    :return: pandas.DatetimeIndex
+    """
+    packed = np.asarray(values, dtype=np.int64) + _TIME_OFFSET
+    year = packed >> 20
+    month = (packed >> 16) & 0xF
+    day = (packed >> 11) & 0x1F
+    hour = (packed >> 6) & 0x1F
+    minute = packed & 0x3F
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    minutes = (months.astype("datetime64[D]") + (day - 1)).astype("datetime64[m]") + hour * 60 + minute
+
+    index = pd.DatetimeIndex(minutes.astype("datetime64[ns]"))
+    return index.tz_localize(_china_tz()) if tz else index
+
+
+def __getattr__(name):
+    # china_tz 按需创建，from .times import china_tz 时才加载 pytz
+    if name == "china_tz":
+        return _china_tz()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
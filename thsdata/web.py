@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# File: web.py
+# Description: Shared pooled HTTP session with timeouts and retry for the 10jqka web endpoints.
+# Author: bensema
+# License: MIT
+
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import requests
+
+WENCAI_URL = "https://eq.10jqka.com.cn/dataQuery/query"
+ATTENTION_URL = "https://ai.10jqka.com.cn/stockapi/yuqing/attention"
+GETSHAPE_URL = "https://ai.10jqka.com.cn/igroup/strategy/getshape/"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Connection": "keep-alive"
+}
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class HttpClient:
+    """共享的 HTTP 会话.
+
+    连接保持 keep-alive 并在线程间复用，每次请求都有超时，连接错误、429 和 5xx 按指数退避重试。
+
+    Example::
+
+        client = HttpClient(timeout=(3, 10), retries=3)
+        data = client.get_json(ATTENTION_URL, {"stockCode": "600519"}, referer="https://ai.10jqka.com.cn/")
+    """
+
+    def __init__(self, timeout: Timeout = (5, 15), retries: int = 3, backoff: float = 0.5,
+                 pool_maxsize: int = 16, headers: Optional[Dict[str, str]] = None):
+        """
+        :param timeout: 默认超时(秒)，(连接超时, 读取超时) 或单个数值
+        :param retries: 最大重试次数
+        :param backoff: 退避系数，第 n 次重试前等待 backoff * 2 ** (n - 1) 秒
+        :param pool_maxsize: 每个主机保持的最大连接数
+        :param headers: 额外的请求头
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_maxsize = pool_maxsize
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self._session: Optional["requests.Session"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        """按需创建的 requests.Session，首次使用时才导入 requests."""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(total=self.retries, connect=self.retries, read=self.retries,
+                              backoff_factor=self.backoff, status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=frozenset(["GET"]), raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=retry)
+                session = requests.Session()
+                session.headers.update(self.headers)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    @property
+    def errors(self) -> Tuple[type, ...]:
+        """请求失败时抛出的异常类型，包括连接错误、超时、状态码错误和 JSON 解析错误."""
+        import requests
+
+        return (requests.RequestException,)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, referer: Optional[str] = None,
+            timeout: Optional[Timeout] = None) -> "requests.Response":
+        """GET 请求，状态码错误时抛出 requests.HTTPError."""
+        headers = {"Referer": referer} if referer else None
+        response = self.session.get(url, params=params, headers=headers,
+                                    timeout=timeout if timeout is not None else self.timeout)
+        response.raise_for_status()
+        return response
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, referer: Optional[str] = None,
+                 timeout: Optional[Timeout] = None) -> Any:
+        """GET 请求并解析 JSON."""
+        return self.get(url, params, referer, timeout).json()
+
+    def close(self) -> None:
+        """关闭连接，之后的请求会重新建立会话."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None